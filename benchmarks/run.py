@@ -0,0 +1,266 @@
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+import httpx
+import yaml
+
+import src.data
+import src.tenants
+from src.assets import get_bundle
+from src.cache import compress_gzip, response_cache
+from src.compact import CompactPortfolio
+from src.data import PortfolioData, load_portfolio_data
+from src.main import app
+from src.processing import process_skills, sort_skills
+from src.rendering import render_index, stream_index
+
+from .synthetic import synthetic_portfolio
+
+SIZES: dict[str, dict[str, int]] = {
+    "tiny": {"skills": 10, "experiences": 2},
+    "small": {"skills": 100, "experiences": 10},
+    "large": {"skills": 10_000, "experiences": 1_000},
+    "huge": {"skills": 100_000, "experiences": 5_000},
+}
+API_PATHS = (
+    "/",
+    "/api/portfolio",
+    "/api/experience",
+    "/api/skills",
+    "/api/education",
+    "/api/certifications",
+)
+DEFAULT_OUTPUT = "benchmarks/results.json"
+
+
+def _stats(samples: list[float]) -> dict[str, float]:
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "rounds": len(samples),
+    }
+
+
+def measure(fn: Callable[[], object], rounds: int) -> dict[str, float]:
+    fn()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return _stats(samples)
+
+
+def measure_memory(build: Callable[[], object]) -> int:
+    """Bytes still allocated by build() once it returns, its result kept alive."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def footprint(raw: dict[str, Any]) -> dict[str, int]:
+    """Resident bytes of a validated portfolio and of its compact serving form."""
+    return {
+        "portfolio_data": measure_memory(lambda: PortfolioData(**raw)),
+        "compact": measure_memory(lambda: CompactPortfolio.from_data(PortfolioData(**raw))),
+    }
+
+
+def _blocking_stylesheets(page: str) -> list[str]:
+    head = re.sub(r"<noscript>.*?</noscript>", "", page[: page.find("</head>")], flags=re.S)
+    return re.findall(r"<link\b(?=[^>]*\brel=\"stylesheet\")[^>]*\bhref=\"([^\"]*)\"", head)
+
+
+def page_weight(portfolio_data: PortfolioData) -> dict[str, dict[str, int]]:
+    """Bytes of the page as rendered and as optimized, and what blocks its first paint.
+
+    First paint waits for the page and every stylesheet linked in its head; only the
+    local stylesheet's bytes are counted, CDN stylesheets only as requests.
+    """
+    bundle = get_bundle()
+    weights = {}
+    for name, optimize in (("plain", False), ("optimized", True)):
+        page = render_index(portfolio_data, optimize=optimize).encode("utf-8")
+        blocking = _blocking_stylesheets(page.decode("utf-8"))
+        local = [
+            bundle.files[href.removeprefix("./static/")]
+            for href in blocking
+            if href.startswith("./static/")
+        ]
+        blocking_css = sum(len(compress_gzip(bytes(asset.body))) for asset in local)
+        weights[name] = {
+            "html": len(page),
+            "html_gzip": len(compress_gzip(page)),
+            "blocking_stylesheets": len(blocking),
+            "blocking_css_gzip": blocking_css,
+            "first_paint_gzip": len(compress_gzip(page)) + blocking_css,
+        }
+    return weights
+
+
+async def measure_async(fn: Callable[[], Awaitable[object]], rounds: int) -> dict[str, float]:
+    await fn()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return _stats(samples)
+
+
+async def _bench_api(portfolio_data: PortfolioData, rounds: int) -> dict[str, dict[str, float]]:
+    results: dict[str, dict[str, float]] = {}
+    previous_data, previous_tenants = src.data._portfolio_data, src.tenants.tenant_cache
+    src.data._portfolio_data, src.tenants.tenant_cache = portfolio_data, None
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for path in API_PATHS:
+
+                async def cold(path: str = path) -> None:
+                    response_cache.clear()
+                    (await client.get(path)).raise_for_status()
+
+                async def warm(path: str = path) -> None:
+                    (await client.get(path)).raise_for_status()
+
+                results[f"api.cold:{path}"] = await measure_async(cold, max(1, rounds))
+                results[f"api.warm:{path}"] = await measure_async(warm, rounds * 10)
+    finally:
+        src.data._portfolio_data, src.tenants.tenant_cache = previous_data, previous_tenants
+        response_cache.clear()
+    return results
+
+
+def _cases(
+    raw: dict[str, Any], skills: list[Any], path: str, portfolio_data: PortfolioData
+) -> dict[str, Callable[[], object]]:
+    return {
+        "process_skills": lambda: process_skills(raw["skills"]),
+        "sort_skills": lambda: sort_skills(skills),
+        "validate": lambda: PortfolioData(**raw),
+        "compact": lambda: CompactPortfolio.from_data(portfolio_data),
+        "load_portfolio_data": lambda: load_portfolio_data(path, use_cache=False),
+        "render_index": lambda: render_index(portfolio_data, optimize=False),
+        "render_index.optimized": lambda: render_index(portfolio_data, optimize=True),
+        "stream_index.first_chunk": lambda: next(stream_index(portfolio_data)),
+        "stream_index.total": lambda: sum(1 for _ in stream_index(portfolio_data)),
+        "search.common": lambda: portfolio_data.search("skill", 20),
+        "search.prefix": lambda: portfolio_data.search("obs gpu", 20),
+    }
+
+
+def run_suite(sizes: list[str], rounds: int) -> dict[str, Any]:
+    results: dict[str, dict[str, float]] = {}
+    memory: dict[str, dict[str, int]] = {}
+    pages: dict[str, dict[str, dict[str, int]]] = {}
+    for size in sizes:
+        raw = synthetic_portfolio(**SIZES[size])
+        memory[size] = footprint(raw)
+        portfolio_data = PortfolioData(**raw)
+        pages[size] = page_weight(portfolio_data)
+        skills = list(portfolio_data.skills)
+        content = yaml.safe_dump(raw, sort_keys=False)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "portfolio.yml"
+            path.write_text(content, encoding="utf-8")
+            cases = _cases(raw, skills, str(path), portfolio_data)
+            for name, fn in cases.items():
+                results[f"{name}[{size}]"] = measure(fn, rounds)
+
+        for name, stats in asyncio.run(_bench_api(portfolio_data, rounds)).items():
+            results[f"{name}[{size}]"] = stats
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": {size: SIZES[size] for size in sizes},
+            "rounds": rounds,
+        },
+        "results": results,
+        "memory": memory,
+        "page": pages,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Return a message for every benchmark whose median regressed beyond tolerance."""
+    regressions = []
+    for name, stats in sorted(current["results"].items()):
+        base = baseline["results"].get(name)
+        if base is None or base["median"] <= 0:
+            continue
+        ratio = stats["median"] / base["median"]
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{name}: {stats['median'] * 1e3:.3f} ms vs baseline "
+                f"{base['median'] * 1e3:.3f} ms ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--sizes", default="small,large", help=f"comma list of {', '.join(SIZES)}")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", help="fail when a median regresses against this file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(unknown)}")
+
+    report = run_suite(sizes, args.rounds)
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+    for name, stats in sorted(report["results"].items()):
+        print(f"{name:60s} {stats['median'] * 1e3:10.3f} ms")
+    for size, weights in report["page"].items():
+        plain, optimized = weights["plain"], weights["optimized"]
+        print(
+            f"page[{size}]: {plain['html_gzip']} -> {optimized['html_gzip']} bytes gzipped, "
+            f"first paint waits for {plain['first_paint_gzip']} -> "
+            f"{optimized['first_paint_gzip']} bytes and {plain['blocking_stylesheets']} -> "
+            f"{optimized['blocking_stylesheets']} stylesheets"
+        )
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(report, baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
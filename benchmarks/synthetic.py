@@ -0,0 +1,71 @@
+import random
+from typing import Any
+
+_WORDS = (
+    "python kubernetes platform latency pipeline model serving feature store batch "
+    "streaming observability terraform cluster inference training gpu cache api schema "
+    "migration rollout monitoring reliability throughput queue tenant search index"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize()
+
+
+def synthetic_portfolio(
+    skills: int = 100,
+    experiences: int = 10,
+    achievements: int = 5,
+    categories: int = 20,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Build raw portfolio.yml data of the requested size, deterministic for a given seed."""
+    rng = random.Random(seed)
+    categories = max(1, min(categories, skills)) if skills else 0
+
+    groups: list[dict[str, Any]] = []
+    for index in range(categories):
+        group: dict[str, Any] = {"category": f"Category {index:05d}", "values": []}
+        if index % 3 == 0:
+            group["priority"] = rng.randint(0, 5)
+        groups.append(group)
+    for index in range(skills):
+        rng.choice(groups)["values"].append(f"Skill {index:06d}")
+    groups = [group for group in groups if group["values"]]
+
+    return {
+        "personal": {
+            "name": "Synthetic Person",
+            "title": "Benchmark Engineer",
+            "location": "Nowhere",
+            "summary": _sentence(rng, 60),
+            "email": "synthetic@example.com",
+            "linkedin": "linkedin.com/in/synthetic",
+            "github": "github.com/synthetic",
+            "profile": "avatars.githubusercontent.com/u/0",
+        },
+        "experience": [
+            {
+                "company": f"Company {rng.randrange(max(1, experiences // 4 or 1)):04d}",
+                "position": _sentence(rng, 3),
+                "duration": f"{rng.randint(1, 5)} years",
+                "location": "Remote",
+                "period": f"{2000 + index % 25} - {2001 + index % 25}",
+                "achievements": [_sentence(rng, 20) for _ in range(achievements)],
+            }
+            for index in range(experiences)
+        ],
+        "education": [
+            {
+                "institution": f"University {index}",
+                "degree": _sentence(rng, 4),
+                "period": "2010 - 2014",
+                "location": "Somewhere",
+            }
+            for index in range(3)
+        ],
+        "skills": groups,
+        "certifications": [
+            {"name": _sentence(rng, 4), "issuer": f"Issuer {index % 7}"} for index in range(20)
+        ],
+    }
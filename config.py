@@ -1 +1,48 @@
+import os
+
 DEFAULT_PORTFOLIO_PATH = "portfolio.yml"
+
+# Seconds between checks of DEFAULT_PORTFOLIO_PATH for changes; 0 disables hot reload.
+PORTFOLIO_RELOAD_INTERVAL = float(os.environ.get("PORTFOLIO_RELOAD_INTERVAL", "0"))
+
+# Directory for validated PortfolioData snapshots keyed by YAML content hash; empty disables them.
+PORTFOLIO_SNAPSHOT_DIR = os.environ.get("PORTFOLIO_SNAPSHOT_DIR", "")
+
+# Directory of <tenant>.yml files. When set, each request is served the portfolio picked by
+# its /t/<tenant>/ path prefix or, failing that, its Host header (e.g. portfolios/example.com.yml).
+PORTFOLIOS_DIR = os.environ.get("PORTFOLIOS_DIR", "")
+
+# Bounds for parsed tenant portfolios (entries and YAML source bytes) and rendered responses.
+TENANT_CACHE_ENTRIES = int(os.environ.get("TENANT_CACHE_ENTRIES", "256"))
+TENANT_CACHE_BYTES = int(os.environ.get("TENANT_CACHE_BYTES", str(32 * 1024 * 1024)))
+RESPONSE_CACHE_BYTES = int(os.environ.get("RESPONSE_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+# Directory where each worker periodically writes its metrics so /metrics can report all workers.
+PORTFOLIO_METRICS_DIR = os.environ.get("PORTFOLIO_METRICS_DIR", "")
+
+# Emit per-stage durations in a Server-Timing response header.
+PORTFOLIO_SERVER_TIMING = os.environ.get("PORTFOLIO_SERVER_TIMING", "1") not in ("0", "false", "")
+
+# Stream a not-yet-cached index page to the client while it renders, flushing <head> first.
+PORTFOLIO_STREAM_HTML = os.environ.get("PORTFOLIO_STREAM_HTML", "0") not in ("0", "false", "")
+PORTFOLIO_STREAM_CHUNK_SIZE = int(os.environ.get("PORTFOLIO_STREAM_CHUNK_SIZE", "16384"))
+
+# Directory for the shared response snapshot. When set, one worker renders every response into a
+# memory-mapped file there and all workers serve from it.
+PORTFOLIO_SHARED_DIR = os.environ.get("PORTFOLIO_SHARED_DIR", "")
+
+# Directory where the profile image is cached as resized WebP/AVIF/PNG variants, ingested once at
+# startup from the personal.profile URL or local path. Empty keeps linking the original image.
+PORTFOLIO_AVATAR_DIR = os.environ.get("PORTFOLIO_AVATAR_DIR", "")
+
+# Directory for compiled Jinja template bytecode, reused across restarts and workers so the page
+# template is not recompiled on every cold start. Empty compiles in memory only.
+PORTFOLIO_TEMPLATE_CACHE_DIR = os.environ.get("PORTFOLIO_TEMPLATE_CACHE_DIR", "")
+
+# Minify the rendered page and inline the stylesheet rules it needs above the fold, loading the
+# rest asynchronously. Done once per data version, when the page is rendered for the cache.
+PORTFOLIO_OPTIMIZE_HTML = os.environ.get("PORTFOLIO_OPTIMIZE_HTML", "0") not in ("0", "false", "")
+
+# Cold-start budget in milliseconds (import, warm-up and first request) checked by
+# `portfolio startup`; 0 only reports.
+PORTFOLIO_STARTUP_BUDGET_MS = float(os.environ.get("PORTFOLIO_STARTUP_BUDGET_MS", "0"))
@@ -0,0 +1,97 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+# Drives the app in-process without an HTTP client library, which only the test extra provides.
+
+
+@dataclass(frozen=True, slots=True)
+class ASGIResponse:
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+    def header(self, name: str) -> str | None:
+        key = name.lower().encode("latin-1")
+        for header, value in self.headers:
+            if header.lower() == key:
+                return value.decode("latin-1")
+        return None
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: Any) -> AsyncIterator[dict[str, Any]]:
+    """Run the app's startup, yield its lifespan state, then run its shutdown."""
+    receive: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+    sent: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+    state: dict[str, Any] = {}
+    scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": state}
+    await receive.put({"type": "lifespan.startup"})
+    task = asyncio.create_task(app(scope, receive.get, sent.put))
+    message = await sent.get()
+    if message["type"] != "lifespan.startup.complete":
+        raise RuntimeError(message.get("message") or "application startup failed")
+    try:
+        yield state
+    finally:
+        await receive.put({"type": "lifespan.shutdown"})
+        await task
+
+
+async def request(
+    app: Any,
+    path: str,
+    headers: Sequence[tuple[str, str]] = (),
+    state: dict[str, Any] | None = None,
+    method: str = "GET",
+) -> ASGIResponse:
+    """Send one bodiless request to app and collect the whole response."""
+    route, _, query = path.partition("?")
+    encoded = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+    if not any(name == b"host" for name, _ in encoded):
+        encoded.insert(0, (b"host", b"localhost"))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": route,
+        "raw_path": route.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": encoded,
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+        "state": dict(state or {}),
+    }
+    requested = False
+    done = asyncio.Event()
+
+    async def receive() -> dict[str, Any]:
+        nonlocal requested
+        if requested:
+            await done.wait()
+            return {"type": "http.disconnect"}
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    status = 0
+    response_headers: list[tuple[bytes, bytes]] = []
+    body: list[bytes] = []
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status, response_headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers = list(message.get("headers", []))
+        elif message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                done.set()
+
+    await app(scope, receive, send)
+    done.set()
+    return ASGIResponse(status, response_headers, b"".join(body))
@@ -0,0 +1,169 @@
+import functools
+import hashlib
+import mimetypes
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from .cache import MIN_COMPRESS_SIZE, CachedBody, compress_brotli, compress_gzip, make_etag
+
+STATIC_DIR = "static"
+COMPRESSIBLE_SUFFIXES = frozenset({".css", ".js", ".svg", ".json", ".html", ".txt"})
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_CSS_TOKENS = re.compile(r"/\*.*?\*/|\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'", re.S)
+_CSS_SPACE = re.compile(r"\s+")
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css(source: str) -> str:
+    """Drop comments and redundant whitespace, leaving string literals untouched."""
+    parts: list[str] = []
+    position = 0
+    for match in _CSS_TOKENS.finditer(source):
+        parts.append(_minify_css_code(source[position : match.start()]))
+        if not match.group().startswith("/*"):
+            parts.append(match.group())
+        position = match.end()
+    parts.append(_minify_css_code(source[position:]))
+    return "".join(parts).strip()
+
+
+def _minify_css_code(code: str) -> str:
+    code = _CSS_SPACE.sub(" ", code)
+    code = _CSS_PUNCTUATION.sub(r"\1", code)
+    code = code.replace(": ", ":")
+    return code.replace(";}", "}")
+
+
+def minify_js(source: str) -> str:
+    """Strip comments and indentation while keeping line breaks, so ASI is unaffected.
+
+    Conservative by design: string and template literals are respected, regular
+    expression literals are not parsed.
+    """
+    out: list[str] = []
+    quote: str | None = None
+    index = 0
+    length = len(source)
+    while index < length:
+        char = source[index]
+        if quote is not None:
+            out.append(char)
+            if char == "\\" and index + 1 < length:
+                out.append(source[index + 1])
+                index += 1
+            elif char == quote:
+                quote = None
+        elif char in "'\"`":
+            quote = char
+            out.append(char)
+        elif source.startswith("//", index):
+            newline = source.find("\n", index)
+            index = length if newline == -1 else newline
+            continue
+        elif source.startswith("/*", index):
+            end = source.find("*/", index + 2)
+            index = length if end == -1 else end + 2
+            continue
+        else:
+            out.append(char)
+        index += 1
+
+    lines = (line.strip() for line in "".join(out).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+# Contents of these elements are kept byte for byte.
+_HTML_RAW = re.compile(r"<(pre|textarea|script|style)\b.*?</\1\s*>", re.S | re.I)
+_HTML_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.S)
+# Whitespace next to these tags never renders, so it is dropped rather than collapsed.
+_HTML_BLOCK_TAG = re.compile(
+    r" ?(</?(?:html|head|body|meta|link|title|nav|header|footer|main|section|article|div|ul|ol|li"
+    r"|h[1-6]|p|form|picture|source|noscript|script|style|br|hr)\b[^>]*>) ?",
+    re.I,
+)
+_HTML_SPACE = re.compile(r"\s+")
+
+
+def minify_html(source: str) -> str:
+    """Drop comments and collapse whitespace outside pre, textarea, script and style.
+
+    Relies on > being escaped inside attribute values, as autoescaping does.
+    """
+    parts: list[str] = []
+    position = 0
+    invisible = False
+    for match in _HTML_RAW.finditer(source):
+        markup = _minify_html_markup(source[position : match.start()])
+        # Like other block tags, script and style never render surrounding whitespace.
+        if invisible:
+            markup = markup.lstrip()
+        invisible = match.group(1).lower() in ("script", "style")
+        parts.append(markup.rstrip() if invisible else markup)
+        parts.append(match.group())
+        position = match.end()
+    markup = _minify_html_markup(source[position:])
+    parts.append(markup.lstrip() if invisible else markup)
+    return "".join(parts).strip()
+
+
+def _minify_html_markup(markup: str) -> str:
+    markup = _HTML_COMMENT.sub("", markup)
+    markup = _HTML_SPACE.sub(" ", markup)
+    return _HTML_BLOCK_TAG.sub(r"\1", markup)
+
+
+_MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+def hashed_name(path: str, content: bytes) -> str:
+    stem, suffix = os.path.splitext(path)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:10]}{suffix}"
+
+
+def _media_type(path: str) -> str:
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or media_type in ("application/javascript", "image/svg+xml"):
+        media_type += "; charset=utf-8"
+    return media_type
+
+
+@dataclass(frozen=True, slots=True)
+class AssetBundle:
+    manifest: dict[str, str]
+    files: dict[str, CachedBody]
+
+    def url(self, path: str) -> str:
+        return f"./static/{self.manifest.get(path, path)}"
+
+
+def build_assets(static_dir: str = STATIC_DIR) -> AssetBundle:
+    """Minify, content-hash and precompress every file under static_dir."""
+    root = Path(static_dir)
+    manifest: dict[str, str] = {}
+    files: dict[str, CachedBody] = {}
+    for file in sorted(p for p in root.rglob("*") if p.is_file()):
+        relative = file.relative_to(root).as_posix()
+        content = file.read_bytes()
+        minify = _MINIFIERS.get(file.suffix)
+        if minify is not None:
+            content = minify(content.decode("utf-8")).encode("utf-8")
+
+        name = hashed_name(relative, content)
+        compress = file.suffix in COMPRESSIBLE_SUFFIXES and len(content) >= MIN_COMPRESS_SIZE
+        manifest[relative] = name
+        files[name] = CachedBody(
+            body=content,
+            etag=make_etag(content),
+            media_type=_media_type(relative),
+            gzip=compress_gzip(content, level=9) if compress else None,
+            br=compress_brotli(content, quality=11) if compress else None,
+        )
+    return AssetBundle(manifest=manifest, files=files)
+
+
+@functools.cache
+def get_bundle(static_dir: str = STATIC_DIR) -> AssetBundle:
+    return build_assets(static_dir)
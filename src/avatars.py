@@ -0,0 +1,198 @@
+import hashlib
+import importlib.util
+import io
+import json
+import logging
+import os
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .assets import hashed_name
+from .cache import CachedBody, make_etag
+from .metrics import stage
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Pillow is an optional extra, and only imported once an avatar is actually built so that
+# servers without PORTFOLIO_AVATAR_DIR do not pay for it at startup.
+HAS_PILLOW = importlib.util.find_spec("PIL") is not None
+
+logger = logging.getLogger(__name__)
+
+# The profile photo is shown at 180 CSS pixels; one variant per device pixel ratio.
+PHOTO_WIDTHS = (180, 360, 540)
+ICON_SIZE = 64
+MAX_SOURCE_BYTES = 10 * 1024 * 1024
+FETCH_TIMEOUT = 10.0
+
+# Most compact first: browsers take the first <source> whose type they support.
+FORMATS: tuple[tuple[str, str, dict[str, object]], ...] = (
+    ("image/avif", "avif", {"quality": 60}),
+    ("image/webp", "webp", {"quality": 82, "method": 6}),
+    ("image/png", "png", {"optimize": True}),
+)
+FALLBACK_MEDIA_TYPE = "image/png"
+
+
+@dataclass(frozen=True, slots=True)
+class Avatar:
+    """Resized encodings of one profile image, as static file names under avatars/."""
+
+    source: str
+    variants: dict[str, tuple[tuple[int, str], ...]]
+    icon: str
+    files: dict[str, CachedBody]
+
+    @property
+    def fallback(self) -> str:
+        return self.variants[FALLBACK_MEDIA_TYPE][0][1]
+
+    def srcset(self, media_type: str, asset_url: Callable[[str], str]) -> str:
+        return ", ".join(f"{asset_url(name)} {width}w" for width, name in self.variants[media_type])
+
+
+_avatars: dict[str, Avatar] = {}
+_files: dict[str, CachedBody] = {}
+_lock = threading.Lock()
+
+
+def get_avatar(source: str) -> Avatar | None:
+    """The ingested avatar for a profile source, if there is one."""
+    return _avatars.get(source)
+
+
+def avatar_file(name: str) -> CachedBody | None:
+    return _files.get(name)
+
+
+def read_source(source: str) -> bytes:
+    """Image bytes from a local path or file:// URL, otherwise over HTTPS like the page links it."""
+    import urllib.request
+
+    path = source.removeprefix("file://")
+    if source.startswith("file://") or os.path.isfile(path):
+        with open(path, "rb") as file:
+            return file.read(MAX_SOURCE_BYTES + 1)
+    url = source if source.startswith(("https://", "http://")) else f"https://{source}"
+    request = urllib.request.Request(url, headers={"User-Agent": "portfolio-avatar/1"})
+    with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:  # nosec B310
+        data: bytes = response.read(MAX_SOURCE_BYTES + 1)
+    return data
+
+
+def _encode(image: "Image.Image", size: int, fmt: str, options: dict[str, object]) -> bytes:
+    from PIL import Image
+
+    out = io.BytesIO()
+    image.resize((size, size), Image.Resampling.LANCZOS).save(out, format=fmt.upper(), **options)
+    return out.getvalue()
+
+
+def build_avatar(source: str, content: bytes) -> Avatar:
+    """Square-crop content and encode it at every photo width and format Pillow supports."""
+    if not HAS_PILLOW:
+        raise RuntimeError("avatar variants need Pillow (install the images extra)")
+    if len(content) > MAX_SOURCE_BYTES:
+        raise ValueError(f"avatar source is larger than {MAX_SOURCE_BYTES} bytes")
+    from PIL import Image, ImageOps, features
+
+    with Image.open(io.BytesIO(content)) as opened:
+        image = ImageOps.exif_transpose(opened)
+        alpha = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if alpha else "RGB")
+    side = min(image.size)
+    image = ImageOps.fit(image, (side, side), Image.Resampling.LANCZOS)
+    widths = [w for w in PHOTO_WIDTHS if w <= side] or [side]
+    stem = "avatars/" + hashlib.sha256(source.encode("utf-8")).hexdigest()[:12]
+
+    files: dict[str, CachedBody] = {}
+
+    def add(width: int, fmt: str, media_type: str, options: dict[str, object]) -> str:
+        body = _encode(image, width, fmt, options)
+        name = hashed_name(f"{stem}-{width}.{fmt}", body)
+        files[name] = CachedBody(body=body, etag=make_etag(body), media_type=media_type)
+        return name
+
+    variants: dict[str, tuple[tuple[int, str], ...]] = {}
+    with stage("avatar"):
+        for media_type, fmt, options in FORMATS:
+            if fmt != "png" and not features.check(fmt):
+                continue
+            variants[media_type] = tuple((w, add(w, fmt, media_type, options)) for w in widths)
+        icon = add(min(ICON_SIZE, side), "png", FALLBACK_MEDIA_TYPE, {"optimize": True})
+    return Avatar(source=source, variants=variants, icon=icon, files=files)
+
+
+def _manifest_path(directory: str, source: str) -> str:
+    return os.path.join(
+        directory, hashlib.sha256(source.encode("utf-8")).hexdigest()[:12] + ".json"
+    )
+
+
+def _load_cached(directory: str, source: str) -> Avatar | None:
+    try:
+        with open(_manifest_path(directory, source), encoding="utf-8") as file:
+            manifest = json.load(file)
+        files = {}
+        for name, media_type in manifest["files"].items():
+            with open(os.path.join(directory, name), "rb") as file:
+                body = file.read()
+            files[name] = CachedBody(body=body, etag=make_etag(body), media_type=media_type)
+        variants = {
+            media_type: tuple((width, name) for width, name in entries)
+            for media_type, entries in manifest["variants"].items()
+        }
+        return Avatar(source=source, variants=variants, icon=manifest["icon"], files=files)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        logger.warning("Ignoring unreadable avatar cache for %s: %s", source, exc)
+        return None
+
+
+def _save(directory: str, avatar: Avatar) -> None:
+    try:
+        for name, cached in avatar.files.items():
+            path = os.path.join(directory, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as file:
+                file.write(cached.body)
+        manifest = {
+            "variants": avatar.variants,
+            "icon": avatar.icon,
+            "files": {name: cached.media_type for name, cached in avatar.files.items()},
+        }
+        tmp_path = _manifest_path(directory, avatar.source) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+        os.replace(tmp_path, _manifest_path(directory, avatar.source))
+    except OSError as exc:
+        logger.warning("Cannot write avatar cache in %s: %s", directory, exc)
+
+
+def ingest_avatar(source: str, directory: str = "") -> Avatar | None:
+    """Fetch and encode the avatar for source once, reusing variants cached in directory.
+
+    Failures are logged and return None, leaving the page to link the original image.
+    """
+    avatar = _avatars.get(source)
+    if avatar is None and directory:
+        avatar = _load_cached(directory, source)
+    if avatar is None:
+        if not HAS_PILLOW:
+            logger.warning("Not caching the avatar: Pillow is not installed")
+            return None
+        try:
+            avatar = build_avatar(source, read_source(source))
+        except Exception as exc:
+            logger.warning("Cannot cache avatar %s: %s", source, exc)
+            return None
+        if directory:
+            _save(directory, avatar)
+    with _lock:
+        _avatars[source] = avatar
+        _files.update(avatar.files)
+    return avatar
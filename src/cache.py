@@ -0,0 +1,235 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+
+from starlette.responses import Response
+
+from config import RESPONSE_CACHE_BYTES
+
+from .metrics import record_cache, stage
+
+try:
+    import brotli
+except ImportError:  # brotli is an optional extra
+    brotli = None
+
+DEFAULT_MAX_ENTRIES = 1024
+MIN_COMPRESS_SIZE = 256
+
+# Bodies are compressed on first use in the request path, where brotli's top
+# qualities cost seconds per megabyte; offline builds pass the maximum instead.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+# Bodies are bytes, or memoryviews into a mapped shared snapshot.
+Body = bytes | memoryview
+
+
+@dataclass(frozen=True, slots=True)
+class CachedBody:
+    body: Body
+    etag: str
+    media_type: str
+    gzip: Body | None = None
+    br: Body | None = None
+
+    def variant(self, encoding: str | None) -> tuple[Body, str]:
+        """Return the body and ETag for a content-coding picked by negotiate_encoding."""
+        if encoding == "br" and self.br is not None:
+            return self.br, self.etag[:-1] + '-br"'
+        if encoding == "gzip" and self.gzip is not None:
+            return self.gzip, self.etag[:-1] + '-gzip"'
+        return self.body, self.etag
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + len(self.gzip or b"") + len(self.br or b"")
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def compress_gzip(body: bytes, level: int = GZIP_LEVEL) -> bytes:
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def compress_brotli(body: bytes, quality: int = BROTLI_QUALITY) -> bytes | None:
+    if brotli is None:
+        return None
+    result: bytes = brotli.compress(body, quality=quality)
+    return result
+
+
+def cached_body(body: bytes, media_type: str) -> CachedBody:
+    if len(body) < MIN_COMPRESS_SIZE:
+        return CachedBody(body=body, etag=make_etag(body), media_type=media_type)
+    with stage("compress"):
+        return CachedBody(
+            body=body,
+            etag=make_etag(body),
+            media_type=media_type,
+            gzip=compress_gzip(body),
+            br=compress_brotli(body),
+        )
+
+
+def _qualities(header: str) -> dict[str, float]:
+    qualities: dict[str, float] = {}
+    for item in header.split(","):
+        value, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            param = param.strip()
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        qualities[value.strip().lower()] = quality
+    return qualities
+
+
+def negotiate_encoding(accept_encoding: str | None, cached: CachedBody) -> str | None:
+    """Pick br, then gzip, from an Accept-Encoding header; None means identity."""
+    if not accept_encoding:
+        return None
+
+    qualities = _qualities(accept_encoding)
+    wildcard = qualities.get("*", 0.0)
+    for coding, available in (("br", cached.br), ("gzip", cached.gzip)):
+        if available is not None and qualities.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+def negotiate_media_type(accept: str | None, available: Sequence[str]) -> str:
+    """Pick the available media type with the highest quality in an Accept header.
+
+    Ties and headers that match nothing resolve to the first available type.
+    """
+    if not accept:
+        return available[0]
+    qualities = _qualities(accept)
+    best, best_quality = available[0], 0.0
+    for media_type in available:
+        quality = qualities.get(
+            media_type,
+            qualities.get(media_type.split("/")[0] + "/*", qualities.get("*/*", 0.0)),
+        )
+        if quality > best_quality:
+            best, best_quality = media_type, quality
+    return best
+
+
+def accepted_languages(accept_language: str | None) -> list[str]:
+    """Language tags from an Accept-Language header, most preferred first."""
+    if not accept_language:
+        return []
+    qualities = _qualities(accept_language)
+    ranked = sorted(qualities.items(), key=lambda item: -item[1])
+    return [tag for tag, quality in ranked if quality > 0 and tag != "*"]
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag and its encoded variants."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        for suffix in ('-br"', '-gzip"'):
+            if candidate.endswith(suffix):
+                candidate = candidate[: -len(suffix)] + '"'
+                break
+        if candidate == etag:
+            return True
+    return False
+
+
+def cached_response(
+    request_headers: Mapping[str, str],
+    cached: CachedBody,
+    cache_control: str = "no-cache",
+    extra_headers: dict[str, str] | None = None,
+    vary: tuple[str, ...] = (),
+) -> Response:
+    """Serve a cached body: negotiate its encoding and answer If-None-Match with 304."""
+    encoding = negotiate_encoding(request_headers.get("accept-encoding"), cached)
+    body, etag = cached.variant(encoding)
+    headers = {"ETag": etag, "Cache-Control": cache_control, **(extra_headers or {})}
+    if cached.gzip is not None or cached.br is not None:
+        vary = (*vary, "Accept-Encoding")
+    if vary:
+        headers["Vary"] = ", ".join(vary)
+    if etag_matches(request_headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None and body is not cached.body:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=cached.media_type, headers=headers)
+
+
+class ResponseCache:
+    """LRU of encoded response bodies keyed by (data version, resource).
+
+    Bounded both by entry count and by the total size of the stored bodies.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = RESPONSE_CACHE_BYTES,
+        name: str = "response",
+    ) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: OrderedDict[tuple[str, ...], CachedBody] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, ...]) -> CachedBody | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        record_cache(self.name, hit=entry is not None)
+        return entry
+
+    def put(self, key: tuple[str, ...], entry: CachedBody) -> None:
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous.size
+            self._entries[key] = entry
+            self.total_bytes += entry.size
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted.size
+
+    def get_or_build(self, key: tuple[str, ...], build: Callable[[], CachedBody]) -> CachedBody:
+        entry = self.get(key)
+        if entry is None:
+            entry = build()
+            self.put(key, entry)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+response_cache = ResponseCache()
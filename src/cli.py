@@ -0,0 +1,206 @@
+import argparse
+import logging
+import sys
+
+from config import DEFAULT_PORTFOLIO_PATH, PORTFOLIO_AVATAR_DIR, PORTFOLIO_STARTUP_BUDGET_MS
+
+
+def _export(args: argparse.Namespace) -> int:
+    from .export import export_site
+
+    avatar_dir = args.avatar_dir if args.avatar else None
+    export_site(
+        args.out,
+        args.portfolio,
+        args.static,
+        clean=args.clean,
+        avatar_dir=avatar_dir,
+        optimize=args.optimize_html or None,
+    )
+    return 0
+
+
+def _validate(args: argparse.Namespace) -> int:
+    from .validate import expand_paths, format_result, validate_paths
+
+    paths = expand_paths(args.paths)
+    if not paths:
+        print("no portfolio files found", file=sys.stderr)
+        return 2
+
+    failed = cached = 0
+    cache_path = None if args.no_cache else args.cache
+    for result in validate_paths(paths, jobs=args.jobs, cache_path=cache_path):
+        failed += not result.ok
+        cached += result.cached
+        if not (args.quiet and result.ok):
+            for line in format_result(result):
+                print(line, flush=True)
+
+    print(f"{len(paths)} files, {failed} failed, {cached} unchanged", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def _startup(args: argparse.Namespace) -> int:
+    from .startup import profile_startup
+
+    over = 0
+    for run in range(1, args.runs + 1):
+        profile = profile_startup(args.path, top=args.imports if run == 1 else 0)
+        print(
+            f"run {run}: import {profile.import_ms:.0f} ms, warm-up {profile.warmup_ms:.0f} ms, "
+            f"first request {profile.first_request_ms:.1f} ms (HTTP {profile.status}), "
+            f"total {profile.total_ms:.0f} ms",
+            flush=True,
+        )
+        for module, ms in profile.slowest_imports:
+            print(f"  {ms:8.1f} ms  {module}")
+        over += args.budget_ms > 0 and profile.total_ms > args.budget_ms
+
+    if over:
+        print(
+            f"{over} of {args.runs} runs over the {args.budget_ms:.0f} ms budget", file=sys.stderr
+        )
+        return 1
+    return 0
+
+
+def _loadtest(args: argparse.Namespace) -> int:
+    import asyncio
+    import json
+
+    from .loadtest import (
+        DEFAULT_HEADERS,
+        build_report,
+        loadtest,
+        parse_header,
+        parse_mix,
+        parse_target,
+    )
+
+    try:
+        parse_target(args.target)
+        if args.requests <= 0 and args.duration <= 0:
+            raise ValueError("--requests 0 needs a --duration")
+        if args.concurrency < 1:
+            raise ValueError("--concurrency must be at least 1")
+        if not 0.0 <= args.conditional <= 1.0:
+            raise ValueError("--conditional must be between 0 and 1")
+        mix = parse_mix(args.mix) if args.mix else None
+        headers = [*DEFAULT_HEADERS, *(parse_header(h) for h in args.header)]
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    options = {
+        "concurrency": args.concurrency,
+        "requests": args.requests if args.requests or not args.duration else None,
+        "duration": args.duration or None,
+        "conditional": args.conditional,
+        "headers": headers,
+        "seed": args.seed,
+    }
+    if mix is not None:
+        options["mix"] = mix
+    samples, elapsed = asyncio.run(loadtest(args.target, args.workers, **options))
+
+    config = {**options, "target": args.target, "workers": args.workers, "mix": mix or "default"}
+    report = build_report(samples, elapsed, config)
+    text = json.dumps(report, indent=2) + "\n"
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text)
+    else:
+        sys.stdout.write(text)
+    latency = report["latency_ms"]
+    print(
+        f"{report['requests']} requests in {elapsed:.2f} s, {report['rps']:.0f} req/s, "
+        f"p50 {latency.get('p50', 0):.2f} ms, p99 {latency.get('p99', 0):.2f} ms, "
+        f"{report['error_count']} errors",
+        file=sys.stderr,
+    )
+    return 1 if report["error_count"] else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="portfolio")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="render the static site into a directory")
+    export.add_argument("--portfolio", default=DEFAULT_PORTFOLIO_PATH)
+    export.add_argument("--out", default="dist")
+    export.add_argument("--static", default="static")
+    export.add_argument("--clean", action="store_true", help="remove the output directory first")
+    export.add_argument(
+        "--avatar", action="store_true", help="serve the profile image as local resized variants"
+    )
+    export.add_argument(
+        "--avatar-dir", default=PORTFOLIO_AVATAR_DIR, help="cache for the avatar variants"
+    )
+    export.add_argument(
+        "--optimize-html",
+        action="store_true",
+        help="minify the pages and inline their critical CSS (default: PORTFOLIO_OPTIMIZE_HTML)",
+    )
+    export.set_defaults(handler=_export)
+
+    validate = commands.add_parser("validate", help="check portfolio files in parallel")
+    validate.add_argument("paths", nargs="+", help="files, directories or glob patterns")
+    validate.add_argument("--jobs", "-j", type=int, default=None, help="worker processes")
+    validate.add_argument("--cache", default=".portfolio-validate-cache.json")
+    validate.add_argument("--no-cache", action="store_true", help="validate every file")
+    validate.add_argument("--quiet", "-q", action="store_true", help="only report failures")
+    validate.set_defaults(handler=_validate)
+
+    startup = commands.add_parser(
+        "startup", help="time importing, warming up and the first request in fresh processes"
+    )
+    startup.add_argument("--path", default="/", help="path of the first request")
+    startup.add_argument("--runs", type=int, default=3, help="fresh processes to time")
+    startup.add_argument(
+        "--budget-ms",
+        type=float,
+        default=PORTFOLIO_STARTUP_BUDGET_MS,
+        help="fail when a run takes longer in total; 0 only reports",
+    )
+    startup.add_argument(
+        "--imports", type=int, default=10, help="slowest imports to list from the first run"
+    )
+    startup.set_defaults(handler=_startup)
+
+    loadtest = commands.add_parser(
+        "loadtest", help="measure latency and throughput under concurrent requests"
+    )
+    loadtest.add_argument(
+        "--target",
+        default="asgi",
+        help="asgi (in-process), server (start uvicorn) or http://host:port of a running server",
+    )
+    loadtest.add_argument("--workers", type=int, default=1, help="uvicorn workers for server")
+    loadtest.add_argument("--concurrency", "-c", type=int, default=16)
+    loadtest.add_argument("--requests", "-n", type=int, default=1000, help="0 for --duration only")
+    loadtest.add_argument("--duration", type=float, default=0, help="seconds to run at most")
+    loadtest.add_argument(
+        "--mix", help="weighted paths, e.g. '/=4,/api/skills=2' (default: page and every section)"
+    )
+    loadtest.add_argument(
+        "--conditional", type=float, default=0.0, help="share of requests sent with If-None-Match"
+    )
+    loadtest.add_argument(
+        "--header", "-H", action="append", default=[], help="extra request header 'Name: value'"
+    )
+    loadtest.add_argument("--seed", type=int, default=0)
+    loadtest.add_argument("--output", "-o", help="write the JSON report here instead of stdout")
+    loadtest.set_defaults(handler=_loadtest)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    logging.basicConfig(level=logging.INFO)
+    args = build_parser().parse_args(argv)
+    code: int = args.handler(args)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
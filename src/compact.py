@@ -0,0 +1,208 @@
+import sys
+import weakref
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from .data import (
+    Certification,
+    Education,
+    Experience,
+    PersonalInfo,
+    PortfolioData,
+    Skill,
+    parse_portfolio,
+)
+from .locales import match_locale
+from .processing import index_by
+from .search import SearchIndex
+
+# Strings that repeat across items (categories, companies, places, periods)
+# are interned so every item shares one copy.
+_intern = sys.intern
+
+
+@dataclass(frozen=True, slots=True)
+class CompactExperience:
+    company: str
+    position: str
+    duration: str
+    location: str
+    period: str
+    achievements: tuple[str, ...]
+
+    @classmethod
+    def from_model(cls, e: Experience) -> "CompactExperience":
+        return cls(
+            _intern(e.company),
+            e.position,
+            _intern(e.duration),
+            _intern(e.location),
+            _intern(e.period),
+            tuple(e.achievements),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class CompactEducation:
+    institution: str
+    degree: str
+    period: str
+    location: str
+
+    @classmethod
+    def from_model(cls, e: Education) -> "CompactEducation":
+        return cls(_intern(e.institution), e.degree, _intern(e.period), _intern(e.location))
+
+
+@dataclass(frozen=True, slots=True)
+class CompactSkill:
+    name: str
+    category: str
+    priority: int | None = None
+
+    @classmethod
+    def from_model(cls, s: Skill) -> "CompactSkill":
+        return cls(s.name, _intern(s.category), s.priority)
+
+
+@dataclass(frozen=True, slots=True)
+class CompactCertification:
+    name: str
+    issuer: str
+
+    @classmethod
+    def from_model(cls, c: Certification) -> "CompactCertification":
+        return cls(c.name, _intern(c.issuer))
+
+
+@dataclass(frozen=True, slots=True)
+class CompactPersonalInfo:
+    name: str
+    title: str
+    location: str
+    summary: str
+    email: str
+    linkedin: str
+    github: str
+    profile: str
+
+    @classmethod
+    def from_model(cls, p: PersonalInfo) -> "CompactPersonalInfo":
+        return cls(**p.model_dump())
+
+
+CompactItem = CompactExperience | CompactSkill | CompactEducation | CompactCertification
+
+
+@dataclass(frozen=True, slots=True)
+class CompactSearchHit:
+    section: str
+    score: float
+    item: CompactItem
+
+
+@dataclass(frozen=True, slots=True)
+class CompactPortfolio:
+    """Read-only serving form of a validated PortfolioData.
+
+    Same attributes and lookups as PortfolioData, held in slotted dataclasses
+    and tuples instead of pydantic models, with the search index shared.
+    """
+
+    version: str
+    personal: CompactPersonalInfo
+    experience: tuple[CompactExperience, ...]
+    education: tuple[CompactEducation, ...]
+    skills: tuple[CompactSkill, ...]
+    certifications: tuple[CompactCertification, ...]
+    skill_groups: dict[str, tuple[CompactSkill, ...]]
+    _skills_by_category: dict[str, tuple[CompactSkill, ...]]
+    _experience_by_company: dict[str, tuple[CompactExperience, ...]]
+    _search_index: SearchIndex
+    locale: str | None = None
+    locales: tuple[str, ...] = ()
+    _source: str | None = None
+    _variants: dict[str, "CompactPortfolio"] = field(default_factory=dict, compare=False)
+
+    @classmethod
+    def from_data(cls, portfolio_data: PortfolioData) -> "CompactPortfolio":
+        skills = tuple(CompactSkill.from_model(s) for s in portfolio_data.skills)
+        experience = tuple(CompactExperience.from_model(e) for e in portfolio_data.experience)
+        skill_groups = {
+            category: tuple(items)
+            for category, items in index_by(list(skills), lambda s: s.category).items()
+        }
+        # Most categories differ from the rest by more than case, so the
+        # grouped tuples are reused as the case-insensitive lookup.
+        skills_by_category = {}
+        for key, items in index_by(list(skills), lambda s: s.category.casefold()).items():
+            group = skill_groups[items[0].category]
+            skills_by_category[key] = group if len(group) == len(items) else tuple(items)
+        by_company = index_by(list(experience), lambda e: e.company.casefold())
+        return cls(
+            version=portfolio_data.version,
+            personal=CompactPersonalInfo.from_model(portfolio_data.personal),
+            experience=experience,
+            education=tuple(CompactEducation.from_model(e) for e in portfolio_data.education),
+            skills=skills,
+            certifications=tuple(
+                CompactCertification.from_model(c) for c in portfolio_data.certifications
+            ),
+            skill_groups=skill_groups,
+            _skills_by_category=skills_by_category,
+            _experience_by_company={key: tuple(items) for key, items in by_company.items()},
+            _search_index=portfolio_data._search_index,
+            locale=portfolio_data.locale,
+            locales=tuple(portfolio_data.locales),
+            _source=portfolio_data._source,
+        )
+
+    def locale_for(self, preferred: Iterable[str]) -> str | None:
+        """The declared locale best matching preferred tags, or None when not localized."""
+        return match_locale(preferred, self.locales) if self.locales else None
+
+    def variant(self, locale: str) -> "CompactPortfolio | None":
+        """This portfolio in locale if it needs no parsing, otherwise None."""
+        return self if locale == self.locale else self._variants.get(locale)
+
+    def localized(self, locale: str) -> "CompactPortfolio":
+        """This portfolio in locale, parsed from the source on first request and then kept."""
+        variant = self.variant(locale)
+        if variant is None:
+            if self._source is None:
+                return self
+            variant = CompactPortfolio.from_data(parse_portfolio(self._source, locale=locale))
+            variant = self._variants.setdefault(locale, variant)
+        return variant
+
+    def skills_in_category(self, category: str) -> tuple[CompactSkill, ...]:
+        return self._skills_by_category.get(category.casefold(), ())
+
+    def experience_at_company(self, company: str) -> tuple[CompactExperience, ...]:
+        return self._experience_by_company.get(company.casefold(), ())
+
+    def search(self, query: str, limit: int | None = None) -> list[CompactSearchHit]:
+        hits = []
+        for (section, position), score in self._search_index.search(query, limit):
+            item = getattr(self, section)[position]
+            hits.append(CompactSearchHit(section, round(score, 4), item))
+        return hits
+
+
+Portfolio = PortfolioData | CompactPortfolio
+
+_last: tuple["weakref.ref[PortfolioData]", CompactPortfolio] | None = None
+
+
+def compact_portfolio(portfolio_data: Portfolio) -> CompactPortfolio:
+    """The compact form of portfolio_data, reused while the same PortfolioData is passed."""
+    global _last
+
+    if isinstance(portfolio_data, CompactPortfolio):
+        return portfolio_data
+    last = _last
+    if last is not None and last[0]() is portfolio_data:
+        return last[1]
+    compact = CompactPortfolio.from_data(portfolio_data)
+    _last = (weakref.ref(portfolio_data), compact)
+    return compact
@@ -0,0 +1,160 @@
+import functools
+import html
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+# The hero is the last section shown before the visitor scrolls; everything up to its
+# end is above the fold.
+FOLD_END = "</section>"
+
+_TAG = re.compile(r"<([a-zA-Z][a-zA-Z0-9]*)([^>]*)>")
+_CLASS_ATTR = re.compile(r"\bclass=\"([^\"]*)\"")
+_ID_ATTR = re.compile(r"\bid=\"([^\"]*)\"")
+_PSEUDO = re.compile(r"::?[a-zA-Z-]+(?:\([^)]*\))?")
+_ATTRIBUTE = re.compile(r"\[[^\]]*\]")
+_SELECTOR_CLASS = re.compile(r"\.([\w-]+)")
+_SELECTOR_ID = re.compile(r"#([\w-]+)")
+_SELECTOR_TAG = re.compile(r"(?:^|[\s>+~])([a-zA-Z][a-zA-Z0-9]*)")
+_KEYFRAMES = re.compile(r"@(?:-webkit-)?keyframes\s+([\w-]+)")
+_STYLESHEET_LINK = re.compile(r"<link\b(?=[^>]*\brel=\"stylesheet\")[^>]*>")
+_HREF = re.compile(r"\bhref=\"([^\"]*)\"")
+
+
+@dataclass(frozen=True, slots=True)
+class _Rule:
+    prelude: str
+    body: str
+
+    @property
+    def nested(self) -> bool:
+        return self.prelude.startswith("@")
+
+
+def _rules(css: str) -> Iterator[_Rule]:
+    """Top-level rules of minified CSS, with at-rule bodies left unparsed."""
+    position = 0
+    while True:
+        start = css.find("{", position)
+        if start == -1:
+            return
+        depth = 0
+        quote = None
+        for end in range(start, len(css)):
+            char = css[end]
+            if quote is not None:
+                if char == quote and css[end - 1] != "\\":
+                    quote = None
+            elif char in "'\"":
+                quote = char
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    break
+        else:
+            return
+        yield _Rule(css[position:start].strip(), css[start + 1 : end])
+        position = end + 1
+
+
+@dataclass(frozen=True, slots=True)
+class _Used:
+    tags: frozenset[str]
+    classes: frozenset[str]
+    ids: frozenset[str]
+
+    @classmethod
+    def from_html(cls, markup: str) -> "_Used":
+        tags: set[str] = set()
+        classes: set[str] = set()
+        ids: set[str] = set()
+        for match in _TAG.finditer(markup):
+            tags.add(match.group(1).lower())
+            attributes = match.group(2)
+            for value in _CLASS_ATTR.findall(attributes):
+                classes.update(html.unescape(value).split())
+            ids.update(html.unescape(value) for value in _ID_ATTR.findall(attributes))
+        return cls(frozenset(tags), frozenset(classes), frozenset(ids))
+
+    def matches(self, selector: str) -> bool:
+        # Only the parts a selector requires are checked, so pseudo-classes such as
+        # :hover and attribute selectors keep rules of elements that are present.
+        simple = _ATTRIBUTE.sub("", _PSEUDO.sub("", selector))
+        return (
+            all(name in self.classes for name in _SELECTOR_CLASS.findall(simple))
+            and all(name in self.ids for name in _SELECTOR_ID.findall(simple))
+            and all(name.lower() in self.tags for name in _SELECTOR_TAG.findall(simple))
+        )
+
+
+@functools.lru_cache(maxsize=16)
+def _parsed(css: str) -> tuple[_Rule, ...]:
+    return tuple(_rules(css))
+
+
+def _critical_rules(css: str, used: _Used) -> list[str]:
+    kept = []
+    for rule in _parsed(css):
+        if rule.prelude.startswith(("@media", "@supports")):
+            inner = _critical_rules(rule.body, used)
+            if inner:
+                kept.append(f"{rule.prelude}{{{''.join(inner)}}}")
+        elif not rule.nested and any(used.matches(s) for s in rule.prelude.split(",")):
+            kept.append(f"{rule.prelude}{{{rule.body}}}")
+    return kept
+
+
+def critical_css(css: str, page: str) -> str:
+    """The rules of css that apply to elements above the fold of page.
+
+    Selectors match when every tag, class and id they name appears in that part of
+    the page; keyframes are kept when a kept rule names them.
+    """
+    body = page.find("<body")
+    fold = page.find(FOLD_END, body)
+    return _critical_css(css, _Used.from_html(page[: fold + len(FOLD_END)] if fold != -1 else page))
+
+
+# Pages of later versions mostly use the same elements above the fold, so their
+# critical CSS is usually already known.
+@functools.lru_cache(maxsize=64)
+def _critical_css(css: str, used: _Used) -> str:
+    critical = "".join(_critical_rules(css, used))
+    keyframes = [
+        f"{rule.prelude}{{{rule.body}}}"
+        for rule in _parsed(css)
+        if (name := _KEYFRAMES.match(rule.prelude)) and re.search(rf"\b{name.group(1)}\b", critical)
+    ]
+    return critical + "".join(keyframes)
+
+
+def _async_stylesheet(href: str) -> str:
+    return (
+        f'<link rel="preload" href="{href}" as="style" '
+        "onload=\"this.onload=null;this.rel='stylesheet'\">"
+        f'<noscript><link rel="stylesheet" href="{href}"></noscript>'
+    )
+
+
+def inline_critical_css(page: str, css: str) -> str:
+    """Inline the critical part of css into page and load every stylesheet without blocking.
+
+    The inline rules go where the first stylesheet was linked, so the cascade order
+    is unchanged once the full stylesheets arrive.
+    """
+    head_end = page.find("</head>")
+    head = page[:head_end] if head_end != -1 else ""
+    links = list(_STYLESHEET_LINK.finditer(head))
+    if not links:
+        return page
+    parts = [page[: links[0].start()], f"<style>{critical_css(css, page)}</style>"]
+    position = links[0].start()
+    for link in links:
+        href = _HREF.search(link.group())
+        parts.append(page[position : link.start()])
+        parts.append(_async_stylesheet(href.group(1)) if href else link.group())
+        position = link.end()
+    parts.append(page[position:])
+    return "".join(parts)
@@ -1,19 +1,47 @@
+import asyncio
+import hashlib
 import logging
+import os
+import pickle  # nosec B403
+import tempfile
+from collections.abc import Callable, Iterator
 
+import pydantic
 import yaml
-from pydantic import BaseModel, model_validator
+from pydantic import (
+    BaseModel,
+    Field,
+    PrivateAttr,
+    ValidationError,
+    ValidationInfo,
+    model_validator,
+)
 
-from config import DEFAULT_PORTFOLIO_PATH
+from config import DEFAULT_PORTFOLIO_PATH, PORTFOLIO_SNAPSHOT_DIR
 
+from .locales import localize_document
+from .metrics import stage
+from .processing import (
+    group_skills as _group_skills,
+)
+from .processing import (
+    index_by as _index_by,
+)
 from .processing import (
     process_skills as _process_skills,
 )
 from .processing import (
     sort_skills as _sort_skills,
 )
+from .search import Document, SearchIndex
 
 logger = logging.getLogger(__name__)
 
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Bump whenever the models or their validators change what a validated PortfolioData holds.
+SNAPSHOT_SCHEMA_VERSION = 6
+
 
 class Experience(BaseModel):
     company: str
@@ -37,6 +65,12 @@ class Skill(BaseModel):
     priority: int | None = None
 
 
+class SkillGroup(BaseModel):
+    category: str
+    priority: int | None = None
+    values: list[str]
+
+
 class Certification(BaseModel):
     name: str
     issuer: str
@@ -53,12 +87,53 @@ class PersonalInfo(BaseModel):
     profile: str
 
 
+class SearchHit(BaseModel):
+    section: str
+    score: float
+    item: Experience | Skill | Education | Certification
+
+
 class PortfolioData(BaseModel):
     personal: PersonalInfo
     experience: list[Experience]
     education: list[Education]
     skills: list[Skill]
     certifications: list[Certification]
+    # Set from the document's `locales` list: the locale values were resolved for, default first.
+    locale: str | None = Field(default=None, exclude=True)
+    locales: list[str] = Field(default_factory=list, exclude=True)
+
+    _version: str | None = PrivateAttr(default=None)
+    # YAML source of a localized portfolio, kept to build its other locales on demand.
+    _source: str | None = PrivateAttr(default=None)
+    _skill_groups: dict[str, list[Skill]] = PrivateAttr(default_factory=dict)
+    _skills_by_category: dict[str, list[Skill]] = PrivateAttr(default_factory=dict)
+    _experience_by_company: dict[str, list[Experience]] = PrivateAttr(default_factory=dict)
+    _search_index: SearchIndex = PrivateAttr(default_factory=SearchIndex)
+
+    @property
+    def version(self) -> str:
+        if self._version is None:
+            self._version = content_digest(self.model_dump_json().encode("utf-8"))
+        return self._version
+
+    @property
+    def skill_groups(self) -> dict[str, list[Skill]]:
+        """Skills grouped by category, in display order."""
+        return self._skill_groups
+
+    def skills_in_category(self, category: str) -> list[Skill]:
+        return self._skills_by_category.get(category.casefold(), [])
+
+    def experience_at_company(self, company: str) -> list[Experience]:
+        return self._experience_by_company.get(company.casefold(), [])
+
+    def search(self, query: str, limit: int | None = None) -> list[SearchHit]:
+        hits = []
+        for (section, position), score in self._search_index.search(query, limit):
+            item = getattr(self, section)[position]
+            hits.append(SearchHit(section=section, score=round(score, 4), item=item))
+        return hits
 
     @model_validator(mode="before")
     @classmethod
@@ -71,13 +146,163 @@ class PortfolioData(BaseModel):
                 raise exc
         return data
 
+    # Defined after _normalize_grouped_skills so it runs first, on the raw document.
+    @model_validator(mode="before")
+    @classmethod
+    def _resolve_locale(cls, data: object, info: ValidationInfo) -> object:
+        if isinstance(data, dict) and "locales" in data and "locale" not in data:
+            return localize_document(data, (info.context or {}).get("locale"))
+        return data
+
     @model_validator(mode="after")
     def _sort_skills_model(self) -> "PortfolioData":
         self.skills = _sort_skills(self.skills)
+        self._skill_groups = _group_skills(self.skills)
+        return self
+
+    @model_validator(mode="after")
+    def _build_indexes(self) -> "PortfolioData":
+        self._skills_by_category = _index_by(self.skills, lambda s: s.category.casefold())
+        self._experience_by_company = _index_by(self.experience, lambda e: e.company.casefold())
+        with stage("search_index"):
+            self._search_index = SearchIndex(self._search_documents())
         return self
 
+    def _search_documents(self) -> Iterator[Document]:
+        for i, e in enumerate(self.experience):
+            fields = [(e.company, 3.0), (e.position, 3.0), (e.location, 1.0)]
+            yield ("experience", i), fields + [(a, 1.0) for a in e.achievements]
+        for i, s in enumerate(self.skills):
+            yield ("skills", i), [(s.name, 3.0), (s.category, 2.0)]
+        for i, ed in enumerate(self.education):
+            yield ("education", i), [(ed.institution, 3.0), (ed.degree, 2.0), (ed.location, 1.0)]
+        for i, c in enumerate(self.certifications):
+            yield ("certifications", i), [(c.name, 3.0), (c.issuer, 2.0)]
+
+
+PORTFOLIO_ERRORS = (OSError, yaml.YAMLError, ValidationError, ValueError, TypeError)
 
 _portfolio_data: PortfolioData | None = None
+_portfolio_stamp: tuple[int, int] | None = None
+
+
+def content_digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()[:16]
+
+
+def _snapshot_suffix() -> str:
+    return f"-s{SNAPSHOT_SCHEMA_VERSION}-p{pydantic.VERSION}.pickle"
+
+
+def snapshot_path(snapshot_dir: str, version: str, locale: str | None = None) -> str:
+    tag = f"{version}-{locale}" if locale else version
+    return os.path.join(snapshot_dir, tag + _snapshot_suffix())
+
+
+def read_snapshot(
+    snapshot_dir: str, version: str, locale: str | None = None
+) -> PortfolioData | None:
+    """Load an already validated PortfolioData written by write_snapshot, if present."""
+    path = snapshot_path(snapshot_dir, version, locale)
+    try:
+        with open(path, "rb") as file:
+            # Snapshots are only ever written by this process family into a local directory.
+            portfolio_data = pickle.load(file)  # nosec B301
+    except FileNotFoundError:
+        return None
+    except Exception as exc:
+        logger.warning("Ignoring unreadable snapshot %s: %s", path, exc)
+        return None
+
+    if not isinstance(portfolio_data, PortfolioData) or portfolio_data.version != version:
+        logger.warning("Ignoring mismatched snapshot %s", path)
+        return None
+    return portfolio_data
+
+
+def write_snapshot(
+    snapshot_dir: str, portfolio_data: PortfolioData, locale: str | None = None
+) -> bool:
+    path = snapshot_path(snapshot_dir, portfolio_data.version, locale)
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=snapshot_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            pickle.dump(portfolio_data, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        logger.warning("Cannot write snapshot %s: %s", path, exc)
+        return False
+    return True
+
+
+def prune_snapshots(snapshot_dir: str, source: str, version: str) -> None:
+    """Delete the snapshots of source's previous version, now that version is written.
+
+    The last version written for each source is kept in a marker file, so the
+    locale variants of the old version go too, as do snapshots of version left
+    by another schema or pydantic version. Another source with the same content
+    just writes its snapshot again.
+    """
+    marker = os.path.join(
+        snapshot_dir, content_digest(os.path.abspath(source).encode()) + ".current"
+    )
+    try:
+        with open(marker, encoding="ascii") as file:
+            previous = file.read().strip()
+    except OSError:
+        previous = ""
+    suffix = _snapshot_suffix()
+    try:
+        for name in os.listdir(snapshot_dir):
+            if not name.endswith(".pickle"):
+                continue
+            replaced = previous not in ("", version) and name.startswith(f"{previous}-")
+            if replaced or (name.startswith(f"{version}-") and not name.endswith(suffix)):
+                os.remove(os.path.join(snapshot_dir, name))
+        if previous != version:
+            fd, tmp_path = tempfile.mkstemp(dir=snapshot_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="ascii") as file:
+                file.write(version)
+            os.replace(tmp_path, marker)
+    except OSError as exc:
+        logger.warning("Cannot prune snapshots in %s: %s", snapshot_dir, exc)
+
+
+def parse_portfolio(
+    content: str,
+    snapshot_dir: str = PORTFOLIO_SNAPSHOT_DIR,
+    locale: str | None = None,
+    source: str | None = None,
+) -> PortfolioData:
+    """Validate a portfolio document, resolving localized values for locale (default first).
+
+    source, the path content was read from, lets its outdated snapshots be deleted.
+    """
+    version = content_digest(content.encode("utf-8"))
+    if snapshot_dir:
+        with stage("snapshot"):
+            snapshot = read_snapshot(snapshot_dir, version, locale)
+        if snapshot is not None:
+            return snapshot
+
+    with stage("yaml"):
+        yaml_data = yaml.load(content, Loader=SafeLoader)
+
+    with stage("validate"):
+        portfolio_data = PortfolioData.model_validate(yaml_data, context={"locale": locale})
+    portfolio_data._version = version
+    if portfolio_data.locales:
+        portfolio_data._source = content
+
+    if snapshot_dir and write_snapshot(snapshot_dir, portfolio_data, locale) and source:
+        prune_snapshots(snapshot_dir, source, version)
+    return portfolio_data
+
+
+def current_portfolio_data() -> PortfolioData | None:
+    """The loaded portfolio, without touching the disk."""
+    return _portfolio_data
 
 
 def load_portfolio_data(
@@ -89,11 +314,69 @@ def load_portfolio_data(
         return _portfolio_data
 
     with open(profile_path, encoding="utf-8") as file:
-        yaml_data = yaml.safe_load(file)
+        content = file.read()
 
-    portfolio_data = PortfolioData(**yaml_data)
+    portfolio_data = parse_portfolio(content, source=profile_path)
 
     if use_cache:
         _portfolio_data = portfolio_data
 
     return portfolio_data
+
+
+def reload_portfolio_data(profile_path: str = DEFAULT_PORTFOLIO_PATH) -> PortfolioData | None:
+    """Swap in a fresh PortfolioData if the file changed since the last check.
+
+    Returns the new data when a swap happened. Broken edits are logged and the
+    last good data keeps being served.
+    """
+    global _portfolio_data, _portfolio_stamp
+
+    try:
+        stat = os.stat(profile_path)
+    except OSError as exc:
+        logger.warning("Cannot stat %s: %s", profile_path, exc)
+        return None
+
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    if stamp == _portfolio_stamp and _portfolio_data is not None:
+        return None
+
+    try:
+        with open(profile_path, encoding="utf-8") as file:
+            content = file.read()
+    except OSError as exc:
+        logger.warning("Cannot read %s: %s", profile_path, exc)
+        return None
+
+    _portfolio_stamp = stamp
+    current = _portfolio_data
+    if current is not None and current.version == content_digest(content.encode("utf-8")):
+        return None
+
+    try:
+        portfolio_data = parse_portfolio(content, source=profile_path)
+    except PORTFOLIO_ERRORS as exc:
+        logger.error("Keeping previous portfolio data, %s is invalid: %s", profile_path, exc)
+        return None
+
+    _portfolio_data = portfolio_data
+    return portfolio_data
+
+
+async def watch_portfolio_data(
+    profile_path: str = DEFAULT_PORTFOLIO_PATH,
+    interval: float = 1.0,
+    on_change: Callable[[PortfolioData], None] | None = None,
+    loaded_only: bool = False,
+) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        if loaded_only and _portfolio_data is None:
+            continue
+        portfolio_data = await asyncio.to_thread(reload_portfolio_data, profile_path)
+        if portfolio_data is None:
+            continue
+        logger.info("Reloaded %s (version %s)", profile_path, portfolio_data.version)
+        if on_change is not None:
+            on_change(portfolio_data)
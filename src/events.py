@@ -0,0 +1,147 @@
+import asyncio
+import contextlib
+import json
+import logging
+from collections.abc import AsyncGenerator, Awaitable, Callable
+
+from .compact import CompactPortfolio
+from .rendering import PAGE_SECTIONS, render_fragments
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 1.0
+KEEPALIVE_INTERVAL = 15.0
+RETRY_MS = 3000
+
+Loader = Callable[[], Awaitable[CompactPortfolio | None]]
+
+
+def format_event(event: str, data: object, event_id: str | None = None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class Channel:
+    """Live state of one portfolio, shared by every connection watching it.
+
+    A single poller per channel checks for a new version and renders the page
+    fragments once; idle connections only wait on a shared event, which the
+    poller also fires for keepalives.
+    """
+
+    def __init__(self, load: Loader) -> None:
+        self.load = load
+        self.version: str | None = None
+        self.previous_version: str | None = None
+        self.fragments: dict[str, str] = {}
+        self.changed: list[str] = []
+        self._messages: dict[str, str] = {}
+        self.subscribers = 0
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    def _notify(self) -> None:
+        wakeup, self._wakeup = self._wakeup, asyncio.Event()
+        wakeup.set()
+
+    async def refresh(self) -> bool:
+        portfolio_data = await self.load()
+        if portfolio_data is None or portfolio_data.version == self.version:
+            return False
+        fragments = await asyncio.to_thread(render_fragments, portfolio_data)
+        self.changed = [
+            name for name in PAGE_SECTIONS if fragments[name] != self.fragments.get(name)
+        ]
+        self.previous_version, self.version = self.version, portfolio_data.version
+        self.fragments = fragments
+        self._messages = {}
+        self._notify()
+        return True
+
+    async def _poll(self, interval: float, keepalive: float) -> None:
+        idle = 0.0
+        while True:
+            try:
+                changed = await self.refresh()
+            except Exception:
+                logger.exception("Live update check failed")
+                changed = False
+            idle = 0.0 if changed else idle + interval
+            if idle >= keepalive:
+                idle = 0.0
+                self._notify()
+            await asyncio.sleep(interval)
+
+    def _message(self, known: str | None) -> str:
+        # Connections that saw the previous version only need the changed
+        # sections; anyone else gets them all. Both are encoded once per version.
+        key = "changed" if known == self.previous_version else "all"
+        message = self._messages.get(key)
+        if message is None:
+            sections = self.changed if key == "changed" else PAGE_SECTIONS
+            events = [format_event("version", {"version": self.version}, self.version)]
+            for name in sections:
+                events.append(format_event("section", {"id": name, "html": self.fragments[name]}))
+            message = self._messages[key] = "".join(events)
+        return message
+
+    async def subscribe(
+        self,
+        known: str | None,
+        interval: float = POLL_INTERVAL,
+        keepalive: float = KEEPALIVE_INTERVAL,
+    ) -> AsyncGenerator[str, None]:
+        """Yield SSE messages for versions after known, with a comment line as keepalive."""
+        self.subscribers += 1
+        if self._task is None:
+            self._task = asyncio.create_task(self._poll(interval, keepalive))
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            woken = False
+            while True:
+                wakeup = self._wakeup
+                if self.version is not None and known != self.version:
+                    message = self._message(known)
+                    known = self.version
+                    yield message
+                elif woken:
+                    yield ": keepalive\n\n"
+                await wakeup.wait()
+                woken = True
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and self._task is not None:
+                task, self._task = self._task, None
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+
+
+class Broadcaster:
+    """Channels by portfolio key, dropped once their last connection closes."""
+
+    def __init__(self) -> None:
+        self.channels: dict[str, Channel] = {}
+
+    async def subscribe(
+        self, key: str, load: Loader, known: str | None
+    ) -> AsyncGenerator[str, None]:
+        channel = self.channels.get(key)
+        if channel is None:
+            channel = self.channels[key] = Channel(load)
+        try:
+            async with contextlib.aclosing(channel.subscribe(known)) as messages:
+                async for message in messages:
+                    yield message
+        finally:
+            if channel.subscribers == 0 and self.channels.get(key) is channel:
+                del self.channels[key]
+
+    def __len__(self) -> int:
+        return sum(channel.subscribers for channel in self.channels.values())
+
+
+broadcaster = Broadcaster()
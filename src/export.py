@@ -0,0 +1,94 @@
+import logging
+import shutil
+from collections.abc import Callable
+from pathlib import Path
+
+from config import DEFAULT_PORTFOLIO_PATH
+
+from .assets import STATIC_DIR, AssetBundle, build_assets
+from .avatars import ingest_avatar
+from .cache import CachedBody, compress_brotli, compress_gzip
+from .data import PortfolioData, load_portfolio_data, parse_portfolio
+from .rendering import API_SECTIONS, render_index, serialize_section
+
+logger = logging.getLogger(__name__)
+
+
+def _write(path: Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    path.with_name(path.name + ".gz").write_bytes(compress_gzip(content, level=9))
+    br = compress_brotli(content, quality=11)
+    if br is not None:
+        path.with_name(path.name + ".br").write_bytes(br)
+
+
+def _write_asset(path: Path, asset: CachedBody) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(asset.body)
+    for suffix, variant in ((".gz", asset.gzip), (".br", asset.br)):
+        if variant is not None:
+            path.with_name(path.name + suffix).write_bytes(variant)
+
+
+def _write_pages(
+    out: Path,
+    portfolio_data: PortfolioData,
+    bundle: AssetBundle,
+    asset_url: Callable[[str], str],
+    optimize: bool | None,
+) -> list[Path]:
+    page = render_index(portfolio_data, asset_url, False, optimize, bundle)
+    index = out / "index.html"
+    _write(index, page.encode("utf-8"))
+    written = [index]
+    for section in API_SECTIONS:
+        path = out / "api" / f"{section}.json"
+        _write(path, serialize_section(portfolio_data, section))
+        written.append(path)
+    return written
+
+
+def export_site(
+    out_dir: str = "dist",
+    profile_path: str = DEFAULT_PORTFOLIO_PATH,
+    static_dir: str = STATIC_DIR,
+    clean: bool = False,
+    avatar_dir: str | None = None,
+    optimize: bool | None = None,
+) -> list[Path]:
+    """Render the site and its JSON API into out_dir without running a server.
+
+    With avatar_dir (possibly empty, for no cache) the profile image is
+    ingested and its variants exported under static/avatars/. optimize overrides
+    PORTFOLIO_OPTIMIZE_HTML for the pages.
+    """
+    out = Path(out_dir)
+    if clean and out.exists():
+        shutil.rmtree(out)
+
+    portfolio_data = load_portfolio_data(profile_path, use_cache=False)
+    bundle = build_assets(static_dir)
+    written: list[Path] = []
+
+    assets = dict(bundle.files)
+    if avatar_dir is not None:
+        avatar = ingest_avatar(portfolio_data.personal.profile, avatar_dir)
+        if avatar is not None:
+            assets.update(avatar.files)
+    for name, asset in assets.items():
+        path = out / "static" / name
+        _write_asset(path, asset)
+        written.append(path)
+
+    written += _write_pages(out, portfolio_data, bundle, bundle.url, optimize)
+    # Non-default locales get their own tree, like the /<locale>/ prefix served live.
+    source = portfolio_data._source
+    for locale in portfolio_data.locales[1:]:
+        localized = parse_portfolio(source, locale=locale) if source else portfolio_data
+        written += _write_pages(
+            out / locale, localized, bundle, lambda name: "../" + bundle.url(name)[2:], optimize
+        )
+
+    logger.info("Exported %d files to %s (version %s)", len(written), out, portfolio_data.version)
+    return written
@@ -0,0 +1,371 @@
+import asyncio
+import bisect
+import contextlib
+import random
+import socket
+import subprocess  # nosec B404
+import sys
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Callable, Sequence
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+from .asgi import lifespan, request
+from .metrics import BUCKETS
+
+# Weighted like a visit: the page most, then the full document and the lists it shows.
+DEFAULT_MIX = {
+    "/": 4.0,
+    "/api/portfolio": 2.0,
+    "/api/experience": 1.0,
+    "/api/skills": 2.0,
+    "/api/education": 1.0,
+    "/api/certifications": 1.0,
+}
+DEFAULT_HEADERS = (("accept-encoding", "br, gzip"),)
+SERVER_STARTUP_TIMEOUT = 30.0
+REQUEST_TIMEOUT = 30.0
+
+
+@dataclass(frozen=True, slots=True)
+class Reply:
+    status: int
+    etag: str | None
+    size: int
+
+
+@dataclass(frozen=True, slots=True)
+class Sample:
+    path: str
+    seconds: float
+    status: int = 0
+    size: int = 0
+    conditional: bool = False
+    # Exception class name when no response arrived.
+    error: str | None = None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None or self.status >= 400
+
+
+class Connection(Protocol):
+    async def get(self, path: str, headers: Sequence[tuple[str, str]]) -> Reply: ...
+
+    async def close(self) -> None: ...
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """Weights from "path=weight,..."; a path without a numeric weight after its last = gets 1."""
+    mix: dict[str, float] = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        path, _, weight = part.rpartition("=")
+        try:
+            value = float(weight) if path else 1.0
+        except ValueError:
+            path, value = part, 1.0
+        path = path or part
+        if not path.startswith("/"):
+            raise ValueError(f"mix path must start with '/': {path!r}")
+        if value <= 0:
+            raise ValueError(f"mix weight for {path} must be positive")
+        mix[path] = value
+    if not mix:
+        raise ValueError("mix needs at least one path")
+    return mix
+
+
+def parse_target(target: str) -> tuple[str, int] | None:
+    """The address of an http://host:port target, or None for "asgi" and "server"."""
+    if target in ("asgi", "server"):
+        return None
+    scheme, _, address = target.partition("://")
+    host, _, port = address.rstrip("/").rpartition(":")
+    if scheme != "http" or not host or not port.isdigit():
+        raise ValueError(f"target must be asgi, server or http://host:port, not {target!r}")
+    return host, int(port)
+
+
+def parse_header(spec: str) -> tuple[str, str]:
+    name, colon, value = spec.partition(":")
+    if not colon or not name.strip():
+        raise ValueError(f"header must look like 'Name: value': {spec!r}")
+    return name.strip(), value.strip()
+
+
+class ASGIConnection:
+    """Requests handled by the app in this process, with no network in between."""
+
+    def __init__(self, app: Any, state: dict[str, Any]) -> None:
+        self.app = app
+        self.state = state
+
+    async def get(self, path: str, headers: Sequence[tuple[str, str]]) -> Reply:
+        response = await request(self.app, path, headers, self.state)
+        return Reply(response.status, response.header("etag"), len(response.body))
+
+    async def close(self) -> None:
+        return None
+
+
+class HTTPConnection:
+    """A minimal keep-alive HTTP/1.1 client for one connection to a local server."""
+
+    def __init__(self, host: str, port: int, timeout: float = REQUEST_TIMEOUT) -> None:
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def get(self, path: str, headers: Sequence[tuple[str, str]]) -> Reply:
+        # A kept-alive connection the server has meanwhile closed is retried once on a new one.
+        reused = self._writer is not None
+        try:
+            return await asyncio.wait_for(self._exchange(path, headers), self.timeout)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            await self.close()
+            if not reused:
+                raise
+        return await asyncio.wait_for(self._exchange(path, headers), self.timeout)
+
+    async def _exchange(self, path: str, headers: Sequence[tuple[str, str]]) -> Reply:
+        if self._reader is None or self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        reader, writer = self._reader, self._writer
+        names = {name.lower() for name, _ in headers}
+        lines = [f"GET {path} HTTP/1.1"]
+        if "host" not in names:
+            lines.append(f"Host: {self.host}:{self.port}")
+        lines.extend(f"{name}: {value}" for name, value in headers)
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+        status = int((await reader.readuntil(b"\r\n")).split()[1])
+        fields: dict[str, str] = {}
+        while (line := await reader.readuntil(b"\r\n")) != b"\r\n":
+            name, _, value = line.decode("latin-1").partition(":")
+            fields[name.strip().lower()] = value.strip()
+
+        size = 0
+        if status in (204, 304) or status < 200:
+            pass
+        elif fields.get("transfer-encoding", "").lower() == "chunked":
+            while chunk := int((await reader.readuntil(b"\r\n")).split(b";")[0], 16):
+                size += len(await reader.readexactly(chunk + 2)) - 2
+            while await reader.readuntil(b"\r\n") != b"\r\n":
+                pass
+        elif "content-length" in fields:
+            size = len(await reader.readexactly(int(fields["content-length"])))
+        else:
+            size = len(await reader.read())
+            fields["connection"] = "close"
+        if fields.get("connection", "").lower() == "close":
+            await self.close()
+        return Reply(status, fields.get("etag"), size)
+
+    async def close(self) -> None:
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+
+def _percentile(ordered: Sequence[float], fraction: float) -> float:
+    # Nearest rank, so every reported value is one that was measured.
+    return ordered[max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))]
+
+
+def _latency(seconds: Sequence[float]) -> dict[str, float]:
+    if not seconds:
+        return {}
+    ordered = sorted(seconds)
+    return {
+        "min": ordered[0] * 1000,
+        "mean": sum(ordered) / len(ordered) * 1000,
+        "p50": _percentile(ordered, 0.50) * 1000,
+        "p90": _percentile(ordered, 0.90) * 1000,
+        "p99": _percentile(ordered, 0.99) * 1000,
+        "max": ordered[-1] * 1000,
+    }
+
+
+def build_report(
+    samples: Sequence[Sample], elapsed: float, config: dict[str, Any]
+) -> dict[str, Any]:
+    """The JSON load test report: throughput, errors, latency percentiles and histogram."""
+    buckets = [0] * (len(BUCKETS) + 1)
+    for sample in samples:
+        buckets[bisect.bisect_left(BUCKETS, sample.seconds)] += 1
+    errors = Counter(sample.error or f"HTTP {sample.status}" for sample in samples if sample.failed)
+    paths = {}
+    for path in sorted({sample.path for sample in samples}):
+        selected = [sample for sample in samples if sample.path == path]
+        paths[path] = {
+            "requests": len(selected),
+            "errors": sum(sample.failed for sample in selected),
+            "latency_ms": _latency([sample.seconds for sample in selected]),
+        }
+    return {
+        "config": config,
+        "requests": len(samples),
+        "elapsed_s": elapsed,
+        "rps": len(samples) / elapsed if elapsed > 0 else 0.0,
+        "bytes": sum(sample.size for sample in samples),
+        "conditional": sum(sample.conditional for sample in samples),
+        "status": dict(sorted(Counter(str(s.status) for s in samples if s.error is None).items())),
+        "errors": dict(sorted(errors.items())),
+        "error_count": sum(errors.values()),
+        "latency_ms": _latency([sample.seconds for sample in samples]),
+        "histogram": [
+            {"le_ms": bound * 1000 if isinstance(bound, float) else bound, "count": count}
+            for bound, count in zip((*BUCKETS, "+Inf"), buckets, strict=True)
+        ],
+        "paths": paths,
+    }
+
+
+async def run_load(
+    connect: Callable[[], Connection],
+    mix: dict[str, float] = DEFAULT_MIX,
+    concurrency: int = 16,
+    requests: int | None = 1000,
+    duration: float | None = None,
+    conditional: float = 0.0,
+    headers: Sequence[tuple[str, str]] = DEFAULT_HEADERS,
+    seed: int = 0,
+) -> tuple[list[Sample], float]:
+    """Send requests from concurrency workers until requests are sent or duration has passed.
+
+    conditional is the share of requests revalidating, with If-None-Match, a path
+    whose ETag an earlier response returned.
+    """
+    if requests is None and duration is None:
+        raise ValueError("set requests, duration or both")
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if not 0.0 <= conditional <= 1.0:
+        raise ValueError("conditional must be between 0 and 1")
+    # Only picks paths and conditional requests, reproducibly from seed; nothing secret.
+    rng = random.Random(seed)  # nosec B311
+    paths, weights = list(mix), list(mix.values())
+    etags: dict[str, str] = {}
+    samples: list[Sample] = []
+    started = 0
+    start = time.perf_counter()
+    deadline = start + duration if duration is not None else None
+
+    def more() -> bool:
+        if requests is not None and started >= requests:
+            return False
+        return deadline is None or time.perf_counter() < deadline
+
+    async def worker() -> None:
+        nonlocal started
+        connection = connect()
+        try:
+            while more():
+                started += 1
+                path = rng.choices(paths, weights)[0]
+                etag = etags.get(path) if rng.random() < conditional else None
+                sent = [*headers, ("if-none-match", etag)] if etag else list(headers)
+                begin = time.perf_counter()
+                try:
+                    reply = await connection.get(path, sent)
+                except Exception as exc:
+                    samples.append(
+                        Sample(path, time.perf_counter() - begin, error=type(exc).__name__)
+                    )
+                    await connection.close()
+                    continue
+                seconds = time.perf_counter() - begin
+                if reply.etag is not None:
+                    etags[path] = reply.etag
+                samples.append(
+                    Sample(path, seconds, reply.status, reply.size, conditional=etag is not None)
+                )
+        finally:
+            await connection.close()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - start
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+@contextlib.asynccontextmanager
+async def uvicorn_server(workers: int = 1, port: int = 0) -> AsyncIterator[tuple[str, int]]:
+    """Start `uvicorn src.main:app` on localhost and yield its address once it is ready."""
+    port = port or free_port()
+    process = subprocess.Popen(  # nosec B603
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "src.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ]
+    )
+    try:
+        await _wait_ready(process, "127.0.0.1", port)
+        yield "127.0.0.1", port
+    finally:
+        process.terminate()
+        try:
+            await asyncio.to_thread(process.wait, 10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def _wait_ready(process: "subprocess.Popen[bytes]", host: str, port: int) -> None:
+    deadline = time.monotonic() + SERVER_STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+        connection = HTTPConnection(host, port, timeout=1.0)
+        try:
+            if (await connection.get("/readyz", ())).status == 200:
+                return
+        except (TimeoutError, OSError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            await connection.close()
+        await asyncio.sleep(0.1)
+    raise RuntimeError(f"uvicorn was not ready within {SERVER_STARTUP_TIMEOUT:.0f} s")
+
+
+async def loadtest(
+    target: str = "asgi",
+    workers: int = 1,
+    **options: Any,
+) -> tuple[list[Sample], float]:
+    """Run run_load against the app in-process ("asgi"), a new uvicorn ("server") or a URL.
+
+    A URL target is http://host:port of a server that is already running.
+    """
+    address = parse_target(target)
+    if address is not None:
+        host, port = address
+        return await run_load(lambda: HTTPConnection(host, port), **options)
+    if target == "asgi":
+        from .main import app
+
+        async with lifespan(app) as state:
+            return await run_load(lambda: ASGIConnection(app, state), **options)
+    async with uvicorn_server(workers) as (server_host, server_port):
+        return await run_load(lambda: HTTPConnection(server_host, server_port), **options)
@@ -0,0 +1,113 @@
+import re
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from typing import Any
+
+from starlette.responses import RedirectResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Path prefixes are two-letter languages with optional subtags (/pt/, /pt-br/),
+# which no route of the app starts with.
+_PREFIX_TAG = re.compile(r"^[a-z]{2}(?:-[a-z0-9]{2,8})*$")
+_LOCALE_TAG = re.compile(r"^[a-z]{2,3}(?:-[a-z0-9]{1,8})*$")
+
+
+def normalize_locale(tag: str) -> str:
+    return tag.strip().replace("_", "-").lower()
+
+
+def match_locale(preferred: Iterable[str], locales: Sequence[str]) -> str:
+    """The first of locales matching a preferred tag exactly or, failing that, by language.
+
+    Falls back to the first locale, the default.
+    """
+    for tag in preferred:
+        tag = normalize_locale(tag)
+        if tag in locales:
+            return tag
+        language = tag.split("-")[0]
+        for locale in locales:
+            if locale.split("-")[0] == language:
+                return locale
+    return locales[0]
+
+
+def declared_locales(data: dict[str, Any]) -> list[str]:
+    """The locales a raw portfolio document declares, the default first."""
+    locales = data.get("locales")
+    if locales is None:
+        return []
+    if not isinstance(locales, list) or not locales:
+        raise ValueError("locales must be a non-empty list of language tags")
+    normalized = []
+    for tag in locales:
+        if not isinstance(tag, str) or not _LOCALE_TAG.match(normalize_locale(tag)):
+            raise ValueError(f"locales: {tag!r} is not a language tag such as 'en' or 'pt-BR'")
+        normalized.append(normalize_locale(tag))
+    return list(dict.fromkeys(normalized))
+
+
+def _localize(value: Any, preferred: list[str], locales: Sequence[str]) -> Any:
+    if isinstance(value, dict):
+        keys = {normalize_locale(k): k for k in value if isinstance(k, str)}
+        if value and len(keys) == len(value) and keys.keys() <= set(locales):
+            chosen = keys[match_locale(preferred, list(keys))]
+            return _localize(value[chosen], preferred, locales)
+        return {k: _localize(v, preferred, locales) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_localize(item, preferred, locales) for item in value]
+    return value
+
+
+def localize_document(data: dict[str, Any], locale: str | None = None) -> dict[str, Any]:
+    """A raw portfolio document with every localized value resolved for locale.
+
+    A localized value is a mapping keyed only by declared locales, e.g.
+    ``title: {en: Engineer, pt-BR: Engenheiro}``. Missing translations fall
+    back to the same language, then to the default locale. The result
+    carries the chosen ``locale`` and the normalized ``locales``.
+    """
+    locales = declared_locales(data)
+    if not locales:
+        return data
+    chosen = match_locale([locale] if locale else [], locales)
+    body = {k: v for k, v in data.items() if k not in ("locales", "locale")}
+    localized: dict[str, Any] = _localize(body, [chosen, locales[0]], locales)
+    localized["locales"] = locales
+    localized["locale"] = chosen
+    return localized
+
+
+class LocalePrefixMiddleware:
+    """Route /<locale>/... to the regular handlers with the locale kept in request state.
+
+    locales returns the locales declared by the portfolio a request is for. Any
+    other prefix is left alone, so it is not found rather than a copy of the site.
+    """
+
+    def __init__(self, app: ASGIApp, locales: Callable[[Scope], Awaitable[Sequence[str]]]) -> None:
+        self.app = app
+        self.locales = locales
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        root_path: str = scope.get("root_path", "")
+        path: str = scope["path"]
+        route_path = path[len(root_path) :] if path.startswith(root_path) else path
+        segment, slash, _ = route_path[1:].partition("/")
+        locale = normalize_locale(segment)
+        if not _PREFIX_TAG.match(segment.lower()) or locale not in await self.locales(scope):
+            await self.app(scope, receive, send)
+            return
+        if not slash:
+            query = scope.get("query_string", b"").decode("latin-1")
+            location = f"{path}/" + (f"?{query}" if query else "")
+            await RedirectResponse(location, status_code=308)(scope, receive, send)
+            return
+
+        scope = dict(scope)
+        scope["root_path"] = root_path + "/" + segment
+        scope["state"] = {**scope.get("state", {}), "locale": locale}
+        await self.app(scope, receive, send)
@@ -1,15 +1,108 @@
+import asyncio
+import contextlib
 import logging
+import time
+from collections.abc import AsyncIterator
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
-from .views import router
+from config import (
+    DEFAULT_PORTFOLIO_PATH,
+    PORTFOLIO_AVATAR_DIR,
+    PORTFOLIO_METRICS_DIR,
+    PORTFOLIO_RELOAD_INTERVAL,
+    PORTFOLIOS_DIR,
+)
+
+from . import avatars, metrics, shared, tenants, views
+from .data import PORTFOLIO_ERRORS, load_portfolio_data, watch_portfolio_data
+from .locales import LocalePrefixMiddleware
+from .staticfiles import AssetStaticFiles
+from .tenants import TenantPrefixMiddleware
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Portfolio", version="1.0.0")
+
+SHARED_STARTUP_TIMEOUT = 30.0
+
+
+def warm_up() -> None:
+    portfolio_data = None
+    if tenants.tenant_cache is None and shared.snapshot is None:
+        try:
+            portfolio_data = load_portfolio_data(DEFAULT_PORTFOLIO_PATH)
+        except PORTFOLIO_ERRORS as exc:
+            logger.error(
+                "Cannot load %s, not ready until it is fixed: %s", DEFAULT_PORTFOLIO_PATH, exc
+            )
+    with metrics.stage("warmup"):
+        if portfolio_data is not None and PORTFOLIO_AVATAR_DIR:
+            avatars.ingest_avatar(portfolio_data.personal.profile, PORTFOLIO_AVATAR_DIR)
+        views.warm_up(portfolio_data)
+
+
+async def start_shared_snapshot(snapshot: shared.SharedSnapshot) -> asyncio.Task[None] | None:
+    """Publish from the worker that wins the lock; the others wait for its first generation."""
+    if await asyncio.to_thread(shared.acquire_publisher_lock, snapshot.directory):
+        publisher = shared.Publisher(snapshot.directory, DEFAULT_PORTFOLIO_PATH, PORTFOLIOS_DIR)
+        await asyncio.to_thread(publisher.refresh)
+        if PORTFOLIO_RELOAD_INTERVAL > 0:
+            return asyncio.create_task(
+                shared.publish_periodically(publisher, PORTFOLIO_RELOAD_INTERVAL)
+            )
+        return None
+
+    deadline = time.monotonic() + SHARED_STARTUP_TIMEOUT
+    while snapshot.current_generation() == 0 and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    if snapshot.current_generation() == 0:
+        logger.warning("No shared snapshot in %s yet, serving from own data", snapshot.directory)
+    return None
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    app.state.warmed = False
+    start = time.perf_counter()
+    tasks: list[asyncio.Task[None]] = []
+    await asyncio.to_thread(warm_up)
+    if shared.snapshot is not None:
+        publisher = await start_shared_snapshot(shared.snapshot)
+        if publisher is not None:
+            tasks.append(publisher)
+    app.state.warmed = True
+    logger.info("Warmed up in %.0f ms", (time.perf_counter() - start) * 1000)
+
+    # Tenant files are re-checked by the tenant cache; the default portfolio is not served.
+    if PORTFOLIO_RELOAD_INTERVAL > 0 and tenants.tenant_cache is None:
+        # With a shared snapshot, workers only hold data loaded for filtered queries.
+        tasks.append(
+            asyncio.create_task(
+                watch_portfolio_data(
+                    DEFAULT_PORTFOLIO_PATH,
+                    PORTFOLIO_RELOAD_INTERVAL,
+                    loaded_only=shared.snapshot is not None,
+                )
+            )
+        )
+    if PORTFOLIO_METRICS_DIR:
+        tasks.append(asyncio.create_task(metrics.flush_periodically()))
+    yield
+    for task in tasks:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    if PORTFOLIO_METRICS_DIR:
+        metrics.flush()
+
+
+app = FastAPI(title="Portfolio", version="1.0.0", lifespan=lifespan)
+
+app.add_middleware(shared.SharedSnapshotMiddleware)
+
+app.add_middleware(metrics.MetricsMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,9 +112,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.add_middleware(LocalePrefixMiddleware, locales=views.portfolio_locales)
+
+app.add_middleware(TenantPrefixMiddleware)
+
+app.mount("/static", AssetStaticFiles(directory="static"), name="static")
 
-app.include_router(router)
+app.include_router(views.router)
 
 
 def main() -> None:
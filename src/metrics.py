@@ -0,0 +1,242 @@
+import asyncio
+import bisect
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterator
+from typing import Any, ParamSpec, TypeVar
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import PORTFOLIO_METRICS_DIR, PORTFOLIO_SERVER_TIMING
+
+logger = logging.getLogger(__name__)
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_SECONDS = "portfolio_request_duration_seconds"
+STAGE_SECONDS = "portfolio_stage_duration_seconds"
+CACHE_REQUESTS = "portfolio_cache_requests_total"
+
+_HELP = {
+    REQUEST_SECONDS: ("histogram", "HTTP request latency."),
+    STAGE_SECONDS: ("histogram", "Time spent per processing stage."),
+    CACHE_REQUESTS: ("counter", "Cache lookups by cache and result."),
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+_request_stages: contextvars.ContextVar[list[tuple[str, float]] | None] = contextvars.ContextVar(
+    "request_stages", default=None
+)
+
+
+class Registry:
+    """Counters and fixed-bucket histograms, mergeable across processes."""
+
+    def __init__(self) -> None:
+        self.counters: dict[tuple[str, Labels], float] = {}
+        self.histograms: dict[tuple[str, Labels], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, labels: Labels, value: float = 1.0) -> None:
+        with self._lock:
+            self.counters[(name, labels)] = self.counters.get((name, labels), 0.0) + value
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        # Layout: one count per bucket, then +Inf count, then sum.
+        with self._lock:
+            series = self.histograms.get((name, labels))
+            if series is None:
+                series = self.histograms[(name, labels)] = [0.0] * (len(BUCKETS) + 2)
+            series[bisect.bisect_left(BUCKETS, value)] += 1
+            series[-1] += value
+
+    def dump(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": [[n, list(map(list, ls)), v] for (n, ls), v in self.counters.items()],
+                "histograms": [
+                    [n, list(map(list, ls)), list(v)] for (n, ls), v in self.histograms.items()
+                ],
+            }
+
+    def merge(self, dumped: dict[str, Any]) -> None:
+        for name, labels, value in dumped.get("counters", []):
+            self.inc(name, tuple(tuple(pair) for pair in labels), value)
+        with self._lock:
+            for name, labels, values in dumped.get("histograms", []):
+                key = (name, tuple(tuple(pair) for pair in labels))
+                series = self.histograms.setdefault(key, [0.0] * (len(BUCKETS) + 2))
+                for index, value in enumerate(values):
+                    series[index] += value
+
+
+registry = Registry()
+
+
+def _format_labels(labels: Labels, extra: tuple[str, str] | None = None) -> str:
+    pairs = [*labels, extra] if extra is not None else list(labels)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped, strict=True)) + "}"
+
+
+def render(merged: Registry) -> str:
+    lines: list[str] = []
+    names = sorted({n for n, _ in merged.counters} | {n for n, _ in merged.histograms})
+    for name in names:
+        kind, description = _HELP.get(name, ("untyped", name))
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        for (series_name, labels), value in sorted(merged.counters.items()):
+            if series_name == name:
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        for (series_name, labels), values in sorted(merged.histograms.items()):
+            if series_name != name:
+                continue
+            cumulative = 0.0
+            for bound, count in zip((*BUCKETS, "+Inf"), values[:-1], strict=True):
+                cumulative += count
+                le = bound if isinstance(bound, str) else f"{bound:g}"
+                lines.append(f"{name}_bucket{_format_labels(labels, ('le', le))} {cumulative:g}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {values[-1]:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {cumulative:g}")
+    return "\n".join(lines) + "\n"
+
+
+def _worker_file(directory: str) -> str:
+    return os.path.join(directory, f"metrics-{os.getpid()}.json")
+
+
+def flush(directory: str = PORTFOLIO_METRICS_DIR) -> None:
+    """Persist this worker's metrics so any worker can serve the merged view."""
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as file:
+        json.dump(registry.dump(), file)
+    os.replace(tmp_path, _worker_file(directory))
+
+
+def collect(directory: str = PORTFOLIO_METRICS_DIR) -> str:
+    """Prometheus text for this worker plus every other worker that flushed to directory."""
+    merged = Registry()
+    merged.merge(registry.dump())
+    if directory and os.path.isdir(directory):
+        own = _worker_file(directory)
+        for entry in sorted(os.listdir(directory)):
+            path = os.path.join(directory, entry)
+            if path == own or not (entry.startswith("metrics-") and entry.endswith(".json")):
+                continue
+            try:
+                with open(path, encoding="utf-8") as file:
+                    merged.merge(json.load(file))
+            except (OSError, ValueError) as exc:
+                logger.warning("Skipping metrics file %s: %s", path, exc)
+    return render(merged)
+
+
+async def flush_periodically(interval: float = 1.0) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(flush)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    registry.inc(CACHE_REQUESTS, (("cache", cache), ("result", "hit" if hit else "miss")))
+
+
+@contextlib.contextmanager
+def stage(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        registry.observe(STAGE_SECONDS, (("stage", name),), elapsed)
+        stages = _request_stages.get()
+        if stages is not None:
+            stages.append((name, elapsed))
+
+
+def timed(name: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    def decorator(fn: Callable[P, R]) -> Callable[P, R]:
+        @functools.wraps(fn)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def server_timing(stages: list[tuple[str, float]], total: float) -> str:
+    totals: dict[str, float] = {}
+    for name, elapsed in stages:
+        totals[name] = totals.get(name, 0.0) + elapsed
+    parts = [f"{name};dur={elapsed * 1000:.3f}" for name, elapsed in totals.items()]
+    parts.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(parts)
+
+
+def _route_label(scope: Scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return str(getattr(route, "path", "unmatched"))
+    if scope.get("endpoint") is not None and "app_root_path" in scope:
+        return scope["root_path"][len(scope["app_root_path"]) :] or "/"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Time each request, record it, and report per-stage durations in Server-Timing."""
+
+    def __init__(self, app: ASGIApp, server_timing_header: bool = PORTFOLIO_SERVER_TIMING) -> None:
+        self.app = app
+        self.server_timing_header = server_timing_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        stages: list[tuple[str, float]] = []
+        token = _request_stages.set(stages)
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing_header:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing", server_timing(stages, time.perf_counter() - start)
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stages.reset(token)
+            labels = (
+                ("method", scope["method"]),
+                ("route", _route_label(scope)),
+                ("status", str(status)),
+            )
+            registry.observe(REQUEST_SECONDS, labels, time.perf_counter() - start)
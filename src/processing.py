@@ -2,8 +2,11 @@ from __future__ import annotations
 
 import math
 from collections import Counter
+from collections.abc import Callable
 from typing import Any
 
+from .metrics import timed
+
 
 def flatten_grouped_skills(skills_section: list[object]) -> list[dict[str, object]]:
     """Validate and flatten grouped skills into a flat list of skill dicts.
@@ -38,6 +41,7 @@ def flatten_grouped_skills(skills_section: list[object]) -> list[dict[str, objec
     return flattened_skills
 
 
+@timed("process_skills")
 def process_skills(skills_section: object) -> list[dict[str, object]]:
     """Validate top-level skills section and return flattened skills list.
 
@@ -62,6 +66,7 @@ def process_skills(skills_section: object) -> list[dict[str, object]]:
     return flatten_grouped_skills(skills_section)
 
 
+@timed("sort_skills")
 def sort_skills(skills: list[Any]) -> list[Any]:
     """Return a new list of skills sorted by category min priority (asc),
     then category count (desc), then name (asc, case-insensitive).
@@ -89,3 +94,19 @@ def sort_skills(skills: list[Any]) -> list[Any]:
             s.name.lower(),
         ),
     )
+
+
+def group_skills(skills: list[Any]) -> dict[str, list[Any]]:
+    """Group skills by category in one pass, keeping categories in first-seen order.
+
+    Applied to the output of sort_skills this yields the display order of categories.
+    """
+    return index_by(skills, lambda s: s.category)
+
+
+def index_by(items: list[Any], key: Callable[[Any], str]) -> dict[str, list[Any]]:
+    """Bucket items by key in one pass, preserving item order within each bucket."""
+    index: dict[str, list[Any]] = {}
+    for item in items:
+        index.setdefault(key(item), []).append(item)
+    return index
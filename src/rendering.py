@@ -0,0 +1,244 @@
+import json
+import logging
+import os
+import struct
+from collections.abc import Callable, Iterator, Sequence
+from typing import Any
+
+import jinja2
+from pydantic import TypeAdapter
+
+from config import PORTFOLIO_OPTIMIZE_HTML, PORTFOLIO_TEMPLATE_CACHE_DIR
+
+from .assets import AssetBundle, get_bundle, minify_html
+from .avatars import get_avatar
+from .compact import (
+    CompactCertification,
+    CompactEducation,
+    CompactExperience,
+    CompactPersonalInfo,
+    CompactSearchHit,
+    CompactSkill,
+    Portfolio,
+    compact_portfolio,
+)
+from .critical import inline_critical_css
+from .data import SkillGroup
+from .metrics import stage
+
+try:
+    import msgpack
+except ImportError:  # msgpack is an optional extra
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = "templates"
+STYLESHEET = "css/style.css"
+SECTIONS = ("portfolio", "experience", "skills", "education", "certifications")
+# Every document the API serves by name; skill_groups is /api/skills?view=grouped.
+API_SECTIONS = (*SECTIONS, "skill_groups")
+# Blocks of index.html that can be re-rendered alone, named after their element id.
+PAGE_SECTIONS = ("home", "about", "experience", "skills", "education", "certifications", "contact")
+
+
+def _bytecode_cache(
+    directory: str, pattern: str = "__jinja2_%s.cache"
+) -> jinja2.BytecodeCache | None:
+    if not directory:
+        return None
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError as exc:
+        logger.warning("Not caching template bytecode in %s: %s", directory, exc)
+        return None
+    return jinja2.FileSystemBytecodeCache(directory, pattern)
+
+
+class _MinifiedLoader(jinja2.FileSystemLoader):
+    """Templates with their markup minified, so pages render without template whitespace.
+
+    Minifying once per template instead of once per rendered page keeps the cost
+    independent of the portfolio's size.
+    """
+
+    def get_source(
+        self, environment: jinja2.Environment, template: str
+    ) -> tuple[str, str, Callable[[], bool]]:
+        source, filename, uptodate = super().get_source(environment, template)
+        return minify_html(source), filename, uptodate
+
+
+# Buckets are keyed by template name and checked against the source, so an edited
+# template is recompiled and the stale bytecode replaced.
+environment = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(TEMPLATES_DIR),
+    autoescape=True,
+    auto_reload=False,
+    bytecode_cache=_bytecode_cache(PORTFOLIO_TEMPLATE_CACHE_DIR),
+)
+environment.globals["avatar_for"] = get_avatar
+
+# Used for optimized pages. Its own bytecode file names keep the two environments
+# from replacing each other's cached bytecode.
+minified_environment = jinja2.Environment(
+    loader=_MinifiedLoader(TEMPLATES_DIR),
+    autoescape=True,
+    auto_reload=False,
+    bytecode_cache=_bytecode_cache(PORTFOLIO_TEMPLATE_CACHE_DIR, "__jinja2_minified_%s.cache"),
+)
+minified_environment.globals["avatar_for"] = get_avatar
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+ENCODED_NULL = {JSON_MEDIA_TYPE: b"null", MSGPACK_MEDIA_TYPE: b"\xc0"}
+
+PORTFOLIO_FIELDS = ("personal", "experience", "education", "skills", "certifications")
+
+_SECTION_ADAPTERS: dict[str, TypeAdapter[Any]] = {
+    "personal": TypeAdapter(CompactPersonalInfo),
+    "experience": TypeAdapter(Sequence[CompactExperience]),
+    "skills": TypeAdapter(Sequence[CompactSkill]),
+    "education": TypeAdapter(Sequence[CompactEducation]),
+    "certifications": TypeAdapter(Sequence[CompactCertification]),
+    "skill_groups": TypeAdapter(list[SkillGroup]),
+    "search": TypeAdapter(list[CompactSearchHit]),
+}
+
+
+def static_url(path: str) -> str:
+    return get_bundle().url(path)
+
+
+def optimize_page(page: str, bundle: AssetBundle | None = None) -> str:
+    """Inline the rules of the stylesheet page needs above the fold and load the rest asynchronously."""
+    bundle = bundle or get_bundle()
+    css = bundle.files[bundle.manifest[STYLESHEET]].body
+    with stage("optimize"):
+        return inline_critical_css(page, bytes(css).decode("utf-8"))
+
+
+def render_index(
+    portfolio_data: Portfolio,
+    asset_url: Callable[[str], str] = static_url,
+    live_updates: bool = False,
+    optimize: bool | None = None,
+    bundle: AssetBundle | None = None,
+) -> str:
+    """The page for portfolio_data, minified with its critical CSS inlined when optimize.
+
+    optimize defaults to PORTFOLIO_OPTIMIZE_HTML.
+    """
+    optimize = PORTFOLIO_OPTIMIZE_HTML if optimize is None else optimize
+    page = (
+        (minified_environment if optimize else environment)
+        .get_template("index.html")
+        .render(portfolio=portfolio_data, asset_url=asset_url, live_updates=live_updates)
+    )
+    return optimize_page(page, bundle) if optimize else page
+
+
+def render_fragments(
+    portfolio_data: Portfolio, asset_url: Callable[[str], str] = static_url
+) -> dict[str, str]:
+    """The HTML of each page section on its own, by element id."""
+    template = environment.get_template("index.html")
+    context = template.new_context(
+        {"portfolio": portfolio_data, "asset_url": asset_url, "live_updates": False}
+    )
+    return {name: "".join(template.blocks[name](context)).strip() for name in PAGE_SECTIONS}
+
+
+def skill_groups(portfolio_data: Portfolio) -> list[SkillGroup]:
+    groups = []
+    for category, skills in portfolio_data.skill_groups.items():
+        priorities = [s.priority for s in skills if s.priority is not None]
+        groups.append(
+            SkillGroup(
+                category=category,
+                priority=min(priorities) if priorities else None,
+                values=[s.name for s in skills],
+            )
+        )
+    return groups
+
+
+def stream_index(
+    portfolio_data: Portfolio,
+    chunk_size: int = 16384,
+    asset_url: Callable[[str], str] = static_url,
+    live_updates: bool = False,
+) -> Iterator[str]:
+    """Render index.html incrementally: the first chunk ends right after </head>,
+    later chunks are at least chunk_size characters."""
+    template = environment.get_template("index.html")
+    buffer: list[str] = []
+    buffered = 0
+    head_sent = False
+    pieces = template.generate(
+        portfolio=portfolio_data, asset_url=asset_url, live_updates=live_updates
+    )
+    for piece in pieces:
+        buffer.append(piece)
+        buffered += len(piece)
+        if (not head_sent and "</head>" in piece) or buffered >= chunk_size:
+            head_sent = True
+            yield "".join(buffer)
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def api_media_types() -> tuple[str, ...]:
+    """Media types the API can encode, the default first."""
+    if msgpack is None:
+        return (JSON_MEDIA_TYPE,)
+    return (JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+
+def _encode(adapter: TypeAdapter[Any], value: Any, media_type: str, include: Any = None) -> bytes:
+    if media_type == JSON_MEDIA_TYPE:
+        return adapter.dump_json(value, include=include)
+    if msgpack is None:
+        raise ValueError(f"Unsupported media type {media_type}")
+    packed: bytes = msgpack.packb(adapter.dump_python(value, mode="json", include=include))
+    return packed
+
+
+def join_fragments(fragments: list[tuple[str, bytes]], media_type: str = JSON_MEDIA_TYPE) -> bytes:
+    """Assemble already encoded values into one object keyed by name, without re-encoding them."""
+    if media_type == JSON_MEDIA_TYPE:
+        members = (json.dumps(name).encode("utf-8") + b":" + value for name, value in fragments)
+        return b"{" + b",".join(members) + b"}"
+    if msgpack is None:
+        raise ValueError(f"Unsupported media type {media_type}")
+    size = len(fragments)
+    header = bytes([0x80 | size]) if size < 16 else b"\xde" + struct.pack(">H", size)
+    return header + b"".join(msgpack.packb(name) + value for name, value in fragments)
+
+
+def serialize_section(
+    portfolio_data: Portfolio, section: str, media_type: str = JSON_MEDIA_TYPE
+) -> bytes:
+    portfolio = compact_portfolio(portfolio_data)
+    if section == "portfolio":
+        fragments = [
+            (name, serialize_section(portfolio, name, media_type)) for name in PORTFOLIO_FIELDS
+        ]
+        return join_fragments(fragments, media_type)
+    if section == "skill_groups":
+        value: Any = skill_groups(portfolio)
+    else:
+        value = getattr(portfolio, section)
+    return _encode(_SECTION_ADAPTERS[section], value, media_type)
+
+
+def serialize_items(
+    section: str,
+    items: Sequence[Any],
+    fields: set[str] | None = None,
+    media_type: str = JSON_MEDIA_TYPE,
+) -> bytes:
+    include = {"__all__": fields} if fields is not None else None
+    return _encode(_SECTION_ADAPTERS[section], items, media_type, include)
@@ -0,0 +1,160 @@
+import bisect
+import heapq
+import math
+import re
+from array import array
+from collections.abc import Iterable, Iterator
+
+_TOKEN = re.compile(r"\w+")
+
+# Prefix matches rank below exact ones, and a very short prefix may only
+# expand to this many vocabulary terms so lookups stay cheap on big corpora.
+PREFIX_FACTOR = 0.5
+MAX_PREFIX_TERMS = 64
+MAX_QUERY_TOKENS = 8
+# Roughly how many postings a linear scan reads in the time of one bisect probe.
+PROBE_COST = 16
+
+# A document is a (section, position) reference plus its (text, weight) fields.
+DocRef = tuple[str, int]
+Document = tuple[DocRef, Iterable[tuple[str, float]]]
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(text.casefold())
+
+
+class SearchIndex:
+    """Inverted index with field weights, idf ranking and prefix matching.
+
+    All query tokens must match (exactly or as a prefix of an indexed term).
+    Postings live in flat arrays sliced by term offsets rather than in
+    per-term containers, which keeps large indexes a fraction of the size.
+    """
+
+    def __init__(self, documents: Iterable[Document] = ()) -> None:
+        self.sections: list[str] = []
+        self._ref_sections = array("H")
+        self._ref_positions = array("L")
+        postings: dict[str, dict[int, float]] = {}
+        for (section, position), fields in documents:
+            doc_id = len(self._ref_positions)
+            if section not in self.sections:
+                self.sections.append(section)
+            self._ref_sections.append(self.sections.index(section))
+            self._ref_positions.append(position)
+            for text, weight in fields:
+                for token in tokenize(text):
+                    posting = postings.setdefault(token, {})
+                    posting[doc_id] = posting.get(doc_id, 0.0) + weight
+
+        total = len(self._ref_positions)
+        self.terms = sorted(postings)
+        # The postings of term i span offsets[i]:offsets[i + 1], once by doc id
+        # for membership probes and once by descending score (stored negated)
+        # so the best hits of a term can be read off the front.
+        self._offsets = array("L", [0])
+        self._docs = array("L")
+        self._scores = array("d")
+        self._ranked_docs = array("L")
+        self._ranked_scores = array("d")
+        for term in self.terms:
+            posting = postings[term]
+            idf = math.log(1.0 + total / len(posting))
+            scored = [(doc_id, weight * idf) for doc_id, weight in sorted(posting.items())]
+            self._docs.extend(doc_id for doc_id, _ in scored)
+            self._scores.extend(score for _, score in scored)
+            ranked = sorted((-score, doc_id) for doc_id, score in scored)
+            self._ranked_docs.extend(doc_id for _, doc_id in ranked)
+            self._ranked_scores.extend(score for score, _ in ranked)
+            self._offsets.append(len(self._docs))
+
+    def _ref(self, doc_id: int) -> DocRef:
+        return self.sections[self._ref_sections[doc_id]], self._ref_positions[doc_id]
+
+    def _count(self, term: int) -> int:
+        return self._offsets[term + 1] - self._offsets[term]
+
+    def _matches(self, term: int, candidates: dict[int, float]) -> Iterator[tuple[int, float]]:
+        """The (doc id, score) postings of term whose documents are among candidates."""
+        lo, hi = self._offsets[term], self._offsets[term + 1]
+        if len(candidates) * PROBE_COST < hi - lo:
+            for doc_id in candidates:
+                index = bisect.bisect_left(self._docs, doc_id, lo, hi)
+                if index < hi and self._docs[index] == doc_id:
+                    yield doc_id, self._scores[index]
+        else:
+            docs = memoryview(self._docs)[lo:hi]
+            scores = memoryview(self._scores)[lo:hi]
+            for doc_id, score in zip(docs, scores, strict=True):
+                if doc_id in candidates:
+                    yield doc_id, score
+
+    def _expand(self, token: str) -> list[tuple[int, float]]:
+        start = bisect.bisect_left(self.terms, token)
+        end = min(
+            bisect.bisect_left(self.terms, token + "\U0010ffff", start), start + MAX_PREFIX_TERMS
+        )
+        return [
+            (term, 1.0 if self.terms[term] == token else PREFIX_FACTOR)
+            for term in range(start, end)
+        ]
+
+    def _ranked(self, term: int, factor: float) -> Iterator[tuple[float, int]]:
+        lo, hi = self._offsets[term], self._offsets[term + 1]
+        scores = memoryview(self._ranked_scores)[lo:hi]
+        docs = memoryview(self._ranked_docs)[lo:hi]
+        if factor == 1.0:
+            return zip(scores, docs, strict=True)
+        return ((score * factor, doc_id) for score, doc_id in zip(scores, docs, strict=True))
+
+    def _top(self, expanded: list[tuple[int, float]], limit: int | None) -> dict[int, float]:
+        # Merging the per-term rankings yields each document first at its best score.
+        found: dict[int, float] = {}
+        for score, doc_id in heapq.merge(*(self._ranked(t, f) for t, f in expanded)):
+            if doc_id not in found:
+                found[doc_id] = -score
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+    def search(self, query: str, limit: int | None = None) -> list[tuple[DocRef, float]]:
+        tokens = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TOKENS]
+        expansions = sorted(
+            (self._expand(token) for token in tokens),
+            key=lambda expanded: sum(self._count(term) for term, _ in expanded),
+        )
+        if not expansions or not all(expansions):
+            return []
+
+        if len(expansions) == 1:
+            scores = self._top(expansions[0], limit)
+        else:
+            # Start from the rarest token and probe the others only for its documents.
+            scores = self._top(expansions[0], None)
+            for expanded in expansions[1:]:
+                best: dict[int, float] = {}
+                for term, factor in expanded:
+                    for doc_id, score in self._matches(term, scores):
+                        best[doc_id] = max(best.get(doc_id, 0.0), score * factor)
+                matched = {doc_id: scores[doc_id] + score for doc_id, score in best.items()}
+                scores = matched
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [(self._ref(doc_id), score) for doc_id, score in ranked]
+
+    def __len__(self) -> int:
+        return len(self._ref_positions)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SearchIndex):
+            return NotImplemented
+        return (
+            [self._ref(i) for i in range(len(self))] == [other._ref(i) for i in range(len(other))]
+            and self.terms == other.terms
+            and self._offsets == other._offsets
+            and self._docs == other._docs
+            and self._scores == other._scores
+        )
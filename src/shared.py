@@ -0,0 +1,349 @@
+import asyncio
+import glob
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections.abc import Mapping
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config import DEFAULT_PORTFOLIO_PATH, PORTFOLIO_SHARED_DIR
+
+from . import tenants, views
+from .cache import (
+    Body,
+    CachedBody,
+    accepted_languages,
+    cached_response,
+    negotiate_media_type,
+)
+from .data import PORTFOLIO_ERRORS, parse_portfolio
+from .locales import match_locale
+from .metrics import record_cache
+from .rendering import JSON_MEDIA_TYPE, api_media_types
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows, where every worker publishes
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PFSHM001"
+GENERATION_FILE = "generation"
+LOCK_FILE = "publisher.lock"
+
+# (tenant, resource); the tenant is "" when a single portfolio is served.
+Key = tuple[str, str]
+
+_GENERATION = struct.Struct("<Q")
+_HEADER = struct.Struct("<8sQ")
+
+
+def _data_path(directory: str, generation: int) -> str:
+    return os.path.join(directory, f"snapshot-{generation}.bin")
+
+
+def _open_generation(directory: str, writable: bool = False) -> mmap.mmap:
+    path = os.path.join(directory, GENERATION_FILE)
+    if writable and not os.path.exists(path):
+        with open(path, "wb") as file:
+            file.write(_GENERATION.pack(0))
+    with open(path, "r+b" if writable else "rb") as file:
+        access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+        return mmap.mmap(file.fileno(), _GENERATION.size, access=access)
+
+
+def publish(directory: str, entries: Mapping[Key, CachedBody]) -> int:
+    """Write entries as the next generation, then flip the counter readers poll."""
+    os.makedirs(directory, exist_ok=True)
+    counter = _open_generation(directory, writable=True)
+    try:
+        generation: int = _GENERATION.unpack_from(counter)[0] + 1
+
+        index = []
+        blobs: list[Body] = []
+        offset = 0
+        for (tenant, resource), entry in entries.items():
+            spans: list[list[int] | None] = []
+            for blob in (entry.body, entry.gzip, entry.br):
+                if blob is None:
+                    spans.append(None)
+                    continue
+                spans.append([offset, len(blob)])
+                blobs.append(blob)
+                offset += len(blob)
+            index.append([tenant, resource, entry.etag, entry.media_type, *spans])
+        header = json.dumps(index, separators=(",", ":")).encode("utf-8")
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(_HEADER.pack(MAGIC, len(header)))
+            file.write(header)
+            for blob in blobs:
+                file.write(blob)
+        os.replace(tmp_path, _data_path(directory, generation))
+
+        _GENERATION.pack_into(counter, 0, generation)
+        counter.flush()
+    finally:
+        counter.close()
+
+    # Readers keep their mapping of an unlinked file, so only the previous
+    # generation is left around for workers that have not flipped yet.
+    for path in glob.glob(os.path.join(directory, "snapshot-*.bin")):
+        try:
+            if int(os.path.basename(path)[9:-4]) < generation - 1:
+                os.remove(path)
+        except (ValueError, OSError) as exc:
+            logger.debug("Cannot remove %s: %s", path, exc)
+    return generation
+
+
+class SharedSnapshot:
+    """Read side of the shared snapshot: response bodies are memoryviews into a mapped file.
+
+    The generation counter is itself memory-mapped, so checking for a new
+    version costs no system call.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.generation = 0
+        self._counter: mmap.mmap | None = None
+        self._entries: dict[Key, CachedBody] = {}
+        self._lock = threading.Lock()
+
+    def current_generation(self) -> int:
+        if self._counter is None:
+            try:
+                self._counter = _open_generation(self.directory)
+            except (OSError, ValueError):
+                return 0
+        generation: int = _GENERATION.unpack_from(self._counter)[0]
+        return generation
+
+    def entries(self) -> dict[Key, CachedBody]:
+        generation = self.current_generation()
+        if generation != self.generation:
+            with self._lock:
+                if generation != self.generation:
+                    self._load(generation)
+        return self._entries
+
+    def get(self, tenant: str, resource: str) -> CachedBody | None:
+        entry = self.entries().get((tenant, resource))
+        record_cache("shared", hit=entry is not None)
+        return entry
+
+    def _load(self, generation: int) -> None:
+        try:
+            with open(_data_path(self.directory, generation), "rb") as file:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as exc:
+            logger.warning("Cannot map shared snapshot generation %d: %s", generation, exc)
+            return
+
+        magic, header_size = _HEADER.unpack_from(mapped)
+        if magic != MAGIC:
+            logger.warning("Ignoring shared snapshot generation %d: bad magic", generation)
+            return
+        view = memoryview(mapped)
+        start = _HEADER.size + header_size
+        index = json.loads(view[_HEADER.size : start].tobytes())
+
+        def span(position: list[int] | None) -> memoryview | None:
+            if position is None:
+                return None
+            return view[start + position[0] : start + position[0] + position[1]]
+
+        entries: dict[Key, CachedBody] = {}
+        for tenant, resource, etag, media_type, body, gzip, br in index:
+            entries[(tenant, resource)] = CachedBody(
+                body=view[start + body[0] : start + body[0] + body[1]],
+                etag=etag,
+                media_type=media_type,
+                gzip=span(gzip),
+                br=span(br),
+            )
+        self._entries = entries
+        self.generation = generation
+        logger.info("Serving shared snapshot generation %d", generation)
+
+
+def acquire_publisher_lock(directory: str) -> bool:
+    """Elect the process that builds snapshots; the lock lives as long as the process."""
+    if fcntl is None:
+        return True
+    os.makedirs(directory, exist_ok=True)
+    fd = os.open(os.path.join(directory, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    return True
+
+
+class Publisher:
+    """Renders every portfolio once and publishes the results as one shared snapshot.
+
+    Only changed source files are re-parsed; responses of unchanged ones are
+    copied from the previous generation.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        profile_path: str = DEFAULT_PORTFOLIO_PATH,
+        portfolios_dir: str = "",
+    ) -> None:
+        self.directory = directory
+        self.profile_path = profile_path
+        self.portfolios_dir = portfolios_dir
+        self.snapshot = SharedSnapshot(directory)
+        self._stamps: dict[str, tuple[int, int]] = {}
+
+    def sources(self) -> dict[str, str]:
+        if not self.portfolios_dir:
+            return {"": self.profile_path}
+        sources = {}
+        for path in sorted(glob.glob(os.path.join(self.portfolios_dir, "*.yml"))):
+            tenant = os.path.basename(path)[: -len(".yml")]
+            if tenants.is_valid_tenant(tenant):
+                sources[tenant] = path
+        return sources
+
+    def refresh(self) -> bool:
+        """Publish a new generation if any source changed; True when one was published."""
+        # The first refresh starts empty so tenants removed while nothing was running are dropped.
+        entries = dict(self.snapshot.entries()) if self._stamps else {}
+        sources = self.sources()
+        changed = False
+
+        for tenant in set(self._stamps) - sources.keys():
+            del self._stamps[tenant]
+            entries = {key: value for key, value in entries.items() if key[0] != tenant}
+            changed = True
+
+        for tenant, path in sources.items():
+            try:
+                stat = os.stat(path)
+            except OSError as exc:
+                logger.warning("Cannot stat %s: %s", path, exc)
+                continue
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            if self._stamps.get(tenant) == stamp:
+                continue
+            self._stamps[tenant] = stamp
+
+            try:
+                with open(path, encoding="utf-8") as file:
+                    portfolio_data = parse_portfolio(file.read(), source=path)
+            except PORTFOLIO_ERRORS as exc:
+                logger.error("Not publishing %s, it is invalid: %s", path, exc)
+                continue
+            for resource, entry in views.prebuilt_bodies(portfolio_data).items():
+                entries[(tenant, resource)] = entry
+            changed = True
+
+        if changed:
+            generation = publish(self.directory, entries)
+            logger.info("Published shared snapshot generation %d", generation)
+        return changed
+
+
+async def publish_periodically(publisher: Publisher, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(publisher.refresh)
+        except OSError as exc:
+            logger.error("Cannot publish shared snapshot: %s", exc)
+
+
+_RESOURCES = {
+    "/": "index.html",
+    "/api/portfolio": "portfolio",
+    "/api/experience": "experience",
+    "/api/skills": "skills",
+    "/api/education": "education",
+    "/api/certifications": "certifications",
+}
+
+
+class SharedSnapshotMiddleware:
+    """Answer unparameterized GETs of the page and API sections from the shared snapshot.
+
+    Anything else, including filtered queries, falls through to the regular
+    handlers, which load the portfolio in that worker on demand.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if snapshot is None or scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        root_path: str = scope.get("root_path", "")
+        path: str = scope["path"]
+        route_path = path[len(root_path) :] if path.startswith(root_path) else path
+        resource = _RESOURCES.get(route_path)
+        query = scope.get("query_string", b"")
+        if resource == "skills" and query == b"view=grouped":
+            resource = "skill_groups"
+        elif query and not (resource == "skills" and query == b"view=flat"):
+            resource = None
+
+        headers = Headers(scope=scope)
+        vary: tuple[str, ...] = ()
+        if resource is not None and resource != "index.html" and len(api_media_types()) > 1:
+            # Only JSON is published; other formats are encoded by the handlers.
+            vary = ("Accept",)
+            if negotiate_media_type(headers.get("accept"), api_media_types()) != JSON_MEDIA_TYPE:
+                resource = None
+
+        tenant = ""
+        if resource is not None and tenants.tenant_cache is not None:
+            tenant = scope.get("state", {}).get("tenant") or (
+                tenants.tenant_from_host(headers.get("host")) or ""
+            )
+        entry = snapshot.get(tenant, resource) if resource is not None else None
+        language: dict[str, str] = {}
+        marker = snapshot.get(tenant, "locales") if entry is not None else None
+        if marker is not None:
+            # Only the default locale is published; other locales are rendered on demand.
+            locales = json.loads(bytes(marker.body))
+            prefix = scope.get("state", {}).get("locale")
+            preferred = [prefix] if prefix else accepted_languages(headers.get("accept-language"))
+            if match_locale(preferred, locales) != locales[0]:
+                entry = None
+            elif not prefix:
+                vary = (*vary, "Accept-Language")
+            language = {"Content-Language": locales[0]}
+        if entry is None:
+            await self.app(scope, receive, send)
+            return
+
+        scope["route"] = _SharedRoute(route_path)
+        await cached_response(headers, entry, extra_headers=language, vary=vary)(
+            scope, receive, send
+        )
+
+
+class _SharedRoute:
+    # Stands in for the matched route so request metrics keep their route label.
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+
+snapshot: SharedSnapshot | None = (
+    SharedSnapshot(PORTFOLIO_SHARED_DIR) if PORTFOLIO_SHARED_DIR else None
+)
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import subprocess  # nosec B404
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from .asgi import lifespan, request
+
+# Run in a fresh interpreter so nothing is imported or compiled yet. Only the app is
+# imported before its import time is taken.
+_CHILD = (
+    "import sys, time; start = time.perf_counter(); from src.main import app; "
+    "imported = time.perf_counter() - start; "
+    "from src.startup import _report; _report(app, imported, sys.argv[1])"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class StartupProfile:
+    """Cold-start timings of one fresh process, in milliseconds."""
+
+    import_ms: float
+    warmup_ms: float
+    first_request_ms: float
+    status: int
+    # Slowest imports by their own time, excluding what they import themselves.
+    slowest_imports: list[tuple[str, float]] = field(default_factory=list)
+
+    @property
+    def total_ms(self) -> float:
+        return self.import_ms + self.warmup_ms + self.first_request_ms
+
+
+async def _first_request(app: Any, path: str) -> tuple[float, float, int]:
+    start = time.perf_counter()
+    async with lifespan(app) as state:
+        warmup = time.perf_counter() - start
+        start = time.perf_counter()
+        response = await request(app, path, [("accept-encoding", "br, gzip")], state)
+        first_request = time.perf_counter() - start
+    return warmup, first_request, response.status
+
+
+def _report(app: Any, imported: float, path: str) -> None:
+    warmup, first_request, status = asyncio.run(_first_request(app, path))
+    timings = {"import": imported, "warmup": warmup, "first_request": first_request}
+    print(json.dumps({"timings": timings, "status": status}))
+
+
+def _slowest_imports(importtime: str, top: int) -> list[tuple[str, float]]:
+    # Lines of `python -X importtime`: "import time: <self us> | <cumulative us> | <module>".
+    imports = []
+    for line in importtime.splitlines():
+        parts = line.removeprefix("import time:").split("|")
+        if len(parts) == 3 and parts[0].strip().isdigit():
+            imports.append((parts[2].strip(), int(parts[0]) / 1000))
+    return sorted(imports, key=lambda item: item[1], reverse=True)[:top]
+
+
+def profile_startup(path: str = "/", top: int = 10) -> StartupProfile:
+    """Import the app, run its startup and serve path once in a new interpreter.
+
+    With top, the top slowest imports are listed too; tracing them adds a little
+    to the import time.
+    """
+    trace = ["-X", "importtime"] if top else []
+    result = subprocess.run(  # nosec B603
+        [sys.executable, *trace, "-c", _CHILD, path], capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"startup failed:\n{result.stderr.strip()}")
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    timings = report["timings"]
+    return StartupProfile(
+        import_ms=timings["import"] * 1000,
+        warmup_ms=timings["warmup"] * 1000,
+        first_request_ms=timings["first_request"] * 1000,
+        status=report["status"],
+        slowest_imports=_slowest_imports(result.stderr, top),
+    )
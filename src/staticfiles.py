@@ -0,0 +1,19 @@
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Scope
+
+from .assets import IMMUTABLE_CACHE_CONTROL, get_bundle
+from .avatars import avatar_file
+from .cache import cached_response
+
+
+class AssetStaticFiles(StaticFiles):
+    """StaticFiles that serves content-hashed bundle and avatar names from memory, cached forever."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        name = path.replace("\\", "/")
+        asset = get_bundle(str(self.directory)).files.get(name) or avatar_file(name)
+        if asset is None:
+            return await super().get_response(path, scope)
+        return cached_response(Headers(scope=scope), asset, cache_control=IMMUTABLE_CACHE_CONTROL)
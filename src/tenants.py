@@ -0,0 +1,198 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from starlette.responses import RedirectResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config import (
+    PORTFOLIO_RELOAD_INTERVAL,
+    PORTFOLIOS_DIR,
+    TENANT_CACHE_BYTES,
+    TENANT_CACHE_ENTRIES,
+)
+
+from .compact import CompactPortfolio
+from .data import PORTFOLIO_ERRORS, parse_portfolio
+from .metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+TENANT_PREFIX = "/t/"
+_TENANT_NAME = re.compile(r"^[a-z0-9](?:[a-z0-9-]|\.(?!\.)){0,252}$")
+
+
+def is_valid_tenant(name: str) -> bool:
+    return bool(_TENANT_NAME.match(name)) and not name.endswith(".")
+
+
+@dataclass(slots=True)
+class _TenantEntry:
+    data: CompactPortfolio
+    stamp: tuple[int, int]
+    size: int
+    checked_at: float
+
+
+class TenantCache:
+    """Lazily parsed tenant portfolios, evicted least-recently-used first.
+
+    Only the compact serving form of each portfolio is kept once it is validated.
+
+    The byte bound counts the YAML source size of each cached portfolio once per
+    locale it declares, since every locale can be parsed into its own variant;
+    rendered responses are bounded by the response cache instead. Entries are
+    re-checked against the file on disk at most every reload_interval seconds.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_entries: int = TENANT_CACHE_ENTRIES,
+        max_bytes: int = TENANT_CACHE_BYTES,
+        reload_interval: float = PORTFOLIO_RELOAD_INTERVAL,
+    ) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.reload_interval = reload_interval
+        self.total_bytes = 0
+        self._entries: OrderedDict[str, _TenantEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, tenant: str) -> str:
+        return os.path.join(self.directory, f"{tenant}.yml")
+
+    def peek(self, tenant: str) -> CompactPortfolio | None:
+        """Cached data that is not due for a disk check, without any I/O."""
+        entry = self._entries.get(tenant)
+        if entry is None or (
+            self.reload_interval > 0 and time.monotonic() - entry.checked_at >= self.reload_interval
+        ):
+            return None
+        with self._lock:
+            if tenant in self._entries:
+                self._entries.move_to_end(tenant)
+        record_cache("tenant", hit=True)
+        return entry.data
+
+    def get(self, tenant: str) -> CompactPortfolio | None:
+        if not is_valid_tenant(tenant):
+            return None
+
+        with self._lock:
+            entry = self._entries.get(tenant)
+            if entry is not None:
+                self._entries.move_to_end(tenant)
+        record_cache("tenant", hit=entry is not None)
+
+        now = time.monotonic()
+        if entry is not None and (
+            self.reload_interval <= 0 or now - entry.checked_at < self.reload_interval
+        ):
+            return entry.data
+
+        try:
+            stat = os.stat(self.path(tenant))
+        except OSError:
+            if entry is not None:
+                self._discard(tenant)
+            return None
+
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if entry is not None and entry.stamp == stamp:
+            entry.checked_at = now
+            return entry.data
+
+        try:
+            with open(self.path(tenant), encoding="utf-8") as file:
+                content = file.read()
+            portfolio_data = CompactPortfolio.from_data(
+                parse_portfolio(content, source=self.path(tenant))
+            )
+        except PORTFOLIO_ERRORS as exc:
+            if entry is None:
+                raise
+            logger.error("Keeping previous data for tenant %s: %s", tenant, exc)
+            entry.stamp = stamp
+            entry.checked_at = now
+            return entry.data
+
+        size = len(content) * max(1, len(portfolio_data.locales))
+        self._store(tenant, _TenantEntry(portfolio_data, stamp, size, now))
+        return portfolio_data
+
+    def _store(self, tenant: str, entry: _TenantEntry) -> None:
+        with self._lock:
+            previous = self._entries.pop(tenant, None)
+            if previous is not None:
+                self.total_bytes -= previous.size
+            self._entries[tenant] = entry
+            self.total_bytes += entry.size
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes
+            ):
+                evicted_name, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted.size
+                logger.debug("Evicted tenant %s", evicted_name)
+
+    def _discard(self, tenant: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(tenant, None)
+            if entry is not None:
+                self.total_bytes -= entry.size
+
+    def __contains__(self, tenant: str) -> bool:
+        return tenant in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+tenant_cache: TenantCache | None = TenantCache(PORTFOLIOS_DIR) if PORTFOLIOS_DIR else None
+
+
+def tenant_from_host(host: str | None) -> str | None:
+    if not host:
+        return None
+    name = host.rsplit(":", 1)[0] if not host.endswith("]") else host
+    name = name.lower()
+    return name if is_valid_tenant(name) else None
+
+
+class TenantPrefixMiddleware:
+    """Route /t/<tenant>/... to the regular handlers with the tenant kept in request state."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or tenant_cache is None:
+            await self.app(scope, receive, send)
+            return
+
+        root_path: str = scope.get("root_path", "")
+        path: str = scope["path"]
+        route_path = path[len(root_path) :] if path.startswith(root_path) else path
+        if not route_path.startswith(TENANT_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        tenant, slash, _ = route_path[len(TENANT_PREFIX) :].partition("/")
+        if not is_valid_tenant(tenant):
+            await self.app(scope, receive, send)
+            return
+        if not slash:
+            query = scope.get("query_string", b"").decode("latin-1")
+            location = f"{path}/" + (f"?{query}" if query else "")
+            await RedirectResponse(location, status_code=308)(scope, receive, send)
+            return
+
+        scope = dict(scope)
+        scope["root_path"] = root_path + TENANT_PREFIX + tenant
+        scope["state"] = {**scope.get("state", {}), "tenant": tenant}
+        await self.app(scope, receive, send)
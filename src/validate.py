@@ -0,0 +1,245 @@
+import glob
+import json
+import logging
+import os
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import pydantic
+import yaml
+from pydantic import ValidationError
+
+from .data import SNAPSHOT_SCHEMA_VERSION, PortfolioData, SafeLoader, content_digest
+from .locales import declared_locales, localize_document
+from .processing import process_skills
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = ".portfolio-validate-cache.json"
+YAML_SUFFIXES = (".yml", ".yaml")
+
+# Cached results are only reused by the same models and pydantic version.
+CACHE_SCHEMA = f"s{SNAPSHOT_SCHEMA_VERSION}-p{pydantic.VERSION}"
+
+
+@dataclass(frozen=True, slots=True)
+class Issue:
+    location: str
+    message: str
+    line: int | None = None
+    column: int | None = None
+
+
+@dataclass(slots=True)
+class FileResult:
+    path: str
+    digest: str
+    issues: list[Issue] = field(default_factory=list)
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+
+def expand_paths(patterns: list[str]) -> list[str]:
+    """Files named by patterns: plain paths, globs, or directories searched for YAML files."""
+    paths: dict[str, None] = {}
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for suffix in YAML_SUFFIXES:
+                matches = glob.glob(os.path.join(pattern, "**", f"*{suffix}"), recursive=True)
+                paths.update(dict.fromkeys(sorted(matches)))
+        elif glob.has_magic(pattern):
+            paths.update(dict.fromkeys(sorted(glob.glob(pattern, recursive=True))))
+        else:
+            paths[pattern] = None
+    return list(paths)
+
+
+def _node_at(node: yaml.Node | None, loc: tuple[int | str, ...]) -> yaml.Node | None:
+    """The deepest YAML node along a pydantic error location."""
+    for part in loc:
+        child = None
+        if isinstance(node, yaml.MappingNode):
+            child = next((value for key, value in node.value if key.value == part), None)
+        elif isinstance(node, yaml.SequenceNode) and isinstance(part, int):
+            child = node.value[part] if 0 <= part < len(node.value) else None
+        if child is None:
+            break
+        node = child
+    return node
+
+
+def _issue(location: str, message: str, node: yaml.Node | None) -> Issue:
+    if node is None:
+        return Issue(location, message)
+    mark = node.start_mark
+    return Issue(location, message, mark.line + 1, mark.column + 1)
+
+
+def check_content(content: str) -> list[Issue]:
+    """Every problem in a portfolio document, each located in the YAML source when possible."""
+    loader = SafeLoader(content)
+    try:
+        root = loader.get_single_node()
+        data = loader.construct_document(root) if root is not None else None
+    except yaml.MarkedYAMLError as exc:
+        mark = exc.problem_mark or exc.context_mark
+        message = ": ".join(filter(None, (exc.context, exc.problem)))
+        if mark is None:
+            return [Issue("", message)]
+        return [Issue("", message, mark.line + 1, mark.column + 1)]
+    except yaml.YAMLError as exc:
+        return [Issue("", str(exc))]
+    finally:
+        loader.dispose()
+
+    if not isinstance(data, dict):
+        return [_issue("", "top level must be a mapping", root)]
+
+    try:
+        locales = declared_locales(data)
+    except ValueError as exc:
+        return [_issue("locales", str(exc), _node_at(root, ("locales",)))]
+    # Every locale is checked; problems shared by several are reported once.
+    documents = [localize_document(data, locale) for locale in locales] or [data]
+    issues: dict[Issue, None] = {}
+    for document in documents:
+        issues.update(dict.fromkeys(_check_document(document, root)))
+    return list(issues)
+
+
+def _check_document(data: dict[str, Any], root: yaml.Node | None) -> list[Issue]:
+    issues = []
+    if "skills" in data:
+        try:
+            process_skills(data["skills"])
+        except (ValueError, TypeError) as exc:
+            issues.append(_issue("skills", str(exc), _node_at(root, ("skills",))))
+            # The rest of the document is still checked, without the skills that failed.
+            data = {**data, "skills": []}
+
+    try:
+        PortfolioData(**data)
+    except ValidationError as exc:
+        issues += [
+            _issue(
+                ".".join(str(part) for part in error["loc"]),
+                error["msg"],
+                _node_at(root, error["loc"]),
+            )
+            for error in exc.errors()
+        ]
+    except (ValueError, TypeError) as exc:
+        issues.append(_issue("", str(exc), root))
+    return issues
+
+
+def validate_file(path: str) -> FileResult:
+    try:
+        with open(path, "rb") as file:
+            raw = file.read()
+    except OSError as exc:
+        return FileResult(path, "", [Issue("", exc.strerror or str(exc))])
+    digest = content_digest(raw)
+    try:
+        content = raw.decode("utf-8")
+    except UnicodeDecodeError as exc:
+        return FileResult(path, digest, [Issue("", f"not valid UTF-8: {exc.reason}")])
+    return FileResult(path, digest, check_content(content))
+
+
+def load_cache(path: str) -> dict[str, dict[str, Any]]:
+    try:
+        with open(path, encoding="utf-8") as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("schema") != CACHE_SCHEMA:
+        return {}
+    files = cache.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def save_cache(
+    path: str, results: list[FileResult], previous: dict[str, dict[str, Any]] | None = None
+) -> None:
+    files = dict(previous or {})
+    for r in results:
+        if r.digest:
+            files[os.path.abspath(r.path)] = {
+                "digest": r.digest,
+                "issues": [asdict(i) for i in r.issues],
+            }
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"schema": CACHE_SCHEMA, "files": files}, file)
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        logger.warning("Cannot write validation cache %s: %s", path, exc)
+
+
+def _cached_result(path: str, cache: dict[str, dict[str, Any]]) -> FileResult | None:
+    entry = cache.get(os.path.abspath(path))
+    if entry is None:
+        return None
+    try:
+        with open(path, "rb") as file:
+            digest = content_digest(file.read())
+    except OSError:
+        return None
+    if digest != entry.get("digest"):
+        return None
+    issues = [Issue(**issue) for issue in entry.get("issues", [])]
+    return FileResult(path, digest, issues, cached=True)
+
+
+def validate_paths(
+    paths: list[str], jobs: int | None = None, cache_path: str | None = DEFAULT_CACHE_PATH
+) -> Iterator[FileResult]:
+    """Yield each file's result as soon as it is known; unchanged files come from the cache.
+
+    Files are validated in a process pool of jobs workers, or in this process when jobs is 1.
+    """
+    cache = load_cache(cache_path) if cache_path else {}
+    results: list[FileResult] = []
+    pending: list[str] = []
+    for path in paths:
+        cached = _cached_result(path, cache)
+        if cached is None:
+            pending.append(path)
+        else:
+            results.append(cached)
+            yield cached
+
+    try:
+        if pending and (jobs == 1 or len(pending) == 1):
+            for path in pending:
+                result = validate_file(path)
+                results.append(result)
+                yield result
+        elif pending:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                futures = [pool.submit(validate_file, path) for path in pending]
+                for future in as_completed(futures):
+                    result = future.result()
+                    results.append(result)
+                    yield result
+    finally:
+        if cache_path:
+            save_cache(cache_path, results, cache)
+
+
+def format_result(result: FileResult) -> list[str]:
+    if result.ok:
+        return [f"{result.path}: ok" + (" (unchanged)" if result.cached else "")]
+    lines = []
+    for issue in result.issues:
+        position = f"{issue.line}:{issue.column}:" if issue.line is not None else ""
+        location = f" {issue.location}:" if issue.location else ""
+        lines.append(f"{result.path}:{position}{location} {issue.message}")
+    return lines
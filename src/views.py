@@ -1,58 +1,599 @@
+import json
 import logging
-from typing import Any
+from collections.abc import Iterator, Sequence
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers
+from starlette.types import Scope
 
-from .data import PortfolioData, load_portfolio_data
+from config import (
+    PORTFOLIO_OPTIMIZE_HTML,
+    PORTFOLIO_RELOAD_INTERVAL,
+    PORTFOLIO_SHARED_DIR,
+    PORTFOLIO_STREAM_CHUNK_SIZE,
+    PORTFOLIO_STREAM_HTML,
+)
+
+from . import tenants
+from .assets import get_bundle
+from .cache import (
+    CachedBody,
+    accepted_languages,
+    cached_body,
+    cached_response,
+    make_etag,
+    negotiate_media_type,
+    response_cache,
+)
+from .compact import CompactPortfolio, Portfolio, compact_portfolio
+from .data import (
+    PORTFOLIO_ERRORS,
+    Certification,
+    Education,
+    Experience,
+    PortfolioData,
+    SearchHit,
+    Skill,
+    SkillGroup,
+    current_portfolio_data,
+    load_portfolio_data,
+)
+from .events import broadcaster
+from .metrics import collect, stage
+from .rendering import (
+    API_SECTIONS,
+    ENCODED_NULL,
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    api_media_types,
+    environment,
+    join_fragments,
+    minified_environment,
+    render_index,
+    serialize_items,
+    serialize_section,
+    stream_index,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
+
+MAX_PAGE_SIZE = 1000
+MAX_BATCH_TENANTS = 50
+BATCH_SECTIONS = API_SECTIONS
+HTML_MEDIA_TYPE = "text/html; charset=utf-8"
+# Pages subscribe to /api/events only when this process reloads the data they show;
+# otherwise every visitor would hold open a stream that can never change.
+LIVE_UPDATES = PORTFOLIO_RELOAD_INTERVAL > 0 and not PORTFOLIO_SHARED_DIR
+
+
+async def get_portfolio_data(request: Request) -> CompactPortfolio:
+    # Async so warmed data is returned on the event loop; only cold loads and
+    # due reload checks go through the threadpool.
+    cache = tenants.tenant_cache
+    if cache is None:
+        loaded = current_portfolio_data()
+        if loaded is None:
+            loaded = await run_in_threadpool(load_portfolio_data)
+        return await _localize(request, compact_portfolio(loaded))
+
+    tenant = getattr(request.state, "tenant", None) or tenants.tenant_from_host(
+        request.headers.get("host")
+    )
+    portfolio_data = None
+    if tenant:
+        portfolio_data = cache.peek(tenant)
+        if portfolio_data is None:
+            try:
+                portfolio_data = await run_in_threadpool(cache.get, tenant)
+            except PORTFOLIO_ERRORS as exc:
+                logger.error("Cannot load tenant %s: %s", tenant, exc)
+                raise HTTPException(status_code=503, detail="Portfolio is invalid") from exc
+    if portfolio_data is None:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    return await _localize(request, portfolio_data)
+
+
+async def portfolio_locales(scope: Scope) -> Sequence[str]:
+    """The locales declared by the portfolio a request is for; empty when there are none."""
+    cache = tenants.tenant_cache
+    if cache is None:
+        loaded = current_portfolio_data()
+        if loaded is None:
+            try:
+                loaded = await run_in_threadpool(load_portfolio_data)
+            except PORTFOLIO_ERRORS:
+                return ()
+        return loaded.locales
+
+    tenant = scope.get("state", {}).get("tenant") or tenants.tenant_from_host(
+        Headers(scope=scope).get("host")
+    )
+    portfolio_data = await _tenant_data(cache, tenant) if tenant else None
+    return portfolio_data.locales if portfolio_data is not None else ()
+
+
+def _preferred_locales(request: Request) -> list[str]:
+    locale = getattr(request.state, "locale", None)
+    if locale is not None:
+        return [locale]
+    return accepted_languages(request.headers.get("accept-language"))
+
+
+async def _localize(
+    request: Request, portfolio_data: CompactPortfolio, content_language: bool = True
+) -> CompactPortfolio:
+    """portfolio_data in the locale the request asks for, noting it for the response headers.
+
+    Only the locales actually requested are ever parsed and rendered.
+    """
+    locale = portfolio_data.locale_for(_preferred_locales(request))
+    if locale is None:
+        return portfolio_data
+    if getattr(request.state, "locale", None) is None:
+        request.state.vary_language = True
+    if content_language:
+        request.state.content_language = locale
+    return await _in_locale(portfolio_data, locale)
+
+
+async def _in_locale(portfolio_data: CompactPortfolio, locale: str | None) -> CompactPortfolio:
+    if locale is None:
+        return portfolio_data
+    variant = portfolio_data.variant(locale)
+    if variant is None:
+        variant = await run_in_threadpool(portfolio_data.localized, locale)
+    return variant
+
+
+def _language_headers(request: Request) -> tuple[tuple[str, ...], dict[str, str]]:
+    vary = ("Accept-Language",) if getattr(request.state, "vary_language", False) else ()
+    language = getattr(request.state, "content_language", None)
+    return vary, {"Content-Language": language} if language is not None else {}
+
+
+def warm_up(loaded: Portfolio | None) -> None:
+    """Build assets, compile the template and cache the responses for loaded."""
+    get_bundle()
+    (minified_environment if PORTFOLIO_OPTIMIZE_HTML else environment).get_template("index.html")
+    if loaded is None:
+        return
+    portfolio_data = compact_portfolio(loaded)
+    response_cache.get_or_build(
+        (*_data_key(portfolio_data), "index.html"), lambda: _render_index(portfolio_data)
+    )
+    for section in API_SECTIONS:
+        _section_body(portfolio_data, section)
+
+
+def _render_index(portfolio_data: CompactPortfolio) -> CachedBody:
+    with stage("render"):
+        html = render_index(portfolio_data, live_updates=LIVE_UPDATES)
+    return cached_body(html.encode("utf-8"), HTML_MEDIA_TYPE)
+
+
+def _streaming_index(
+    request: Request, portfolio_data: CompactPortfolio, key: tuple[str, ...]
+) -> StreamingResponse:
+    """Send the page as it renders and cache it once fully sent."""
+    chunks: list[bytes] = []
+    completed = False
+
+    def generate() -> Iterator[bytes]:
+        nonlocal completed
+        for chunk in stream_index(
+            portfolio_data, PORTFOLIO_STREAM_CHUNK_SIZE, live_updates=LIVE_UPDATES
+        ):
+            encoded = chunk.encode("utf-8")
+            chunks.append(encoded)
+            yield encoded
+        completed = True
+
+    def store() -> None:
+        if completed:
+            response_cache.put(key, cached_body(b"".join(chunks), HTML_MEDIA_TYPE))
+
+    vary, headers = _language_headers(request)
+    headers["Cache-Control"] = "no-cache"
+    if vary:
+        headers["Vary"] = ", ".join(vary)
+    return StreamingResponse(
+        generate(),
+        media_type=HTML_MEDIA_TYPE,
+        headers=headers,
+        background=BackgroundTask(store),
+    )
+
+
+def _media_type(request: Request) -> str:
+    media_type = negotiate_media_type(request.headers.get("accept"), api_media_types())
+    return MSGPACK_MEDIA_TYPE if media_type == "application/x-msgpack" else media_type
+
+
+def _data_key(portfolio_data: CompactPortfolio) -> tuple[str, ...]:
+    # Entries are per (data version, locale); unlocalized portfolios have no locale part.
+    if portfolio_data.locale is None:
+        return (portfolio_data.version,)
+    return (portfolio_data.version, portfolio_data.locale)
+
+
+def _cache_key(portfolio_data: CompactPortfolio, media_type: str, *parts: str) -> tuple[str, ...]:
+    # JSON keys carry no media type so they match the entries prebuilt for sharing.
+    key = (*_data_key(portfolio_data), *parts)
+    return key if media_type == JSON_MEDIA_TYPE else (*key, media_type)
+
+
+def _serialize_section(
+    portfolio_data: CompactPortfolio, section: str, media_type: str = JSON_MEDIA_TYPE
+) -> CachedBody:
+    with stage("serialize"):
+        body = serialize_section(portfolio_data, section, media_type)
+    return cached_body(body, media_type)
+
+
+def _serialize_items(
+    section: str, items: Sequence[Any], fields: set[str] | None, media_type: str
+) -> CachedBody:
+    with stage("serialize"):
+        body = serialize_items(section, items, fields, media_type)
+    return cached_body(body, media_type)
+
+
+def _section_body(
+    portfolio_data: CompactPortfolio, section: str, media_type: str = JSON_MEDIA_TYPE
+) -> CachedBody:
+    return response_cache.get_or_build(
+        _cache_key(portfolio_data, media_type, section),
+        lambda: _serialize_section(portfolio_data, section, media_type),
+    )
+
+
+def _section_response(request: Request, portfolio_data: CompactPortfolio, section: str) -> Response:
+    media_type = _media_type(request)
+    return _api_response(request, _section_body(portfolio_data, section, media_type))
+
+
+def _parse_fields(fields: str | None, model: type[BaseModel]) -> set[str] | None:
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    if not requested:
+        raise HTTPException(status_code=400, detail="fields must list at least one field")
+    unknown = requested - model.model_fields.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+        )
+    return requested
+
+
+def _query_response(
+    request: Request,
+    portfolio_data: CompactPortfolio,
+    section: str,
+    items: Sequence[Any],
+    filter_key: str,
+    fields: set[str] | None,
+    limit: int | None,
+    offset: int,
+) -> Response:
+    media_type = _media_type(request)
+    # Only every item of a company or category that exists is cached, so the entries
+    # are bounded by the portfolio rather than by the query strings clients send.
+    if items and fields is None and limit is None and offset == 0:
+        cached = response_cache.get_or_build(
+            _cache_key(portfolio_data, media_type, section, filter_key),
+            lambda: _serialize_items(section, items, None, media_type),
+        )
+    else:
+        page = items[offset : offset + limit if limit is not None else None]
+        with stage("serialize"):
+            body = serialize_items(section, page, fields, media_type)
+        cached = CachedBody(body=body, etag=make_etag(body), media_type=media_type)
+    return _api_response(request, cached, {"X-Total-Count": str(len(items))})
+
+
+def _cached_response(
+    request: Request, cached: CachedBody, extra_headers: dict[str, str] | None = None
+) -> Response:
+    vary, headers = _language_headers(request)
+    headers.update(extra_headers or {})
+    return cached_response(request.headers, cached, extra_headers=headers, vary=vary)
+
+
+def _api_response(
+    request: Request, cached: CachedBody, extra_headers: dict[str, str] | None = None
+) -> Response:
+    vary, headers = _language_headers(request)
+    headers.update(extra_headers or {})
+    if len(api_media_types()) > 1:
+        vary = ("Accept", *vary)
+    return cached_response(request.headers, cached, extra_headers=headers, vary=vary)
+
+
+def prebuilt_bodies(loaded: Portfolio) -> dict[str, CachedBody]:
+    """Every response that does not depend on query parameters, by resource name."""
+    portfolio_data = compact_portfolio(loaded)
+    bodies = {"index.html": _render_index(portfolio_data)}
+    for section in API_SECTIONS:
+        bodies[section] = _serialize_section(portfolio_data, section)
+    if portfolio_data.locales:
+        # Marks a localized portfolio; its bodies above are in the default locale.
+        bodies["locales"] = cached_body(
+            json.dumps(portfolio_data.locales).encode(), JSON_MEDIA_TYPE
+        )
+    return bodies
 
 
 @router.get("/", response_class=HTMLResponse)
 async def root(
-    request: Request, portfolio_data: PortfolioData = Depends(load_portfolio_data)
-) -> Any:
+    request: Request, portfolio_data: CompactPortfolio = Depends(get_portfolio_data)
+) -> Response:
     if portfolio_data is None:
         raise HTTPException(status_code=500, detail="Portfolio data not available")
-    return templates.TemplateResponse(
-        "index.html", {"request": request, "portfolio": portfolio_data}
-    )
+    key = (*_data_key(portfolio_data), "index.html")
+    # An optimized page is only complete once fully rendered, so it is never streamed.
+    if PORTFOLIO_STREAM_HTML and not PORTFOLIO_OPTIMIZE_HTML:
+        page = response_cache.get(key)
+        if page is None:
+            return _streaming_index(request, portfolio_data, key)
+    else:
+        page = response_cache.get_or_build(key, lambda: _render_index(portfolio_data))
+    return _cached_response(request, page)
 
 
-@router.get("/api/portfolio")
-async def portfolio(portfolio_data: PortfolioData = Depends(load_portfolio_data)) -> PortfolioData:
+@router.get("/api/portfolio", response_model=PortfolioData)
+async def portfolio(
+    request: Request, portfolio_data: CompactPortfolio = Depends(get_portfolio_data)
+) -> Response:
     if portfolio_data is None:
         raise HTTPException(status_code=500, detail="Portfolio data not available")
-    return portfolio_data
+    return _section_response(request, portfolio_data, "portfolio")
 
 
-@router.get("/api/experience")
-async def experience(portfolio_data: PortfolioData = Depends(load_portfolio_data)) -> list[Any]:
+@router.get("/api/experience", response_model=list[Experience])
+async def experience(
+    request: Request,
+    company: str | None = None,
+    fields: str | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    portfolio_data: CompactPortfolio = Depends(get_portfolio_data),
+) -> Response:
     if portfolio_data is None:
         raise HTTPException(status_code=500, detail="Portfolio data not available")
-    return portfolio_data.experience
+    if company is None and fields is None and limit is None and offset == 0:
+        return _section_response(request, portfolio_data, "experience")
+
+    items = (
+        portfolio_data.experience_at_company(company)
+        if company is not None
+        else portfolio_data.experience
+    )
+    return _query_response(
+        request,
+        portfolio_data,
+        "experience",
+        items,
+        (company or "").casefold(),
+        _parse_fields(fields, Experience),
+        limit,
+        offset,
+    )
 
 
-@router.get("/api/skills")
-async def skills(portfolio_data: PortfolioData = Depends(load_portfolio_data)) -> list[Any]:
+@router.get("/api/skills", response_model=list[Skill] | list[SkillGroup])
+async def skills(
+    request: Request,
+    view: Literal["flat", "grouped"] = "flat",
+    category: str | None = None,
+    fields: str | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    portfolio_data: CompactPortfolio = Depends(get_portfolio_data),
+) -> Response:
     if portfolio_data is None:
         raise HTTPException(status_code=500, detail="Portfolio data not available")
-    return portfolio_data.skills
+    if category is None and fields is None and limit is None and offset == 0:
+        section = "skill_groups" if view == "grouped" else "skills"
+        return _section_response(request, portfolio_data, section)
+    if view == "grouped":
+        raise HTTPException(
+            status_code=400, detail="view=grouped does not support filtering or pagination"
+        )
+
+    items = (
+        portfolio_data.skills_in_category(category)
+        if category is not None
+        else portfolio_data.skills
+    )
+    return _query_response(
+        request,
+        portfolio_data,
+        "skills",
+        items,
+        (category or "").casefold(),
+        _parse_fields(fields, Skill),
+        limit,
+        offset,
+    )
 
 
-@router.get("/api/education")
-async def education(portfolio_data: PortfolioData = Depends(load_portfolio_data)) -> list[Any]:
+@router.get("/api/education", response_model=list[Education])
+async def education(
+    request: Request, portfolio_data: CompactPortfolio = Depends(get_portfolio_data)
+) -> Response:
     if portfolio_data is None:
         raise HTTPException(status_code=500, detail="Portfolio data not available")
-    return portfolio_data.education
+    return _section_response(request, portfolio_data, "education")
 
 
-@router.get("/api/certifications")
-async def certifications(portfolio_data: PortfolioData = Depends(load_portfolio_data)) -> list[Any]:
+@router.get("/api/certifications", response_model=list[Certification])
+async def certifications(
+    request: Request, portfolio_data: CompactPortfolio = Depends(get_portfolio_data)
+) -> Response:
     if portfolio_data is None:
         raise HTTPException(status_code=500, detail="Portfolio data not available")
-    return portfolio_data.certifications
+    return _section_response(request, portfolio_data, "certifications")
+
+
+def _batch_fragment(
+    portfolio_data: CompactPortfolio, sections: list[str], media_type: str
+) -> bytes:
+    fragments = [
+        (name, bytes(_section_body(portfolio_data, name, media_type).body)) for name in sections
+    ]
+    with stage("batch"):
+        return join_fragments(fragments, media_type)
+
+
+async def _tenant_data(cache: tenants.TenantCache, tenant: str) -> CompactPortfolio | None:
+    portfolio_data = cache.peek(tenant)
+    if portfolio_data is not None:
+        return portfolio_data
+    try:
+        return await run_in_threadpool(cache.get, tenant)
+    except PORTFOLIO_ERRORS as exc:
+        logger.error("Cannot load tenant %s: %s", tenant, exc)
+        return None
+
+
+@router.get("/api/batch", response_model=dict[str, Any])
+async def batch(
+    request: Request,
+    sections: str = Query(..., description=f"Comma-separated: {', '.join(BATCH_SECTIONS)}"),
+    tenant_names: str | None = Query(None, alias="tenants"),
+) -> Response:
+    names = list(dict.fromkeys(name.strip() for name in sections.split(",") if name.strip()))
+    unknown = set(names) - set(BATCH_SECTIONS)
+    if not names or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown sections: {', '.join(sorted(unknown)) or sections!r}",
+        )
+    media_type = _media_type(request)
+    # Joined from the cached section bodies of each portfolio on every request; caching
+    # the result would add an entry for every combination of names clients send.
+    if tenant_names is None:
+        portfolio_data = await get_portfolio_data(request)
+        body = _batch_fragment(portfolio_data, names, media_type)
+        return _api_response(request, cached_body(body, media_type))
+
+    cache = tenants.tenant_cache
+    if cache is None:
+        raise HTTPException(status_code=400, detail="tenants requires PORTFOLIOS_DIR")
+    requested = list(dict.fromkeys(t.strip() for t in tenant_names.split(",") if t.strip()))
+    if not requested or len(requested) > MAX_BATCH_TENANTS:
+        raise HTTPException(
+            status_code=400, detail=f"tenants must list 1 to {MAX_BATCH_TENANTS} names"
+        )
+
+    loaded: list[tuple[str, CompactPortfolio | None]] = []
+    for tenant in requested:
+        tenant_data = await _tenant_data(cache, tenant)
+        if tenant_data is not None:
+            tenant_data = await _localize(request, tenant_data, content_language=False)
+        loaded.append((tenant, tenant_data))
+
+    fragments = [
+        (t, _batch_fragment(d, names, media_type) if d else ENCODED_NULL[media_type])
+        for t, d in loaded
+    ]
+    body = join_fragments(fragments, media_type)
+    return _api_response(request, cached_body(body, media_type))
+
+
+@router.get("/api/search", response_model=list[SearchHit])
+async def search(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    portfolio_data: CompactPortfolio = Depends(get_portfolio_data),
+) -> Response:
+    # Not stored in response_cache: arbitrary queries would evict the page and sections.
+    with stage("search"):
+        hits = portfolio_data.search(q, limit)
+    media_type = _media_type(request)
+    with stage("serialize"):
+        body = serialize_items("search", hits, media_type=media_type)
+    vary, headers = _language_headers(request)
+    if len(api_media_types()) > 1:
+        vary = ("Accept", *vary)
+    if vary:
+        headers["Vary"] = ", ".join(vary)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+@router.get("/api/events", include_in_schema=False)
+async def events(request: Request, version: str | None = None) -> StreamingResponse:
+    """Server-sent events: the data version, then the HTML of each page section that changed."""
+    cache = tenants.tenant_cache
+    preferred = _preferred_locales(request)
+    if cache is None:
+        key = ""
+        loaded = current_portfolio_data()
+        current = compact_portfolio(loaded) if loaded is not None else None
+
+        async def load() -> CompactPortfolio | None:
+            loaded = current_portfolio_data()
+            if loaded is None:
+                return None
+            portfolio_data = compact_portfolio(loaded)
+            return await _in_locale(portfolio_data, portfolio_data.locale_for(preferred))
+
+    else:
+        tenant = getattr(request.state, "tenant", None) or tenants.tenant_from_host(
+            request.headers.get("host")
+        )
+        current = await _tenant_data(cache, tenant) if tenant else None
+        if not tenant or current is None:
+            raise HTTPException(status_code=404, detail="Portfolio not found")
+        key = tenant
+
+        async def load() -> CompactPortfolio | None:
+            portfolio_data = await _tenant_data(cache, tenant)
+            if portfolio_data is None:
+                return None
+            return await _in_locale(portfolio_data, portfolio_data.locale_for(preferred))
+
+    # Each locale is its own channel, rendering only the sections of that language.
+    locale = current.locale_for(preferred) if current is not None else None
+    if locale is not None:
+        key = f"{key}#{locale}"
+    known = request.headers.get("last-event-id") or version
+    return StreamingResponse(
+        broadcaster.subscribe(key, load, known),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/healthz", include_in_schema=False)
+async def healthz() -> dict[str, str]:
+    return {"status": "ok"}
+
+
+@router.get("/readyz", include_in_schema=False)
+async def readyz(request: Request) -> JSONResponse:
+    warmed = getattr(request.app.state, "warmed", False)
+    portfolio_data = current_portfolio_data()
+    loaded = (
+        portfolio_data is not None or tenants.tenant_cache is not None or bool(PORTFOLIO_SHARED_DIR)
+    )
+    if not warmed or not loaded:
+        return JSONResponse({"status": "starting"}, status_code=503)
+    content = {"status": "ready"}
+    if portfolio_data is not None:
+        content["version"] = portfolio_data.version
+    return JSONResponse(content)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(collect(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -14,18 +14,20 @@ document.querySelectorAll('.nav-link').forEach(n => n.addEventListener('click',
 }));
 
 // Smooth scrolling for navigation links
-document.querySelectorAll('a[href^="#"]').forEach(anchor => {
-    anchor.addEventListener('click', function (e) {
-        e.preventDefault();
-        const target = document.querySelector(this.getAttribute('href'));
-        if (target) {
-            target.scrollIntoView({
-                behavior: 'smooth',
-                block: 'start'
-            });
-        }
+function bindSmoothScroll(root) {
+    root.querySelectorAll('a[href^="#"]').forEach(anchor => {
+        anchor.addEventListener('click', function (e) {
+            e.preventDefault();
+            const target = document.querySelector(this.getAttribute('href'));
+            if (target) {
+                target.scrollIntoView({
+                    behavior: 'smooth',
+                    block: 'start'
+                });
+            }
+        });
     });
-});
+}
 
 // Navbar background on scroll
 window.addEventListener('scroll', () => {
@@ -62,8 +64,11 @@ window.addEventListener('scroll', () => {
 });
 
 // Contact form handling with Formspree/static backends and mailto fallback
-const contactForm = document.getElementById('contactForm');
-if (contactForm) {
+function bindContactForm(root) {
+    const contactForm = root.querySelector('#contactForm');
+    if (!contactForm) {
+        return;
+    }
     contactForm.addEventListener('submit', async function(e) {
         e.preventDefault();
 
@@ -191,30 +196,44 @@ document.addEventListener('DOMContentLoaded', () => {
 });
 
 // Skill tags hover effect
-document.querySelectorAll('.skill-tag').forEach(tag => {
-    tag.addEventListener('mouseenter', function() {
-        this.style.transform = 'scale(1.05)';
-        this.style.transition = 'transform 0.2s ease';
-    });
+function bindSkillTags(root) {
+    root.querySelectorAll('.skill-tag').forEach(tag => {
+        tag.addEventListener('mouseenter', function() {
+            this.style.transform = 'scale(1.05)';
+            this.style.transition = 'transform 0.2s ease';
+        });
 
-    tag.addEventListener('mouseleave', function() {
-        this.style.transform = 'scale(1)';
+        tag.addEventListener('mouseleave', function() {
+            this.style.transform = 'scale(1)';
+        });
     });
-});
+}
 
 // Timeline item hover effects
-document.querySelectorAll('.timeline-content').forEach(item => {
-    item.addEventListener('mouseenter', function() {
-        this.style.transform = 'translateY(-5px)';
-        this.style.boxShadow = '0 8px 25px rgba(0, 0, 0, 0.1)';
-        this.style.transition = 'transform 0.3s ease, box-shadow 0.3s ease';
-    });
+function bindTimeline(root) {
+    root.querySelectorAll('.timeline-content').forEach(item => {
+        item.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-5px)';
+            this.style.boxShadow = '0 8px 25px rgba(0, 0, 0, 0.1)';
+            this.style.transition = 'transform 0.3s ease, box-shadow 0.3s ease';
+        });
 
-    item.addEventListener('mouseleave', function() {
-        this.style.transform = 'translateY(0)';
-        this.style.boxShadow = '0 4px 6px rgba(0, 0, 0, 0.05)';
+        item.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0)';
+            this.style.boxShadow = '0 4px 6px rgba(0, 0, 0, 0.05)';
+        });
     });
-});
+}
+
+// Bind the handlers of every element under root; run again on sections swapped in by live updates
+function bindSection(root) {
+    bindSmoothScroll(root);
+    bindContactForm(root);
+    bindSkillTags(root);
+    bindTimeline(root);
+}
+
+bindSection(document);
 
 // Add loading animation
 window.addEventListener('load', () => {
@@ -225,3 +244,61 @@ window.addEventListener('load', () => {
         document.body.style.opacity = '1';
     }, 100);
 });
+
+// Live updates: replace page sections pushed by the server when the portfolio changes
+const liveUpdates = document.querySelector('meta[name="portfolio-events"]');
+if (liveUpdates && window.EventSource) {
+    const eventsUrl = new URL(liveUpdates.getAttribute('content'), document.baseURI);
+    eventsUrl.searchParams.set('version', liveUpdates.dataset.version);
+    const events = new EventSource(eventsUrl);
+
+    events.addEventListener('version', (event) => {
+        liveUpdates.dataset.version = JSON.parse(event.data).version;
+    });
+
+    // Sections the visitor is typing in are only replaced once left untouched
+    const pending = new Map();
+
+    const isSafeToReplace = (section) => {
+        if (section.contains(document.activeElement)) {
+            return false;
+        }
+        return !Array.from(section.querySelectorAll('input, textarea, select')).some(field =>
+            field.type === 'checkbox' || field.type === 'radio'
+                ? field.checked !== field.defaultChecked
+                : field.value !== field.defaultValue
+        );
+    };
+
+    const replaceSection = (id, html) => {
+        const current = document.getElementById(id);
+        if (!current) {
+            pending.delete(id);
+            return;
+        }
+        if (!isSafeToReplace(current)) {
+            pending.set(id, html);
+            return;
+        }
+        pending.delete(id);
+        const template = document.createElement('template');
+        template.innerHTML = html;
+        const replacement = template.content.firstElementChild;
+        current.replaceWith(template.content);
+        if (replacement) {
+            bindSection(replacement);
+        }
+    };
+
+    const retryPending = () => {
+        // After focus has moved or a form was reset
+        setTimeout(() => pending.forEach((html, id) => replaceSection(id, html)));
+    };
+    document.addEventListener('focusout', retryPending);
+    document.addEventListener('reset', retryPending);
+
+    events.addEventListener('section', (event) => {
+        const { id, html } = JSON.parse(event.data);
+        replaceSection(id, html);
+    });
+}
@@ -0,0 +1,120 @@
+import gzip
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.assets import (
+    IMMUTABLE_CACHE_CONTROL,
+    build_assets,
+    get_bundle,
+    minify_css,
+    minify_html,
+    minify_js,
+)
+from src.main import app
+
+
+def test_minify_css_keeps_strings_and_calc():
+    source = """
+    /* header */
+    .a::before {
+        content: ' /* not a comment */ ';
+        width: calc(100% - 50px);
+    }
+
+    .b > .c , .d { color: red ; }
+    """
+
+    assert minify_css(source) == (
+        ".a::before{content:' /* not a comment */ ';width:calc(100% - 50px)}.b>.c,.d{color:red}"
+    )
+
+
+def test_minify_js_strips_comments_outside_strings():
+    source = """
+    // leading comment
+    const url = "http://example.com"; // trailing
+    /* block
+       comment */
+    const tpl = `a // b ${url}`;
+    """
+
+    assert minify_js(source) == 'const url = "http://example.com";\nconst tpl = `a // b ${url}`;'
+
+
+def test_minify_html_keeps_raw_text_and_inline_spacing():
+    source = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <!-- comment -->
+        <title>  Page  </title>
+    </head>
+    <body>
+        <p>One <b>two</b>   <i>three</i></p>
+        <pre>  keep
+      this </pre>
+        <textarea>  x  </textarea>
+        <script>
+            if (a < b) { go(); }
+        </script>
+    </body>
+    </html>
+    """
+
+    assert minify_html(source) == (
+        "<!DOCTYPE html><html><head><title>Page</title></head><body>"
+        "<p>One <b>two</b> <i>three</i></p><pre>  keep\n      this </pre> <textarea>  x  </textarea>"
+        "<script>\n            if (a < b) { go(); }\n        </script></body></html>"
+    )
+
+
+def test_build_assets_hashes_minified_content(tmp_path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "site.css").write_text("body {\n  color: red;\n}\n" * 50)
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG" * 100)
+
+    bundle = build_assets(str(tmp_path))
+
+    name = bundle.manifest["css/site.css"]
+    assert re.fullmatch(r"css/site\.[0-9a-f]{10}\.css", name)
+    asset = bundle.files[name]
+    assert asset.body == b"body{color:red}" * 50
+    assert asset.media_type == "text/css; charset=utf-8"
+    assert asset.gzip is not None and gzip.decompress(asset.gzip) == asset.body
+    assert bundle.files[bundle.manifest["logo.png"]].gzip is None
+    assert bundle.url("css/site.css") == f"./static/{name}"
+
+
+class TestHashedAssets:
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def test_page_links_hashed_stylesheet(self, client):
+        html = client.get("/").text
+
+        assert get_bundle().url("css/style.css") in html
+
+    def test_hashed_asset_is_immutable(self, client):
+        name = get_bundle().manifest["css/style.css"]
+
+        response = client.get(f"/static/{name}", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-type"].startswith("text/css")
+        assert response.content == get_bundle().files[name].body
+
+        revalidated = client.get(
+            f"/static/{name}", headers={"If-None-Match": response.headers["etag"]}
+        )
+        assert revalidated.status_code == 304
+
+    def test_original_path_still_served(self, client):
+        response = client.get("/static/css/style.css")
+
+        assert response.status_code == 200
+        assert "immutable" not in response.headers.get("cache-control", "")
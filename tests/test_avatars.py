@@ -0,0 +1,110 @@
+import io
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+import src.data
+from src import avatars
+from src.cache import response_cache
+from src.data import load_portfolio_data
+from src.export import export_site
+from src.main import app
+
+Image = pytest.importorskip("PIL.Image")
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    monkeypatch.setattr(avatars, "_avatars", {})
+    monkeypatch.setattr(avatars, "_files", {})
+
+
+@pytest.fixture
+def photo(tmp_path):
+    path = tmp_path / "photo.jpg"
+    Image.new("RGB", (600, 400), (200, 30, 30)).save(path)
+    return str(path)
+
+
+def test_build_avatar_resizes_square_variants(photo):
+    avatar = avatars.build_avatar(photo, open(photo, "rb").read())
+
+    assert "image/webp" in avatar.variants
+    assert list(avatar.variants)[-1] == "image/png"
+    for media_type, variants in avatar.variants.items():
+        assert [width for width, _ in variants] == [180, 360]
+        for _, name in variants:
+            assert re.fullmatch(r"avatars/[0-9a-f]{12}-\d+\.[0-9a-f]{10}\.\w+", name)
+            assert avatar.files[name].media_type == media_type
+    with Image.open(io.BytesIO(avatar.files[avatar.fallback].body)) as image:
+        assert image.size == (180, 180)
+    assert avatar.srcset("image/png", lambda name: f"/static/{name}").endswith(" 360w")
+
+
+def test_small_source_keeps_its_size(tmp_path):
+    path = tmp_path / "small.png"
+    Image.new("RGBA", (100, 120)).save(path)
+
+    avatar = avatars.build_avatar(str(path), path.read_bytes())
+
+    assert [width for width, _ in avatar.variants["image/png"]] == [100]
+
+
+def test_ingest_reuses_directory_cache(photo, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "avatars")
+    first = avatars.ingest_avatar(photo, cache_dir)
+    assert first is not None
+
+    monkeypatch.setattr(avatars, "_avatars", {})
+    monkeypatch.setattr(avatars, "read_source", pytest.fail)
+    second = avatars.ingest_avatar(photo, cache_dir)
+
+    assert second == first
+    assert avatars.avatar_file(first.icon) == first.files[first.icon]
+
+
+def test_ingest_failure_keeps_original_link(tmp_path):
+    assert avatars.ingest_avatar(str(tmp_path / "missing.jpg")) is None
+    assert avatars.get_avatar(str(tmp_path / "missing.jpg")) is None
+
+
+def test_page_links_local_variants(photo, monkeypatch):
+    portfolio_data = load_portfolio_data("tests/resources/test_portfolio.yml", use_cache=False)
+    portfolio_data.personal.profile = photo
+    monkeypatch.setattr(src.data, "_portfolio_data", portfolio_data)
+    response_cache.clear()
+    avatar = avatars.ingest_avatar(photo)
+    assert avatar is not None
+
+    with TestClient(app) as client:
+        html = client.get("/").text
+        assert f'<link rel="icon" href="./static/{avatar.icon}">' in html
+        assert '<source type="image/webp" srcset="./static/avatars/' in html
+        assert f'src="./static/{avatar.fallback}"' in html
+        assert "https://" + photo not in html
+
+        response = client.get(f"/static/{avatar.fallback}")
+    response_cache.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert "immutable" in response.headers["cache-control"]
+    assert response.content == avatar.files[avatar.fallback].body
+
+
+def test_export_writes_variants(photo, tmp_path):
+    portfolio = tmp_path / "portfolio.yml"
+    source = open("tests/resources/test_portfolio.yml", encoding="utf-8").read()
+    profile = re.search(r"profile: *(.*)", source)
+    assert profile is not None
+    portfolio.write_text(source.replace(profile.group(1), f'"{photo}"'), encoding="utf-8")
+
+    written = export_site(str(tmp_path / "dist"), str(portfolio), avatar_dir="")
+
+    names = {p.relative_to(tmp_path / "dist").as_posix() for p in written}
+    avatar = avatars.get_avatar(photo)
+    assert avatar is not None
+    assert {f"static/{name}" for name in avatar.files} <= names
+    html = (tmp_path / "dist" / "index.html").read_text(encoding="utf-8")
+    assert f"./static/{avatar.icon}" in html
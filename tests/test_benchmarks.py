@@ -0,0 +1,55 @@
+import json
+
+from benchmarks.run import compare, main
+from benchmarks.synthetic import synthetic_portfolio
+from src.data import PortfolioData
+
+
+def test_synthetic_portfolio_is_valid_and_sized():
+    raw = synthetic_portfolio(skills=500, experiences=30, achievements=2, categories=12)
+
+    portfolio = PortfolioData(**raw)
+
+    assert len(portfolio.skills) == 500
+    assert len(portfolio.experience) == 30
+    assert len(portfolio.skill_groups) <= 12
+
+
+def test_synthetic_portfolio_is_deterministic():
+    assert synthetic_portfolio(seed=3) == synthetic_portfolio(seed=3)
+    assert synthetic_portfolio(seed=3) != synthetic_portfolio(seed=4)
+
+
+def test_compare_flags_regressions():
+    baseline = {"results": {"a": {"median": 1.0}, "b": {"median": 1.0}}}
+    current = {"results": {"a": {"median": 1.1}, "b": {"median": 2.0}, "c": {"median": 9.0}}}
+
+    regressions = compare(current, baseline, tolerance=0.25)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("b:")
+
+
+def test_run_writes_results_and_checks_baseline(tmp_path):
+    output = tmp_path / "results.json"
+
+    assert main(["--sizes", "tiny", "--rounds", "1", "--output", str(output)]) == 0
+
+    report = json.loads(output.read_text())
+    assert "validate[tiny]" in report["results"]
+    assert "api.warm:/api/skills[tiny]" in report["results"]
+    assert 0 < report["memory"]["tiny"]["compact"] < report["memory"]["tiny"]["portfolio_data"]
+    plain, optimized = report["page"]["tiny"]["plain"], report["page"]["tiny"]["optimized"]
+    assert optimized["html"] < plain["html"]
+    assert (plain["blocking_stylesheets"], optimized["blocking_stylesheets"]) == (3, 0)
+    assert optimized["first_paint_gzip"] < plain["first_paint_gzip"]
+
+    for stats in report["results"].values():
+        stats["median"] /= 1000
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(report))
+
+    code = main(
+        ["--sizes", "tiny", "--rounds", "1", "--output", str(output), "--baseline", str(baseline)]
+    )
+    assert code == 1
@@ -0,0 +1,67 @@
+from src.cache import (
+    CachedBody,
+    ResponseCache,
+    cached_body,
+    etag_matches,
+    negotiate_encoding,
+    negotiate_media_type,
+)
+
+
+def test_etag_matches_list_and_weak():
+    etag = '"abc"'
+
+    assert etag_matches('"xyz", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"xyz"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_etag_matches_encoded_variant():
+    assert etag_matches('"abc-gzip"', '"abc"')
+    assert etag_matches('"abc-br"', '"abc"')
+
+
+def test_negotiate_encoding_prefers_brotli():
+    cached = CachedBody(body=b"x", etag='"e"', media_type="text/plain", gzip=b"g", br=b"b")
+
+    assert negotiate_encoding("gzip, br", cached) == "br"
+    assert negotiate_encoding("gzip, br;q=0", cached) == "gzip"
+    assert negotiate_encoding("identity", cached) is None
+    assert negotiate_encoding("*", cached) == "br"
+    assert negotiate_encoding(None, cached) is None
+
+
+def test_small_bodies_are_not_compressed():
+    cached = cached_body(b"{}", "application/json")
+
+    assert cached.gzip is None
+    assert cached.variant("gzip") == (b"{}", cached.etag)
+
+
+def test_response_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    build = lambda: cached_body(b"body", "text/plain")  # noqa: E731
+
+    cache.get_or_build(("v1", "a"), build)
+    cache.get_or_build(("v1", "b"), build)
+    cache.get_or_build(("v1", "a"), build)
+    cache.get_or_build(("v1", "c"), build)
+
+    assert len(cache) == 2
+    built = []
+    cache.get_or_build(("v1", "b"), lambda: built.append(1) or build())
+    assert built == [1]
+
+
+def test_negotiate_media_type():
+    available = ("application/json", "application/msgpack")
+
+    assert negotiate_media_type(None, available) == "application/json"
+    assert negotiate_media_type("*/*", available) == "application/json"
+    assert negotiate_media_type("application/msgpack", available) == "application/msgpack"
+    assert (
+        negotiate_media_type("application/json;q=0.5, application/*", available)
+        == "application/msgpack"
+    )
+    assert negotiate_media_type("text/html", available) == "application/json"
@@ -0,0 +1,101 @@
+import dataclasses
+import json
+
+import pytest
+
+from benchmarks.synthetic import synthetic_portfolio
+from src.compact import CompactPortfolio, compact_portfolio
+from src.data import PortfolioData, load_portfolio_data
+from src.rendering import MSGPACK_MEDIA_TYPE, render_index, serialize_items, serialize_section
+
+PORTFOLIO_PATH = "tests/resources/test_portfolio.yml"
+
+
+@pytest.fixture
+def portfolio_data():
+    return load_portfolio_data(PORTFOLIO_PATH, use_cache=False)
+
+
+def test_serializes_like_the_model(portfolio_data):
+    compact = CompactPortfolio.from_data(portfolio_data)
+
+    assert serialize_section(compact, "portfolio") == portfolio_data.model_dump_json().encode()
+    for section in ("experience", "skills", "education", "certifications"):
+        expected = [item.model_dump() for item in getattr(portfolio_data, section)]
+        assert json.loads(serialize_section(compact, section)) == expected
+
+
+def test_serializes_portfolio_as_msgpack(portfolio_data):
+    msgpack = pytest.importorskip("msgpack")
+    body = serialize_section(portfolio_data, "portfolio", MSGPACK_MEDIA_TYPE)
+
+    assert msgpack.unpackb(body) == portfolio_data.model_dump(mode="json")
+
+
+def test_renders_like_the_model(portfolio_data):
+    compact = CompactPortfolio.from_data(portfolio_data)
+
+    assert render_index(compact) == render_index(portfolio_data)
+
+
+def test_is_read_only(portfolio_data):
+    compact = CompactPortfolio.from_data(portfolio_data)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        compact.version = "other"  # type: ignore[misc]
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        compact.skills[0].name = "other"  # type: ignore[misc]
+    assert not hasattr(compact.skills[0], "__dict__")
+
+
+def test_lookups_match_the_model(portfolio_data):
+    compact = CompactPortfolio.from_data(portfolio_data)
+    category = portfolio_data.skills[0].category
+    company = portfolio_data.experience[0].company
+
+    assert compact.version == portfolio_data.version
+    assert [s.name for s in compact.skills_in_category(category.upper())] == [
+        s.name for s in portfolio_data.skills_in_category(category)
+    ]
+    assert [e.period for e in compact.experience_at_company(company.lower())] == [
+        e.period for e in portfolio_data.experience_at_company(company)
+    ]
+    assert compact.skills_in_category("missing") == ()
+    assert list(compact.skill_groups) == list(portfolio_data.skill_groups)
+
+
+def test_search_matches_the_model(portfolio_data):
+    compact = CompactPortfolio.from_data(portfolio_data)
+    expected = [hit.model_dump() for hit in portfolio_data.search("python")]
+
+    assert expected
+    assert json.loads(serialize_items("search", compact.search("python"))) == expected
+
+
+def test_categories_differing_by_case_are_merged():
+    raw = synthetic_portfolio(skills=4, categories=2)
+    raw["skills"][1]["category"] = raw["skills"][0]["category"].upper()
+    portfolio_data = PortfolioData(**raw)
+    compact = CompactPortfolio.from_data(portfolio_data)
+    category = raw["skills"][0]["category"]
+
+    assert len(compact.skill_groups) == 2
+    assert [s.name for s in compact.skills_in_category(category)] == [
+        s.name for s in portfolio_data.skills_in_category(category)
+    ]
+    assert len(compact.skills_in_category(category)) == 4
+
+
+def test_repeated_strings_are_shared():
+    compact = CompactPortfolio.from_data(PortfolioData(**synthetic_portfolio(skills=50)))
+    by_category: dict[str, str] = {}
+    for skill in compact.skills:
+        assert by_category.setdefault(skill.category, skill.category) is skill.category
+
+
+def test_compact_portfolio_reuses_conversion(portfolio_data):
+    compact = compact_portfolio(portfolio_data)
+
+    assert compact_portfolio(portfolio_data) is compact
+    assert compact_portfolio(compact) is compact
+    assert compact_portfolio(load_portfolio_data(PORTFOLIO_PATH, use_cache=False)) is not compact
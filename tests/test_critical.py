@@ -0,0 +1,73 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import src.data
+import src.rendering
+from src.cache import response_cache
+from src.critical import critical_css, inline_critical_css
+from src.data import load_portfolio_data
+from src.export import export_site
+from src.main import app
+
+CSS = (
+    "*{margin:0}body{color:#333}.hero{color:white;animation:fadeIn 1s}.hero a:hover{color:red}"
+    ".card{padding:0}#home{top:0}#other{top:1px}.nav.active{left:0}"
+    "@media (max-width:768px){.hero{padding:0}.card{padding:1px}}"
+    "@keyframes fadeIn{from{opacity:0}to{opacity:1}}@keyframes unused{to{opacity:1}}"
+)
+PAGE = (
+    '<html><head><title>T</title><link rel="stylesheet" href="/s.css">'
+    '<link href="https://fonts.example/css" rel="stylesheet"><link rel="icon" href="/i.png">'
+    '</head><body><nav class="nav"></nav><section id="home" class="hero"><a href="#">x</a>'
+    '</section><section><div class="card"></div></section></body></html>'
+)
+
+
+def test_critical_css_keeps_rules_above_the_fold():
+    assert critical_css(CSS, PAGE) == (
+        "*{margin:0}body{color:#333}.hero{color:white;animation:fadeIn 1s}"
+        ".hero a:hover{color:red}#home{top:0}@media (max-width:768px){.hero{padding:0}}"
+        "@keyframes fadeIn{from{opacity:0}to{opacity:1}}"
+    )
+
+
+def test_inline_critical_css_loads_stylesheets_asynchronously():
+    page = inline_critical_css(PAGE, CSS)
+
+    head = page[: page.index("</head>")]
+    assert head.index("<style>*{margin:0}") < head.index('<link rel="preload" href="/s.css"')
+    assert '<noscript><link rel="stylesheet" href="/s.css"></noscript>' in head
+    assert '<link rel="preload" href="https://fonts.example/css" as="style"' in head
+    assert head.count('<link rel="stylesheet"') == 2
+    assert '<link rel="icon" href="/i.png">' in head
+    assert inline_critical_css("<p>no head</p>", CSS) == "<p>no head</p>"
+
+
+class TestOptimizedPage:
+    @pytest.fixture
+    def client(self, monkeypatch):
+        portfolio_data = load_portfolio_data("tests/resources/test_portfolio.yml", use_cache=False)
+        monkeypatch.setattr(src.data, "_portfolio_data", portfolio_data)
+        monkeypatch.setattr(src.rendering, "PORTFOLIO_OPTIMIZE_HTML", True)
+        response_cache.clear()
+        yield TestClient(app)
+        response_cache.clear()
+
+    def test_page_is_optimized_once_per_version(self, client, monkeypatch):
+        page = client.get("/").text
+
+        assert page.startswith("<!DOCTYPE html><html")
+        assert "<style>" in page and "\n    " not in page
+        assert '<link rel="preload" href="./static/css/style.' in page
+        assert '<section id="experience" class="experience">' in page
+
+        monkeypatch.setattr(src.rendering, "optimize_page", pytest.fail)
+        assert client.get("/").text == page
+
+
+def test_export_optimizes_pages(tmp_path):
+    export_site(str(tmp_path), "tests/resources/test_portfolio.yml", optimize=True)
+
+    page = (tmp_path / "index.html").read_text(encoding="utf-8")
+    assert "<style>" in page
+    assert '<noscript><link rel="stylesheet" href="./static/css/style.' in page
@@ -8,6 +8,10 @@ from src.data import (
     PortfolioData,
     Skill,
     load_portfolio_data,
+    parse_portfolio,
+    reload_portfolio_data,
+    snapshot_path,
+    watch_portfolio_data,
 )
 
 
@@ -168,3 +172,141 @@ class TestErrorHandling:
 
         with pytest.raises(FileNotFoundError, match="Test error"):
             load_portfolio_data(use_cache=False)
+
+
+class TestVersion:
+    def test_version_is_content_digest(self):
+        test_file = "tests/resources/test_portfolio.yml"
+        first = load_portfolio_data(test_file, use_cache=False)
+        second = load_portfolio_data(test_file, use_cache=False)
+
+        assert first.version == second.version
+        assert len(first.version) == 16
+
+    def test_version_without_source_file(self):
+        with open("tests/resources/test_portfolio.yml", encoding="utf-8") as file:
+            raw = yaml.safe_load(file)
+
+        first = PortfolioData(**raw)
+        second = PortfolioData(**raw)
+
+        assert first.version
+        assert first.version == second.version
+
+
+class TestReload:
+    @pytest.fixture
+    def portfolio_file(self, tmp_path, monkeypatch):
+        import src.data
+
+        monkeypatch.setattr(src.data, "_portfolio_data", None)
+        monkeypatch.setattr(src.data, "_portfolio_stamp", None)
+
+        path = tmp_path / "portfolio.yml"
+        with open("tests/resources/cache_test_portfolio.yml", encoding="utf-8") as file:
+            path.write_text(file.read(), encoding="utf-8")
+        return path
+
+    def test_reload_swaps_changed_file(self, portfolio_file):
+        first = reload_portfolio_data(str(portfolio_file))
+        assert first is not None
+        assert reload_portfolio_data(str(portfolio_file)) is None
+
+        portfolio_file.write_text(
+            portfolio_file.read_text().replace("Cache Test User", "Reloaded User")
+        )
+        second = reload_portfolio_data(str(portfolio_file))
+
+        assert second is not None
+        assert second.personal.name == "Reloaded User"
+        assert second.version != first.version
+        assert load_portfolio_data() is second
+
+    def test_reload_keeps_last_good_on_invalid_edit(self, portfolio_file):
+        good = reload_portfolio_data(str(portfolio_file))
+
+        portfolio_file.write_text("personal: [unclosed")
+
+        assert reload_portfolio_data(str(portfolio_file)) is None
+        assert load_portfolio_data() is good
+
+    def test_watcher_notifies_on_change(self, portfolio_file):
+        import asyncio
+
+        reload_portfolio_data(str(portfolio_file))
+        changes = []
+
+        async def run():
+            watcher = asyncio.create_task(
+                watch_portfolio_data(str(portfolio_file), 0.01, changes.append)
+            )
+            await asyncio.sleep(0.05)
+            portfolio_file.write_text(
+                portfolio_file.read_text().replace("Cache Test User", "Watched User")
+            )
+            for _ in range(100):
+                if changes:
+                    break
+                await asyncio.sleep(0.01)
+            watcher.cancel()
+
+        asyncio.run(run())
+
+        assert [data.personal.name for data in changes] == ["Watched User"]
+
+
+class TestSnapshot:
+    @pytest.fixture
+    def content(self):
+        with open("tests/resources/test_portfolio.yml", encoding="utf-8") as file:
+            return file.read()
+
+    def test_snapshot_round_trip(self, tmp_path, content):
+        parsed = parse_portfolio(content, str(tmp_path))
+
+        assert (tmp_path / snapshot_path("", parsed.version)).exists()
+
+        restored = parse_portfolio(content, str(tmp_path))
+        assert restored is not parsed
+        assert restored == parsed
+        assert restored.version == parsed.version
+
+    def test_snapshot_skips_yaml_and_validation(self, tmp_path, content, monkeypatch):
+        parse_portfolio(content, str(tmp_path))
+
+        def fail(*args, **kwargs):
+            raise AssertionError("snapshot hit should not parse YAML")
+
+        monkeypatch.setattr(yaml, "load", fail)
+
+        assert parse_portfolio(content, str(tmp_path)).personal.name == "John Doe"
+
+    def test_corrupt_snapshot_is_ignored(self, tmp_path, content):
+        parsed = parse_portfolio(content, str(tmp_path))
+        (tmp_path / snapshot_path("", parsed.version)).write_bytes(b"not a pickle")
+
+        assert parse_portfolio(content, str(tmp_path)) == parsed
+
+    def test_schema_version_is_part_of_key(self, tmp_path, content, monkeypatch):
+        import src.data
+
+        parsed = parse_portfolio(content, str(tmp_path))
+        monkeypatch.setattr(
+            src.data, "SNAPSHOT_SCHEMA_VERSION", src.data.SNAPSHOT_SCHEMA_VERSION + 1
+        )
+
+        assert not (tmp_path / snapshot_path("", parsed.version)).exists()
+
+    def test_previous_version_is_pruned(self, tmp_path, content):
+        snapshots = tmp_path / "snapshots"
+        source = str(tmp_path / "portfolio.yml")
+        other = parse_portfolio(content.replace("John Doe", "Jane Roe"), str(snapshots))
+        first = parse_portfolio(content, str(snapshots), source=source)
+
+        second = parse_portfolio(
+            content.replace("John Doe", "John Q. Doe"), str(snapshots), source=source
+        )
+
+        assert not (snapshots / snapshot_path("", first.version)).exists()
+        assert (snapshots / snapshot_path("", second.version)).exists()
+        assert (snapshots / snapshot_path("", other.version)).exists()
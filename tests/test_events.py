@@ -0,0 +1,160 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from src.data import load_portfolio_data
+from src.events import Broadcaster, Channel, broadcaster
+from src.main import app
+from src.rendering import PAGE_SECTIONS, render_fragments
+
+
+def _portfolio(name="John Doe"):
+    portfolio_data = load_portfolio_data("tests/resources/test_portfolio.yml", use_cache=False)
+    if name != "John Doe":
+        portfolio_data = portfolio_data.model_copy(deep=True)
+        portfolio_data.personal.name = name
+        portfolio_data._version = name
+    return portfolio_data
+
+
+def _events(message):
+    parsed = []
+    for block in message.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        if "event" in fields:
+            parsed.append((fields["event"], json.loads(fields["data"])))
+    return parsed
+
+
+def test_render_fragments_match_page_sections():
+    fragments = render_fragments(_portfolio())
+
+    assert list(fragments) == list(PAGE_SECTIONS)
+    assert fragments["experience"].startswith('<section id="experience"')
+    assert "Tech Corp" in fragments["experience"]
+
+
+def test_channel_pushes_version_then_changed_sections():
+    async def scenario():
+        current = {"data": _portfolio()}
+
+        async def load():
+            return current["data"]
+
+        channel = Channel(load)
+        stream = channel.subscribe(None, interval=0.01, keepalive=60)
+        assert (await anext(stream)).startswith("retry:")
+
+        first = _events(await anext(stream))
+        assert first[0] == ("version", {"version": current["data"].version})
+        assert [data["id"] for _, data in first[1:]] == list(PAGE_SECTIONS)
+
+        current["data"] = _portfolio("Jane Roe")
+        update = _events(await asyncio.wait_for(anext(stream), 5))
+        assert update[0] == ("version", {"version": "Jane Roe"})
+        changed = {data["id"] for _, data in update[1:]}
+        assert changed == {"home"}
+
+        await stream.aclose()
+        assert channel.subscribers == 0
+
+    asyncio.run(scenario())
+
+
+def test_channel_keepalive_and_known_version():
+    async def scenario():
+        portfolio_data = _portfolio()
+
+        async def load():
+            return portfolio_data
+
+        channel = Channel(load)
+        stream = channel.subscribe(portfolio_data.version, interval=0.01, keepalive=0.02)
+        await anext(stream)
+
+        assert await asyncio.wait_for(anext(stream), 5) == ": keepalive\n\n"
+        await stream.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_broadcaster_shares_and_drops_channels():
+    async def scenario():
+        broadcaster = Broadcaster()
+
+        async def load():
+            return None
+
+        first = broadcaster.subscribe("", load, None)
+        second = broadcaster.subscribe("", load, None)
+        await anext(first)
+        await anext(second)
+        assert len(broadcaster.channels) == 1
+        assert len(broadcaster) == 2
+
+        await first.aclose()
+        assert len(broadcaster.channels) == 1
+        await second.aclose()
+        assert broadcaster.channels == {}
+
+    asyncio.run(scenario())
+
+
+def test_events_endpoint_streams_current_version(monkeypatch):
+    import src.data
+
+    portfolio_data = _portfolio()
+    monkeypatch.setattr(src.data, "_portfolio_data", portfolio_data)
+
+    async def scenario():
+        sent = []
+        received = asyncio.Event()
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/api/events",
+            "raw_path": b"/api/events",
+            "root_path": "",
+            "query_string": b"version=stale",
+            "headers": [(b"host", b"testserver")],
+            "client": ("127.0.0.1", 1),
+            "server": ("testserver", 80),
+        }
+
+        async def receive():
+            await received.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            if b"event: section" in message.get("body", b""):
+                received.set()
+
+        await asyncio.wait_for(app(scope, receive, send), 5)
+        return sent
+
+    sent = asyncio.run(scenario())
+
+    start = sent[0]
+    assert start["status"] == 200
+    assert (b"content-type", b"text/event-stream; charset=utf-8") in start["headers"]
+    body = b"".join(m.get("body", b"") for m in sent[1:]).decode()
+    assert ("version", {"version": portfolio_data.version}) in _events(body)
+    assert broadcaster.channels == {}
+
+
+def test_page_advertises_live_updates_only_with_hot_reload(monkeypatch):
+    import src.views
+    from src.cache import response_cache
+
+    response_cache.clear()
+    assert 'name="portfolio-events"' not in TestClient(app).get("/").text
+
+    monkeypatch.setattr(src.views, "LIVE_UPDATES", True)
+    response_cache.clear()
+    assert 'name="portfolio-events"' in TestClient(app).get("/").text
+    response_cache.clear()
@@ -0,0 +1,41 @@
+import gzip
+import json
+import re
+
+from src.cli import main
+from src.export import export_site
+
+
+def test_export_writes_site(tmp_path):
+    out = tmp_path / "dist"
+
+    export_site(str(out), "tests/resources/test_portfolio.yml")
+
+    html = (out / "index.html").read_text(encoding="utf-8")
+    assert "John Doe" in html
+    stylesheet = re.search(r'href="\./static/(css/style\.[0-9a-f]{10}\.css)"', html)
+    assert stylesheet is not None
+    assert (out / "static" / stylesheet.group(1)).exists()
+    assert gzip.decompress((out / "index.html.gz").read_bytes()) == html.encode("utf-8")
+
+    skills = json.loads((out / "api" / "skills.json").read_bytes())
+    assert len(skills) == 6
+    assert {"name", "category"} <= skills[0].keys()
+    groups = json.loads((out / "api" / "skill_groups.json").read_bytes())
+    assert sum(len(group["values"]) for group in groups) == 6
+
+
+def test_export_is_deterministic(tmp_path):
+    first = export_site(str(tmp_path / "a"), "tests/resources/test_portfolio.yml")
+    second = export_site(str(tmp_path / "b"), "tests/resources/test_portfolio.yml")
+
+    assert [p.read_bytes() for p in first] == [p.read_bytes() for p in second]
+
+
+def test_export_command(tmp_path):
+    out = tmp_path / "dist"
+
+    code = main(["export", "--portfolio", "tests/resources/test_portfolio.yml", "--out", str(out)])
+
+    assert code == 0
+    assert (out / "api" / "portfolio.json").exists()
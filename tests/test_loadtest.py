@@ -0,0 +1,142 @@
+import asyncio
+import json
+
+import pytest
+
+from src.cli import main
+from src.loadtest import (
+    HTTPConnection,
+    Sample,
+    build_report,
+    loadtest,
+    parse_header,
+    parse_mix,
+)
+
+
+def test_parse_mix():
+    assert parse_mix("/=4, /api/skills,/api/portfolio=0.5,/api/search?q=go=2,/api/search?q=py") == {
+        "/": 4.0,
+        "/api/skills": 1.0,
+        "/api/portfolio": 0.5,
+        "/api/search?q=go": 2.0,
+        "/api/search?q=py": 1.0,
+    }
+    for spec in ("", "api/skills=1", "/=0", "/=-1"):
+        with pytest.raises(ValueError):
+            parse_mix(spec)
+
+
+def test_parse_header():
+    assert parse_header("Host: alice.example.com") == ("Host", "alice.example.com")
+    with pytest.raises(ValueError):
+        parse_header("no colon")
+
+
+def test_build_report():
+    samples = [Sample("/", ms / 1000, 200, 10) for ms in range(1, 101)]
+    samples += [
+        Sample("/api/skills", 0.0002, 304, conditional=True),
+        Sample("/api/skills", 0.02, 500),
+        Sample("/api/skills", 0.03, error="ConnectionResetError"),
+    ]
+
+    report = build_report(samples, 2.0, {"concurrency": 4})
+
+    assert report["requests"] == 103 and report["rps"] == 51.5
+    assert report["status"] == {"200": 100, "304": 1, "500": 1}
+    assert report["errors"] == {"ConnectionResetError": 1, "HTTP 500": 1}
+    assert report["error_count"] == 2 and report["conditional"] == 1
+    assert report["paths"]["/"]["latency_ms"]["p50"] == pytest.approx(50)
+    assert report["paths"]["/"]["latency_ms"]["p99"] == pytest.approx(99)
+    assert report["paths"]["/api/skills"]["errors"] == 2
+    assert sum(bucket["count"] for bucket in report["histogram"]) == 103
+    assert report["histogram"][0] == {"le_ms": 0.5, "count": 1}
+    assert report["histogram"][-1]["le_ms"] == "+Inf"
+
+
+def test_in_process_load_revalidates():
+    samples, elapsed = asyncio.run(
+        loadtest("asgi", requests=60, concurrency=4, conditional=1.0, mix={"/api/skills": 1})
+    )
+
+    assert len(samples) == 60 and elapsed > 0
+    assert not [sample for sample in samples if sample.failed]
+    assert sum(sample.status == 304 for sample in samples) >= 56
+    assert all(sample.conditional == (sample.status == 304) for sample in samples)
+
+
+def test_http_connection_reads_every_framing():
+    responses = [
+        b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\nETag: "a"\r\n\r\n'
+        b"3\r\nabc\r\n2;x=y\r\nde\r\n0\r\n\r\n",
+        b'HTTP/1.1 304 Not Modified\r\nETag: "a"\r\n\r\n',
+        b"HTTP/1.1 404 Not Found\r\nContent-Length: 4\r\nConnection: close\r\n\r\nnope",
+    ]
+    requests: list[bytes] = []
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while responses:
+            requests.append(await reader.readuntil(b"\r\n\r\n"))
+            writer.write(responses.pop(0))
+            await writer.drain()
+        writer.close()
+
+    async def run() -> list:
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        connection = HTTPConnection("127.0.0.1", port)
+        try:
+            return [
+                await connection.get("/", [("accept-encoding", "gzip")]),
+                await connection.get("/", [("if-none-match", '"a"')]),
+                await connection.get("/missing", []),
+            ]
+        finally:
+            await connection.close()
+            server.close()
+
+    first, second, third = asyncio.run(run())
+
+    assert (first.status, first.etag, first.size) == (200, '"a"', 5)
+    assert (second.status, second.size) == (304, 0)
+    assert (third.status, third.size) == (404, 4)
+    assert requests[0].startswith(b"GET / HTTP/1.1\r\nHost: 127.0.0.1:")
+    assert b'if-none-match: "a"\r\n' in requests[1]
+
+
+def test_loadtest_command_writes_report(tmp_path):
+    output = tmp_path / "report.json"
+
+    code = main(
+        ["loadtest", "-n", "20", "-c", "2", "--mix", "/=1,/api/portfolio=1", "-o", str(output)]
+    )
+
+    assert code == 0
+    report = json.loads(output.read_text())
+    assert report["requests"] == 20 and report["error_count"] == 0
+    assert set(report["paths"]) <= {"/", "/api/portfolio"}
+    assert report["config"]["target"] == "asgi"
+
+
+def test_loadtest_rejects_unknown_target():
+    with pytest.raises(ValueError):
+        asyncio.run(loadtest("https://example.com", requests=1))
+
+
+@pytest.mark.parametrize(
+    "arguments",
+    [
+        ["--target", "foo"],
+        ["-n", "0"],
+        ["-n", "10", "-c", "0"],
+        ["-n", "10", "-c", "-2"],
+        ["--conditional", "1.5"],
+        ["--conditional", "-0.1"],
+        ["--mix", "api"],
+        ["--header", "nocolon"],
+    ],
+)
+def test_loadtest_command_rejects_bad_options(arguments, capsys):
+    assert main(["loadtest", *arguments]) == 2
+    assert capsys.readouterr().err
@@ -0,0 +1,170 @@
+import json
+
+import pytest
+import yaml
+from fastapi.testclient import TestClient
+
+import src.data
+from src.cache import accepted_languages, response_cache
+from src.compact import compact_portfolio
+from src.data import load_portfolio_data
+from src.export import export_site
+from src.locales import declared_locales, localize_document, match_locale
+from src.main import app
+from src.validate import check_content
+
+LOCALIZED_PATH = "tests/resources/localized_portfolio.yml"
+
+
+def test_match_locale():
+    locales = ["en", "pt-br", "pt-pt"]
+
+    assert match_locale(["pt-PT"], locales) == "pt-pt"
+    assert match_locale(["pt"], locales) == "pt-br"
+    assert match_locale(["de", "pt_BR"], locales) == "pt-br"
+    assert match_locale(["de"], locales) == "en"
+    assert match_locale([], locales) == "en"
+
+
+def test_accepted_languages_by_quality():
+    header = "de;q=0.5, pt-BR, *;q=0.9, fr;q=0, en;q=0.8"
+
+    assert accepted_languages(header) == ["pt-br", "en", "de"]
+    assert accepted_languages(None) == []
+
+
+def test_localize_document():
+    raw = {
+        "locales": ["en", "pt-BR"],
+        "title": {"en": "Engineer", "pt-BR": "Engenheiro"},
+        "links": {"en": "a", "home": "b"},
+        "items": [{"en": ["x"], "pt-br": ["y"]}],
+        "note": {"en": "Only English"},
+    }
+
+    localized = localize_document(raw, "pt-BR")
+
+    assert localized["title"] == "Engenheiro"
+    assert localized["links"] == {"en": "a", "home": "b"}
+    assert localized["items"] == [["y"]]
+    assert localized["note"] == "Only English"
+    assert (localized["locale"], localized["locales"]) == ("pt-br", ["en", "pt-br"])
+    assert localize_document(raw)["title"] == "Engineer"
+    assert localize_document({"title": "x"}, "pt") == {"title": "x"}
+
+
+@pytest.mark.parametrize("locales", [[], "en", ["en", "not a tag"]])
+def test_declared_locales_rejects_bad_values(locales):
+    with pytest.raises(ValueError):
+        declared_locales({"locales": locales})
+
+
+def test_validate_reports_each_locale():
+    raw = yaml.safe_load(open(LOCALIZED_PATH, encoding="utf-8"))
+    raw["personal"]["title"]["pt-BR"] = ["not", "a", "string"]
+
+    issues = check_content(yaml.safe_dump(raw, allow_unicode=True))
+
+    assert [issue.location for issue in issues] == ["personal.title"]
+    assert check_content(open(LOCALIZED_PATH, encoding="utf-8").read()) == []
+    assert [i.location for i in check_content("locales: en\n")] == ["locales"]
+
+
+def test_export_writes_each_locale(tmp_path):
+    export_site(str(tmp_path), LOCALIZED_PATH)
+
+    assert '<html lang="en">' in (tmp_path / "index.html").read_text(encoding="utf-8")
+    html = (tmp_path / "pt-br" / "index.html").read_text(encoding="utf-8")
+    assert '<html lang="pt-br">' in html
+    assert "Engenheiro de Software" in html
+    assert 'href="../static/css/style.' in html
+    experience = json.loads((tmp_path / "pt-br" / "api" / "experience.json").read_bytes())
+    assert experience[0]["duration"] == "2 anos"
+
+
+class TestLocalizedEndpoints:
+    @pytest.fixture
+    def portfolio_data(self, monkeypatch):
+        portfolio_data = load_portfolio_data(LOCALIZED_PATH, use_cache=False)
+        monkeypatch.setattr(src.data, "_portfolio_data", portfolio_data)
+        response_cache.clear()
+        yield portfolio_data
+        response_cache.clear()
+
+    @pytest.fixture
+    def client(self, portfolio_data):
+        return TestClient(app)
+
+    def test_default_locale(self, client):
+        response = client.get("/api/experience")
+
+        assert response.json()[0]["position"] == "Senior Software Engineer"
+        assert response.headers["content-language"] == "en"
+        assert "Accept-Language" in response.headers["vary"]
+
+    def test_accept_language_selects_locale(self, client):
+        response = client.get("/api/experience", headers={"Accept-Language": "pt;q=0.9, en;q=0.5"})
+
+        assert response.json()[0]["position"] == "Engenheiro de Software Sênior"
+        assert response.headers["content-language"] == "pt-br"
+        assert "Accept-Language" in response.headers["vary"]
+
+        etag = response.headers["etag"]
+        english = client.get("/api/experience", headers={"Accept-Language": "en"})
+        assert english.headers["etag"] != etag
+        revalidated = client.get(
+            "/api/experience", headers={"Accept-Language": "pt-BR", "If-None-Match": etag}
+        )
+        assert revalidated.status_code == 304
+
+    def test_path_prefix_selects_locale(self, client):
+        response = client.get("/pt-br/api/skills", headers={"Accept-Language": "en"})
+
+        assert response.json()[0]["category"] == "Programação"
+        assert response.headers["content-language"] == "pt-br"
+        assert "Accept-Language" not in response.headers.get("vary", "")
+
+        page = client.get("/pt-br/")
+        assert '<html lang="pt-br">' in page.text
+        assert "Engenheiro de Software" in page.text
+
+    def test_prefix_without_slash_redirects(self, client):
+        response = client.get("/pt-br?x=1", follow_redirects=False)
+
+        assert response.status_code == 308
+        assert response.headers["location"].endswith("/pt-br/?x=1")
+
+    def test_undeclared_prefix_is_not_found(self, client):
+        assert client.get("/zz/").status_code == 404
+        assert client.get("/zz", follow_redirects=False).status_code == 404
+        assert client.get("/de/api/skills").status_code == 404
+
+    def test_streamed_page_has_language_headers(self, client, monkeypatch):
+        import src.views
+
+        monkeypatch.setattr(src.views, "PORTFOLIO_STREAM_HTML", True)
+
+        response = client.get("/", headers={"Accept-Language": "pt"})
+
+        assert "etag" not in response.headers
+        assert response.headers["content-language"] == "pt-br"
+        assert "Accept-Language" in response.headers["vary"]
+
+    def test_locales_are_built_on_demand(self, client, portfolio_data):
+        compact = compact_portfolio(portfolio_data)
+
+        client.get("/api/portfolio", headers={"Accept-Language": "en, fr"})
+        assert compact._variants == {}
+        client.get("/api/portfolio", headers={"Accept-Language": "pt"})
+        client.get("/pt-br/api/skills")
+        assert list(compact._variants) == ["pt-br"]
+
+    def test_unlocalized_portfolio_has_no_language_headers(self, client, monkeypatch):
+        portfolio_data = load_portfolio_data("tests/resources/test_portfolio.yml", use_cache=False)
+        monkeypatch.setattr(src.data, "_portfolio_data", portfolio_data)
+        response_cache.clear()
+
+        response = client.get("/api/skills", headers={"Accept-Language": "pt"})
+
+        assert "content-language" not in response.headers
+        assert "Accept-Language" not in response.headers.get("vary", "")
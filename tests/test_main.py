@@ -42,6 +42,16 @@ class TestPortfolioEndpoints:
             assert "name" in data[0]
             assert "category" in data[0]
 
+    def test_get_skills_grouped(self, client):
+        flat = client.get("/api/skills").json()
+        response = client.get("/api/skills", params={"view": "grouped"})
+
+        assert response.status_code == 200
+        groups = response.json()
+        assert [name for group in groups for name in group["values"]] == [s["name"] for s in flat]
+        if len(groups) > 0:
+            assert {"category", "priority", "values"} <= groups[0].keys()
+
     def test_get_education_success(self, client):
         response = client.get("/api/education")
 
@@ -115,3 +125,398 @@ class TestApplicationConfiguration:
     def test_static_files_mounted(self):
         routes = [route.path for route in app.routes if hasattr(route, "path")]
         assert "/static" in routes
+
+
+class TestPageCache:
+    @pytest.fixture
+    def client(self):
+        from src.cache import response_cache
+
+        response_cache.clear()
+        return TestClient(app)
+
+    def test_main_page_has_etag(self, client):
+        response = client.get("/")
+
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('"')
+        assert response.headers["cache-control"] == "no-cache"
+
+    def test_main_page_not_modified(self, client):
+        etag = client.get("/").headers["etag"]
+
+        response = client.get("/", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_main_page_rendered_once(self, client, monkeypatch):
+        import src.views
+
+        calls = 0
+        render_index = src.views._render_index
+
+        def counting_render(portfolio_data):
+            nonlocal calls
+            calls += 1
+            return render_index(portfolio_data)
+
+        monkeypatch.setattr(src.views, "_render_index", counting_render)
+
+        first = client.get("/")
+        second = client.get("/")
+
+        assert calls == 1
+        assert first.content == second.content
+
+
+class TestApiCache:
+    @pytest.fixture
+    def client(self):
+        from src.cache import response_cache
+
+        response_cache.clear()
+        return TestClient(app)
+
+    @pytest.mark.parametrize(
+        "path", ["/api/portfolio", "/api/experience", "/api/skills", "/api/education"]
+    )
+    def test_api_not_modified(self, client, path):
+        response = client.get(path)
+        etag = response.headers["etag"]
+
+        revalidated = client.get(path, headers={"If-None-Match": etag})
+
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+
+    def test_api_gzip_variant(self, client):
+        identity = client.get("/api/portfolio", headers={"Accept-Encoding": "identity"})
+        compressed = client.get("/api/portfolio", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in identity.headers
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in compressed.headers["vary"]
+        assert compressed.headers["etag"] != identity.headers["etag"]
+        assert compressed.json() == identity.json()
+
+    def test_api_brotli_variant(self, client):
+        pytest.importorskip("brotli")
+
+        response = client.get("/api/portfolio", headers={"Accept-Encoding": "gzip, br"})
+
+        assert response.headers["content-encoding"] == "br"
+        assert "personal" in response.json()
+
+    def test_api_serialized_once(self, client, monkeypatch):
+        import src.views
+
+        calls = 0
+        serialize_section = src.views._serialize_section
+
+        def counting_serialize(portfolio_data, section, *args):
+            nonlocal calls
+            calls += 1
+            return serialize_section(portfolio_data, section)
+
+        monkeypatch.setattr(src.views, "_serialize_section", counting_serialize)
+
+        client.get("/api/skills")
+        client.get("/api/skills")
+
+        assert calls == 1
+
+
+class TestSectionQueries:
+    @pytest.fixture
+    def client(self, monkeypatch):
+        import src.data
+
+        portfolio_data = src.data.load_portfolio_data(
+            "tests/resources/test_portfolio.yml", use_cache=False
+        )
+        monkeypatch.setattr(src.data, "_portfolio_data", portfolio_data)
+        return TestClient(app)
+
+    def test_experience_projection(self, client):
+        response = client.get("/api/experience", params={"fields": "company,position"})
+
+        assert response.status_code == 200
+        assert all(item.keys() == {"company", "position"} for item in response.json())
+
+    def test_experience_filter_by_company(self, client):
+        response = client.get("/api/experience", params={"company": "techcorp"})
+        assert response.json() == []
+
+        response = client.get("/api/experience", params={"company": "tech corp"})
+        assert [item["company"] for item in response.json()] == ["Tech Corp"]
+        assert response.headers["x-total-count"] == "1"
+
+    def test_skills_filter_by_category(self, client):
+        skills = client.get("/api/skills").json()
+        category = skills[0]["category"]
+
+        response = client.get("/api/skills", params={"category": category.upper()})
+
+        expected = [s["name"] for s in skills if s["category"] == category]
+        assert [s["name"] for s in response.json()] == expected
+
+    def test_skills_pagination(self, client):
+        skills = client.get("/api/skills").json()
+
+        response = client.get("/api/skills", params={"limit": 2, "offset": 1, "fields": "name"})
+
+        assert response.json() == [{"name": s["name"]} for s in skills[1:3]]
+        assert response.headers["x-total-count"] == str(len(skills))
+
+    def test_query_responses_support_etag(self, client):
+        response = client.get("/api/skills", params={"limit": 1})
+
+        revalidated = client.get(
+            "/api/skills", params={"limit": 1}, headers={"If-None-Match": response.headers["etag"]}
+        )
+
+        assert revalidated.status_code == 304
+
+    def test_query_strings_do_not_fill_response_cache(self, client):
+        from src.cache import response_cache
+
+        client.get("/api/experience", params={"company": "tech corp"})
+        cached = len(response_cache)
+
+        for n in range(20):
+            client.get("/api/experience", params={"company": f"x{n}"})
+            client.get("/api/skills", params={"limit": 1, "offset": n})
+        client.get("/api/experience", params={"company": "TECH CORP"})
+
+        assert len(response_cache) == cached
+
+    def test_unknown_field_rejected(self, client):
+        response = client.get("/api/skills", params={"fields": "name,secret"})
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Unknown fields: secret"
+
+    @pytest.mark.parametrize("fields", ["", " , "])
+    def test_empty_fields_rejected(self, client, fields):
+        response = client.get("/api/skills", params={"fields": fields})
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "fields must list at least one field"
+
+    def test_grouped_view_rejects_filters(self, client):
+        response = client.get("/api/skills", params={"view": "grouped", "limit": 1})
+
+        assert response.status_code == 400
+
+    def test_limit_bounds(self, client):
+        assert client.get("/api/skills", params={"limit": 0}).status_code == 422
+
+
+class TestStreamingPage:
+    @pytest.fixture
+    def client(self, monkeypatch):
+        import src.views
+        from src.cache import response_cache
+
+        monkeypatch.setattr(src.views, "PORTFOLIO_STREAM_HTML", True)
+        response_cache.clear()
+        return TestClient(app)
+
+    def test_streamed_page_matches_buffered_render(self, client):
+        from src.data import load_portfolio_data
+        from src.rendering import render_index
+
+        response = client.get("/")
+
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+        assert response.text == render_index(load_portfolio_data())
+
+    def test_streamed_page_is_cached_afterwards(self, client):
+        first = client.get("/")
+        second = client.get("/")
+
+        assert "etag" in second.headers
+        assert second.text == first.text
+
+    def test_stream_index_flushes_head_first(self):
+        from src.data import load_portfolio_data
+        from src.rendering import render_index, stream_index
+
+        portfolio_data = load_portfolio_data("tests/resources/test_portfolio.yml", use_cache=False)
+
+        chunks = list(stream_index(portfolio_data, chunk_size=1024))
+
+        assert "</head>" in chunks[0]
+        assert "<section" not in chunks[0]
+        assert len(chunks) > 2
+        assert "".join(chunks) == render_index(portfolio_data)
+
+
+class TestWarmupAndProbes:
+    @pytest.fixture
+    def portfolio_data(self, monkeypatch):
+        import src.data
+
+        portfolio_data = src.data.load_portfolio_data(
+            "tests/resources/test_portfolio.yml", use_cache=False
+        )
+        monkeypatch.setattr(src.data, "_portfolio_data", portfolio_data)
+        return portfolio_data
+
+    def test_healthz(self):
+        assert TestClient(app).get("/healthz").json() == {"status": "ok"}
+
+    def test_not_ready_before_warmup(self, portfolio_data, monkeypatch):
+        monkeypatch.setattr(app.state, "warmed", False, raising=False)
+
+        assert TestClient(app).get("/readyz").status_code == 503
+
+    def test_lifespan_warms_caches(self, portfolio_data, monkeypatch):
+        import src.views
+        from src.cache import response_cache
+
+        response_cache.clear()
+        monkeypatch.setattr(app.state, "warmed", False, raising=False)
+
+        with TestClient(app) as client:
+            assert (portfolio_data.version, "index.html") in response_cache._entries
+            assert (portfolio_data.version, "skills") in response_cache._entries
+
+            def fail(*args):
+                raise AssertionError("rendered after warmup")
+
+            monkeypatch.setattr(src.views, "render_index", fail)
+            monkeypatch.setattr(src.views, "serialize_section", fail)
+            assert client.get("/").status_code == 200
+            assert client.get("/api/skills").status_code == 200
+
+            ready = client.get("/readyz")
+            assert ready.status_code == 200
+            assert ready.json() == {"status": "ready", "version": portfolio_data.version}
+
+
+class TestSearch:
+    @pytest.fixture
+    def client(self, monkeypatch):
+        import src.data
+
+        portfolio_data = src.data.load_portfolio_data(
+            "tests/resources/test_portfolio.yml", use_cache=False
+        )
+        monkeypatch.setattr(src.data, "_portfolio_data", portfolio_data)
+        return TestClient(app)
+
+    def test_search(self, client):
+        response = client.get("/api/search", params={"q": "fast"})
+
+        assert response.status_code == 200
+        hits = response.json()
+        assert hits[0]["section"] == "skills"
+        assert hits[0]["item"]["name"] == "FastAPI"
+        assert hits[0]["score"] > 0
+
+    def test_search_limit_and_validation(self, client):
+        assert len(client.get("/api/search", params={"q": "a", "limit": 1}).json()) == 1
+        assert client.get("/api/search").status_code == 422
+        assert client.get("/api/search", params={"q": "zzzz"}).json() == []
+
+
+class TestContentNegotiation:
+    @pytest.fixture
+    def client(self, monkeypatch):
+        import src.data
+
+        portfolio_data = src.data.load_portfolio_data(
+            "tests/resources/test_portfolio.yml", use_cache=False
+        )
+        monkeypatch.setattr(src.data, "_portfolio_data", portfolio_data)
+        return TestClient(app)
+
+    @pytest.mark.parametrize(
+        "path", ["/api/portfolio", "/api/skills?view=grouped", "/api/experience?limit=1"]
+    )
+    def test_msgpack(self, client, path):
+        msgpack = pytest.importorskip("msgpack")
+
+        json_response = client.get(path)
+        response = client.get(path, headers={"Accept": "application/msgpack"})
+
+        assert response.headers["content-type"] == "application/msgpack"
+        assert "Accept" in response.headers["vary"]
+        assert response.headers["etag"] != json_response.headers["etag"]
+        assert msgpack.unpackb(response.content) == json_response.json()
+
+    def test_msgpack_search(self, client):
+        msgpack = pytest.importorskip("msgpack")
+
+        response = client.get(
+            "/api/search", params={"q": "aws"}, headers={"Accept": "application/x-msgpack"}
+        )
+
+        assert msgpack.unpackb(response.content)[0]["section"] == "skills"
+
+    def test_falls_back_to_json_without_msgpack(self, client, monkeypatch):
+        import src.rendering
+
+        monkeypatch.setattr(src.rendering, "msgpack", None)
+
+        response = client.get("/api/education", headers={"Accept": "application/msgpack"})
+
+        assert response.headers["content-type"] == "application/json"
+        assert "Accept" not in response.headers.get("vary", "").replace("Accept-Encoding", "")
+
+
+class TestBatch:
+    @pytest.fixture
+    def client(self, monkeypatch):
+        import src.data
+
+        portfolio_data = src.data.load_portfolio_data(
+            "tests/resources/test_portfolio.yml", use_cache=False
+        )
+        monkeypatch.setattr(src.data, "_portfolio_data", portfolio_data)
+        return TestClient(app)
+
+    def test_batch_matches_section_endpoints(self, client):
+        response = client.get("/api/batch", params={"sections": "experience,skills,skill_groups"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert list(data) == ["experience", "skills", "skill_groups"]
+        assert data["experience"] == client.get("/api/experience").json()
+        assert data["skill_groups"] == client.get("/api/skills?view=grouped").json()
+
+        again = client.get(
+            "/api/batch",
+            params={"sections": "experience,skills,skill_groups"},
+            headers={"If-None-Match": response.headers["etag"]},
+        )
+        assert again.status_code == 304
+
+    def test_batch_msgpack(self, client):
+        msgpack = pytest.importorskip("msgpack")
+
+        response = client.get(
+            "/api/batch",
+            params={"sections": "education,certifications"},
+            headers={"Accept": "application/msgpack"},
+        )
+
+        assert (
+            msgpack.unpackb(response.content)
+            == client.get("/api/batch", params={"sections": "education,certifications"}).json()
+        )
+
+    def test_batch_rejects_unknown_sections(self, client):
+        assert (
+            client.get("/api/batch", params={"sections": "experience,secrets"}).status_code == 400
+        )
+        assert client.get("/api/batch", params={"sections": ","}).status_code == 400
+
+    def test_batch_tenants_require_tenant_mode(self, client):
+        response = client.get("/api/batch", params={"sections": "skills", "tenants": "alice"})
+
+        assert response.status_code == 400
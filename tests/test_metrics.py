@@ -0,0 +1,77 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import metrics
+from src.main import app
+
+
+@pytest.fixture
+def client():
+    from src.cache import response_cache
+
+    response_cache.clear()
+    return TestClient(app)
+
+
+class TestServerTiming:
+    def test_cold_render_reports_stages(self, client):
+        response = client.get("/")
+
+        timing = response.headers["server-timing"]
+        assert "render;dur=" in timing
+        assert "total;dur=" in timing
+
+    def test_warm_request_reports_total_only(self, client):
+        client.get("/api/skills")
+
+        timing = client.get("/api/skills").headers["server-timing"]
+        assert timing.startswith("total;dur=")
+
+    def test_server_timing_format(self):
+        header = metrics.server_timing([("yaml", 0.002), ("yaml", 0.001), ("render", 0.5)], 1.0)
+
+        assert header == "yaml;dur=3.000, render;dur=500.000, total;dur=1000.000"
+
+
+class TestMetricsEndpoint:
+    def test_exposes_request_histogram_and_cache_counters(self, client):
+        client.get("/api/skills")
+        client.get("/api/skills")
+
+        body = client.get("/metrics").text
+
+        assert "# TYPE portfolio_request_duration_seconds histogram" in body
+        assert 'route="/api/skills",status="200",le="+Inf"' in body
+        assert 'portfolio_cache_requests_total{cache="response",result="hit"}' in body
+        assert 'portfolio_stage_duration_seconds_count{stage="serialize"}' in body
+
+    def test_merges_other_workers(self, client, tmp_path, monkeypatch):
+        other = metrics.Registry()
+        other.inc(metrics.CACHE_REQUESTS, (("cache", "other-worker"), ("result", "hit")), 7)
+        (tmp_path / "metrics-999999.json").write_text(json.dumps(other.dump()))
+
+        body = metrics.collect(str(tmp_path))
+
+        assert 'portfolio_cache_requests_total{cache="other-worker",result="hit"} 7' in body
+
+    def test_flush_writes_worker_file(self, tmp_path):
+        metrics.flush(str(tmp_path))
+
+        files = list(tmp_path.glob("metrics-*.json"))
+        assert len(files) == 1
+        assert "counters" in json.loads(files[0].read_text())
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = metrics.Registry()
+    registry.observe("h", (), 0.0001)
+    registry.observe("h", (), 20.0)
+
+    text = metrics.render(registry)
+
+    assert 'h_bucket{le="0.0005"} 1' in text
+    assert 'h_bucket{le="10"} 1' in text
+    assert 'h_bucket{le="+Inf"} 2' in text
+    assert "h_count 2" in text
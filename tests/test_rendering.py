@@ -0,0 +1,40 @@
+import json
+
+import jinja2
+import pytest
+
+from src.rendering import MSGPACK_MEDIA_TYPE, TEMPLATES_DIR, _bytecode_cache, join_fragments
+
+
+def test_join_fragments_json():
+    body = join_fragments([("a", b"[1]"), ('b"', b'{"x":null}')])
+
+    assert json.loads(body) == {"a": [1], 'b"': {"x": None}}
+
+
+def test_join_fragments_msgpack():
+    msgpack = pytest.importorskip("msgpack")
+    fragments = [(f"k{i}", msgpack.packb(i)) for i in range(20)]
+
+    assert msgpack.unpackb(join_fragments(fragments, MSGPACK_MEDIA_TYPE)) == {
+        f"k{i}": i for i in range(20)
+    }
+
+
+def test_bytecode_cache_survives_a_new_environment(tmp_path):
+    directory = str(tmp_path / "bytecode")
+
+    def environment() -> jinja2.Environment:
+        return jinja2.Environment(
+            loader=jinja2.FileSystemLoader(TEMPLATES_DIR),
+            autoescape=True,
+            bytecode_cache=_bytecode_cache(directory),
+        )
+
+    environment().get_template("index.html")
+    assert len(list((tmp_path / "bytecode").iterdir())) == 1
+
+    cached = environment()
+    cached.compile = pytest.fail  # type: ignore[method-assign]
+    assert cached.get_template("index.html").name == "index.html"
+    assert _bytecode_cache("") is None
@@ -0,0 +1,57 @@
+from src.data import load_portfolio_data
+from src.search import SearchIndex, tokenize
+
+
+def _index():
+    return SearchIndex(
+        [
+            (("skills", 0), [("Keras", 3.0), ("ML", 2.0)]),
+            (("skills", 1), [("Kubernetes", 3.0), ("DevOps", 2.0)]),
+            (("experience", 0), [("Nubank", 3.0), ("Built MLOps tooling with Keras", 1.0)]),
+        ]
+    )
+
+
+def test_tokenize():
+    assert tokenize("MLOps, Keras & C++ (São Paulo)") == ["mlops", "keras", "c", "são", "paulo"]
+
+
+def test_exact_match_ranks_weighted_field_first():
+    results = _index().search("keras")
+
+    assert [ref for ref, _ in results] == [("skills", 0), ("experience", 0)]
+
+
+def test_prefix_match():
+    assert [ref for ref, _ in _index().search("kub")] == [("skills", 1)]
+    assert {ref for ref, _ in _index().search("k")} == {
+        ("skills", 0),
+        ("skills", 1),
+        ("experience", 0),
+    }
+
+
+def test_prefix_scores_below_exact():
+    index = SearchIndex([(("skills", 0), [("Go", 1.0)]), (("skills", 1), [("Golang", 1.0)])])
+
+    assert [ref for ref, _ in index.search("go")] == [("skills", 0), ("skills", 1)]
+
+
+def test_all_tokens_must_match():
+    assert [ref for ref, _ in _index().search("keras nubank")] == [("experience", 0)]
+    assert _index().search("keras docker") == []
+    assert _index().search("  ") == []
+
+
+def test_limit():
+    assert len(_index().search("k", limit=2)) == 2
+
+
+def test_portfolio_search_returns_items():
+    portfolio_data = load_portfolio_data("tests/resources/test_portfolio.yml", use_cache=False)
+
+    hits = portfolio_data.search("kubernetes")
+
+    assert hits[0].section == "certifications"
+    assert hits[0].item.name == "Certified Kubernetes Administrator"
+    assert portfolio_data.search("tech corp")[0].item.company == "Tech Corp"
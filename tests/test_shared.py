@@ -0,0 +1,151 @@
+import json
+import shutil
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.cache import cached_body
+from src.main import app
+from src.shared import Publisher, SharedSnapshot, publish
+
+
+def test_publish_and_flip_generation(tmp_path):
+    snapshot = SharedSnapshot(str(tmp_path))
+    assert snapshot.current_generation() == 0
+    assert snapshot.get("", "portfolio") is None
+
+    publish(str(tmp_path), {("", "portfolio"): cached_body(b'{"v":1}' * 100, "application/json")})
+    first = snapshot.get("", "portfolio")
+    assert isinstance(first.body, memoryview)
+    assert bytes(first.body) == b'{"v":1}' * 100
+    assert first.gzip is not None
+
+    publish(str(tmp_path), {("", "portfolio"): cached_body(b'{"v":2}', "application/json")})
+    publish(str(tmp_path), {("", "portfolio"): cached_body(b'{"v":3}', "application/json")})
+    assert snapshot.generation == 1
+    assert bytes(snapshot.get("", "portfolio").body) == b'{"v":3}'
+    assert snapshot.generation == 3
+    assert bytes(first.body) == b'{"v":1}' * 100
+    assert sorted(p.name for p in tmp_path.glob("snapshot-*.bin")) == [
+        "snapshot-2.bin",
+        "snapshot-3.bin",
+    ]
+
+
+def test_snapshot_is_visible_to_other_processes(tmp_path):
+    publish(str(tmp_path), {("", "portfolio"): cached_body(b"shared", "application/json")})
+
+    code = (
+        "import sys; from src.shared import SharedSnapshot; "
+        "print(bytes(SharedSnapshot(sys.argv[1]).get('', 'portfolio').body).decode())"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code, str(tmp_path)], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "shared"
+
+
+class TestPublisher:
+    @pytest.fixture
+    def portfolio_path(self, tmp_path):
+        path = tmp_path / "portfolio.yml"
+        shutil.copy("tests/resources/test_portfolio.yml", path)
+        return path
+
+    def test_publishes_only_on_change(self, tmp_path, portfolio_path):
+        publisher = Publisher(str(tmp_path / "shared"), str(portfolio_path))
+
+        assert publisher.refresh()
+        assert not publisher.refresh()
+        snapshot = SharedSnapshot(str(tmp_path / "shared"))
+        assert b"John Doe" in bytes(snapshot.get("", "index.html").body)
+        assert json.loads(bytes(snapshot.get("", "skill_groups").body))
+
+        portfolio_path.write_text(portfolio_path.read_text().replace("John Doe", "Jane Roe"))
+        assert publisher.refresh()
+        assert b"Jane Roe" in bytes(snapshot.get("", "index.html").body)
+
+    def test_tenants(self, tmp_path):
+        portfolios = tmp_path / "portfolios"
+        portfolios.mkdir()
+        shutil.copy("tests/resources/test_portfolio.yml", portfolios / "alice.yml")
+        shutil.copy("tests/resources/cache_test_portfolio.yml", portfolios / "bob.yml")
+        publisher = Publisher(str(tmp_path / "shared"), portfolios_dir=str(portfolios))
+        snapshot = publisher.snapshot
+
+        publisher.refresh()
+        assert snapshot.get("bob", "portfolio") is not None
+
+        (portfolios / "bob.yml").unlink()
+        publisher.refresh()
+        assert snapshot.get("bob", "portfolio") is None
+        assert snapshot.get("alice", "portfolio") is not None
+
+
+class TestSharedSnapshotMiddleware:
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        import src.data
+        import src.shared
+
+        portfolio_data = src.data.load_portfolio_data(
+            "tests/resources/test_portfolio.yml", use_cache=False
+        )
+        monkeypatch.setattr(src.data, "_portfolio_data", portfolio_data)
+
+        publish(
+            str(tmp_path),
+            {("", "portfolio"): cached_body(b'{"from":"shared"}', "application/json")},
+        )
+        monkeypatch.setattr(src.shared, "snapshot", SharedSnapshot(str(tmp_path)))
+        return TestClient(app)
+
+    def test_serves_from_snapshot(self, client):
+        response = client.get("/api/portfolio")
+
+        assert response.json() == {"from": "shared"}
+        assert (
+            client.get(
+                "/api/portfolio", headers={"If-None-Match": response.headers["etag"]}
+            ).status_code
+            == 304
+        )
+
+    def test_falls_through_when_missing(self, client):
+        response = client.get("/api/experience", params={"limit": 1})
+
+        assert response.status_code == 200
+        assert len(response.json()) == 1
+
+    def test_serves_only_the_default_locale(self, client, tmp_path):
+        publish(
+            str(tmp_path),
+            {
+                ("", "portfolio"): cached_body(b'{"from":"shared"}', "application/json"),
+                ("", "locales"): cached_body(b'["en","pt-br"]', "application/json"),
+            },
+        )
+
+        english = client.get("/api/portfolio", headers={"Accept-Language": "en-GB"})
+        assert english.json() == {"from": "shared"}
+        assert english.headers["content-language"] == "en"
+        assert "Accept-Language" in english.headers["vary"]
+
+        portuguese = client.get("/api/portfolio", headers={"Accept-Language": "pt"})
+        assert portuguese.json() != {"from": "shared"}
+
+
+def test_lifespan_publishes_snapshot(tmp_path, monkeypatch):
+    import src.shared
+
+    snapshot = SharedSnapshot(str(tmp_path))
+    monkeypatch.setattr(src.shared, "snapshot", snapshot)
+
+    with TestClient(app) as client:
+        assert snapshot.current_generation() == 1
+        assert client.get("/readyz").status_code == 200
+        assert client.get("/").status_code == 200
+        assert snapshot.generation == 1
@@ -93,3 +93,44 @@ certifications: []
             categories_in_order.append(skill.category)
 
     assert categories_in_order[0] == "B"
+
+
+def test_skill_groups_follow_sorted_order(monkeypatch):
+    yaml_content = """
+personal:
+  name: "John Doe"
+  title: "Software Engineer"
+  location: "City"
+  summary: "Summary"
+  email: "john@example.com"
+  linkedin: "linkedin.com/in/johndoe"
+  github: "github.com/johndoe"
+  profile: "avatars.githubusercontent.com/u/123"
+experience: []
+education: []
+skills:
+  - category: "A"
+    values:
+      - "b"
+      - "d"
+  - category: "B"
+    values:
+      - "a"
+      - "c"
+  - category: "C"
+    priority: 0
+    values:
+      - "z"
+certifications: []
+"""
+
+    def mock_open(*args, **kwargs):
+        return StringIO(yaml_content)
+
+    monkeypatch.setattr(builtins, "open", mock_open)
+
+    portfolio = load_portfolio_data(use_cache=False)
+
+    assert list(portfolio.skill_groups) == ["C", "B", "A"]
+    assert [s.name for s in portfolio.skill_groups["A"]] == ["b", "d"]
+    assert sum(len(v) for v in portfolio.skill_groups.values()) == len(portfolio.skills)
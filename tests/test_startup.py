@@ -0,0 +1,34 @@
+from src.cli import main
+from src.startup import _slowest_imports, profile_startup
+
+
+def test_profile_startup():
+    profile = profile_startup("/healthz", top=1000)
+
+    assert profile.status == 200
+    assert profile.import_ms > 0 and profile.warmup_ms > 0 and profile.first_request_ms > 0
+    assert profile.total_ms > profile.import_ms
+    modules = [module for module, _ in profile.slowest_imports]
+    assert "src.views" in modules
+    # Only needed once an avatar is built or fetched.
+    assert "PIL" not in modules and "urllib.request" not in modules
+
+
+def test_slowest_imports():
+    importtime = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:      1500 |       2500 | a\n"
+        "import time:       900 |        900 |   a.b\n"
+        "some log line\n"
+        "import time:      3000 |       3000 | c\n"
+    )
+
+    assert _slowest_imports(importtime, 2) == [("c", 3.0), ("a", 1.5)]
+
+
+def test_startup_command_fails_over_budget(capsys):
+    assert main(["startup", "--runs", "1", "--imports", "0", "--budget-ms", "0.001"]) == 1
+
+    out, err = capsys.readouterr()
+    assert out.startswith("run 1: import ")
+    assert "1 of 1 runs over the 0 ms budget" in err
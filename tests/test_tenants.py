@@ -0,0 +1,186 @@
+import shutil
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.compact import CompactPortfolio
+from src.main import app
+from src.tenants import TenantCache, is_valid_tenant, tenant_from_host
+
+
+@pytest.fixture
+def portfolios_dir(tmp_path):
+    shutil.copy("tests/resources/test_portfolio.yml", tmp_path / "alice.yml")
+    shutil.copy("tests/resources/cache_test_portfolio.yml", tmp_path / "bob.example.com.yml")
+    return tmp_path
+
+
+class TestTenantNames:
+    def test_valid_names(self):
+        assert is_valid_tenant("alice")
+        assert is_valid_tenant("bob.example.com")
+
+    def test_rejects_traversal(self):
+        assert not is_valid_tenant("..")
+        assert not is_valid_tenant("../etc/passwd")
+        assert not is_valid_tenant("a..b")
+        assert not is_valid_tenant("Alice")
+        assert not is_valid_tenant("")
+
+    def test_tenant_from_host(self):
+        assert tenant_from_host("Bob.Example.com:8000") == "bob.example.com"
+        assert tenant_from_host(None) is None
+
+
+class TestTenantCache:
+    def test_loads_lazily(self, portfolios_dir):
+        cache = TenantCache(str(portfolios_dir))
+
+        assert len(cache) == 0
+        assert cache.get("alice").personal.name == "John Doe"
+        assert cache.get("alice") is cache.get("alice")
+        assert isinstance(cache.get("alice"), CompactPortfolio)
+        assert cache.get("missing") is None
+
+    def test_evicts_by_entries(self, portfolios_dir):
+        cache = TenantCache(str(portfolios_dir), max_entries=1)
+
+        cache.get("alice")
+        cache.get("bob.example.com")
+
+        assert "alice" not in cache
+        assert "bob.example.com" in cache
+
+    def test_evicts_by_bytes(self, portfolios_dir):
+        cache = TenantCache(str(portfolios_dir), max_bytes=1)
+
+        cache.get("alice")
+        cache.get("bob.example.com")
+
+        assert len(cache) == 1
+
+    def test_counts_source_once_per_locale(self, portfolios_dir):
+        shutil.copy("tests/resources/localized_portfolio.yml", portfolios_dir / "carol.yml")
+        cache = TenantCache(str(portfolios_dir))
+
+        cache.get("carol")
+
+        assert cache.total_bytes == 2 * len((portfolios_dir / "carol.yml").read_text("utf-8"))
+
+    def test_reloads_changed_file(self, portfolios_dir):
+        cache = TenantCache(str(portfolios_dir), reload_interval=1e-9)
+        first = cache.get("bob.example.com")
+
+        path = portfolios_dir / "bob.example.com.yml"
+        path.write_text(path.read_text().replace("Cache Test User", "Bob Reloaded"))
+
+        assert cache.get("bob.example.com").personal.name == "Bob Reloaded"
+        assert cache.get("bob.example.com") is not first
+
+
+class TestMultiTenantRouting:
+    @pytest.fixture
+    def client(self, portfolios_dir, monkeypatch):
+        import src.tenants
+
+        monkeypatch.setattr(src.tenants, "tenant_cache", TenantCache(str(portfolios_dir)))
+        return TestClient(app)
+
+    def test_slug_prefix(self, client):
+        response = client.get("/t/alice/api/portfolio")
+
+        assert response.status_code == 200
+        assert response.json()["personal"]["name"] == "John Doe"
+
+    def test_slug_prefix_redirects_to_slash(self, client):
+        response = client.get("/t/alice", follow_redirects=False)
+
+        assert response.status_code == 308
+        assert response.headers["location"] == "/t/alice/"
+
+    def test_slug_prefix_page_and_static(self, client):
+        assert "John Doe" in client.get("/t/alice/").text
+        assert client.get("/t/alice/static/css/style.css").status_code == 200
+
+    def test_host_header(self, client):
+        response = client.get("/api/portfolio", headers={"Host": "bob.example.com"})
+
+        assert response.json()["personal"]["name"] == "Cache Test User"
+
+    def test_unknown_tenant(self, client):
+        assert client.get("/t/nobody/api/portfolio").status_code == 404
+        assert client.get("/api/portfolio", headers={"Host": "nobody.test"}).status_code == 404
+
+    def test_invalid_tenant_file(self, client, portfolios_dir):
+        (portfolios_dir / "broken.yml").write_text("personal: [unclosed\n")
+
+        response = client.get("/t/broken/")
+
+        assert response.status_code == 503
+        assert response.json()["detail"] == "Portfolio is invalid"
+
+
+def test_default_portfolio_is_not_watched(portfolios_dir, monkeypatch):
+    import src.main
+    import src.tenants
+
+    watched = []
+
+    async def watch(*args, **kwargs):
+        watched.append(args)
+
+    monkeypatch.setattr(src.tenants, "tenant_cache", TenantCache(str(portfolios_dir)))
+    monkeypatch.setattr(src.main, "PORTFOLIO_RELOAD_INTERVAL", 1.0)
+    monkeypatch.setattr(src.main, "watch_portfolio_data", watch)
+
+    with TestClient(app) as client:
+        assert client.get("/t/alice/api/portfolio").status_code == 200
+
+    assert watched == []
+
+
+def test_peek_returns_only_fresh_entries(portfolios_dir):
+    cache = TenantCache(str(portfolios_dir), reload_interval=60)
+
+    assert cache.peek("alice") is None
+    loaded = cache.get("alice")
+    assert cache.peek("alice") is loaded
+
+    cache.reload_interval = 1e-9
+    assert cache.peek("alice") is None
+
+
+def test_batch_across_tenants(portfolios_dir, monkeypatch):
+    import src.tenants
+
+    monkeypatch.setattr(src.tenants, "tenant_cache", TenantCache(str(portfolios_dir)))
+    client = TestClient(app)
+
+    response = client.get(
+        "/api/batch",
+        params={"sections": "portfolio,skills", "tenants": "alice,bob.example.com,nobody"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["alice"]["portfolio"]["personal"]["name"] == "John Doe"
+    assert data["bob.example.com"]["portfolio"]["personal"]["name"] == "Cache Test User"
+    assert data["nobody"] is None
+
+
+def test_batch_caches_only_sections(portfolios_dir, monkeypatch):
+    import src.tenants
+    from src.cache import response_cache
+
+    monkeypatch.setattr(src.tenants, "tenant_cache", TenantCache(str(portfolios_dir)))
+    client = TestClient(app)
+    client.get("/api/batch", params={"sections": "skills", "tenants": "alice"})
+    cached = len(response_cache)
+
+    for n in range(20):
+        response = client.get(
+            "/api/batch", params={"sections": "skills", "tenants": f"alice,nobody{n}"}
+        )
+        assert response.json()[f"nobody{n}"] is None
+
+    assert len(response_cache) == cached
@@ -0,0 +1,83 @@
+import shutil
+
+import pytest
+
+from src.cli import main
+from src.validate import check_content, expand_paths, validate_paths
+
+VALID = "tests/resources/test_portfolio.yml"
+
+
+@pytest.fixture
+def portfolios(tmp_path):
+    shutil.copy(VALID, tmp_path / "good.yml")
+    content = open(VALID, encoding="utf-8").read()
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "bad.yaml").write_text(
+        content.replace('company: "Tech Corp"', "company: [1, 2]"), encoding="utf-8"
+    )
+    return tmp_path
+
+
+def test_expand_paths(portfolios):
+    files = expand_paths([str(portfolios), str(portfolios / "*.yml")])
+
+    assert files == [str(portfolios / "good.yml"), str(portfolios / "nested" / "bad.yaml")]
+
+
+def test_validation_error_has_line():
+    content = open(VALID, encoding="utf-8").read().replace('issuer: "Amazon Web Services"', "")
+    line = next(i for i, text in enumerate(content.splitlines(), 1) if "AWS Certified" in text)
+
+    issues = check_content(content)
+
+    assert [(i.location, i.line) for i in issues] == [("certifications.0.issuer", line)]
+
+
+def test_yaml_syntax_error_has_line():
+    issues = check_content("personal:\n  name: [unclosed\n")
+
+    assert issues[0].line == 3
+    assert "flow sequence" in issues[0].message
+
+
+def test_skills_error_points_at_skills():
+    issues = check_content(
+        open(VALID, encoding="utf-8").read().replace('category: "Frontend"', "category: 3")
+    )
+
+    assert issues[0].location == "skills"
+    assert issues[0].line is not None
+
+
+def test_skills_error_does_not_hide_other_issues():
+    issues = check_content(open("tests/resources/invalid_portfolio.yml", encoding="utf-8").read())
+
+    locations = [issue.location for issue in issues]
+    assert locations[0] == "skills"
+    assert "personal.title" in locations and "personal.email" in locations
+
+
+def test_unchanged_files_are_skipped(portfolios, tmp_path):
+    cache = str(tmp_path / "cache.json")
+    paths = expand_paths([str(portfolios)])
+
+    first = {r.path: r for r in validate_paths(paths, jobs=2, cache_path=cache)}
+    assert first[str(portfolios / "good.yml")].ok
+    assert first[str(portfolios / "nested" / "bad.yaml")].issues[0].line == 17
+
+    (portfolios / "good.yml").write_text("personal: {}\n", encoding="utf-8")
+    second = {r.path: r for r in validate_paths(paths, jobs=1, cache_path=cache)}
+    assert not second[str(portfolios / "good.yml")].cached
+    assert not second[str(portfolios / "good.yml")].ok
+    bad = second[str(portfolios / "nested" / "bad.yaml")]
+    assert bad.cached and not bad.ok
+
+
+def test_validate_command(portfolios, tmp_path, capsys):
+    code = main(["validate", str(portfolios), "--cache", str(tmp_path / "c.json"), "-q"])
+
+    assert code == 1
+    out = capsys.readouterr().out
+    assert "bad.yaml:17:14: experience.0.company: Input should be a valid string" in out
+    assert "good.yml" not in out